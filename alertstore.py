@@ -0,0 +1,176 @@
+import os
+import time
+import asyncio
+from collections import deque
+from typing import Any, Deque, Dict, List, Optional, Tuple
+
+from telemetry import registry
+
+# Cluster başına tutulan değişiklik kaydı; daha eski sürümden gelen istemci tam snapshot alır
+ALERT_FEED_HISTORY = int(os.getenv("ALERT_FEED_HISTORY", "2000"))
+
+_SEV_ORDER = {"critical": 0, "warning": 1, "error": 2, "info": 3}
+# Alert kimliğine girmeyen label'lar (ALERTS ile ALERTS_FOR_STATE arasında farklılar)
+_NON_IDENTITY = frozenset({"__name__", "alertstate"})
+
+ADDED, CHANGED, RESOLVED = "added", "changed", "resolved"
+
+
+def alert_id(metric: Dict[str, str]) -> str:
+    """Label kümesinden kararlı alert kimliği (alertstate / __name__ hariç)."""
+    return ",".join(f"{k}={v}" for k, v in sorted(metric.items()) if k not in _NON_IDENTITY)
+
+
+def _sort_key(alert: Dict[str, Any]) -> Tuple[int, float]:
+    # active_at artan = active_secs azalan; sıra zamanla değişmez, yalnızca değişiklikte yeniden kurulur
+    sev = _SEV_ORDER.get((alert["metric"].get("severity") or "").lower(), 9)
+    return sev, alert["active_at"] if alert["active_at"] is not None else float("inf")
+
+
+class _Feed:
+    """Tek cluster'ın firing alert kümesi + sürümlü değişiklik kaydı."""
+
+    def __init__(self):
+        # Sürümler süreç başlangıç zamanından başlar: yeniden başlatma sonrası eski istemci sürümü
+        # ya geride (→ tam snapshot) ya da ileride (→ bilinmiyor, tam snapshot) kalır
+        self.version = int(time.time() * 1000)
+        self.floor = self.version
+        self.alerts: Dict[str, Dict[str, Any]] = {}
+        self.changes: Deque[Tuple[int, str, str]] = deque()
+        self.updated_at = 0.0
+        self.updated_ts = 0.0
+        self._sorted: Optional[List[Dict[str, Any]]] = None
+        self._waiters: List[asyncio.Future] = []
+
+    def apply(self, alerts: Dict[str, Dict[str, Any]]) -> int:
+        """Yeni firing kümesini uygular; değişiklik sayısını döner."""
+        self.updated_at, self.updated_ts = time.monotonic(), time.time()
+        diff = [(aid, RESOLVED) for aid in self.alerts if aid not in alerts]
+        for aid, alert in alerts.items():
+            old = self.alerts.get(aid)
+            if old is None:
+                diff.append((aid, ADDED))
+            elif old != alert:
+                diff.append((aid, CHANGED))
+        if not diff:
+            return 0
+        self.version += 1
+        self.alerts = alerts
+        self._sorted = None
+        for aid, kind in diff:
+            self.changes.append((self.version, aid, kind))
+        while len(self.changes) > ALERT_FEED_HISTORY:
+            self.floor = self.changes.popleft()[0]
+        self._wake()
+        return len(diff)
+
+    def sorted_alerts(self) -> List[Dict[str, Any]]:
+        if self._sorted is None:
+            self._sorted = sorted(self.alerts.values(), key=_sort_key)
+        return self._sorted
+
+    def since(self, version: int) -> Dict[str, Any]:
+        """version'dan bu yana eklenen / değişen / çözülen alert'ler; mümkün değilse tam snapshot."""
+        if version <= 0 or version < self.floor or version > self.version:
+            return {"version": self.version, "full": True, "alerts": self.sorted_alerts()}
+        existed: Dict[str, bool] = {}
+        for v, aid, kind in reversed(self.changes):
+            if v <= version:
+                break
+            # En eski değişiklik belirleyicidir: "added" ise version anında yoktu
+            existed[aid] = kind != ADDED
+        added, changed, resolved = [], [], []
+        for aid, was in existed.items():
+            now = self.alerts.get(aid)
+            if now is not None:
+                (changed if was else added).append(now)
+            elif was:
+                resolved.append(aid)
+        return {
+            "version":  self.version,
+            "full":     False,
+            "added":    sorted(added, key=_sort_key),
+            "changed":  sorted(changed, key=_sort_key),
+            "resolved": sorted(resolved),
+        }
+
+    async def wait(self, version: int, timeout: float) -> bool:
+        """version'dan yeni bir sürüm gelene veya timeout dolana kadar bekler."""
+        if self.version != version:
+            return True
+        fut = asyncio.get_running_loop().create_future()
+        self._waiters.append(fut)
+        try:
+            await asyncio.wait_for(fut, timeout)
+            return True
+        except asyncio.TimeoutError:
+            return False
+        finally:
+            if fut in self._waiters:
+                self._waiters.remove(fut)
+
+    def _wake(self) -> None:
+        waiters, self._waiters = self._waiters, []
+        for fut in waiters:
+            if not fut.done():
+                try:
+                    fut.set_result(None)
+                except RuntimeError:
+                    # Kapanmış event loop'a ait bekleyen (test / yeniden başlatma)
+                    pass
+
+
+class AlertStore:
+    """
+    Cluster başına sürümlü firing alert kümesi. Yenileme tüm kümeyi apply() ile verir;
+    istemciler since(version) ile yalnızca farkı alır, wait() ile değişikliği bekler.
+    """
+
+    def __init__(self):
+        self._feeds: Dict[str, _Feed] = {}
+
+    def feed(self, cluster: str) -> _Feed:
+        feed = self._feeds.get(cluster)
+        if feed is None:
+            feed = self._feeds[cluster] = _Feed()
+        return feed
+
+    def update(self, cluster: str, alerts: List[Dict[str, Any]], for_state: List[Dict[str, Any]]) -> _Feed:
+        """
+        ALERTS ve ALERTS_FOR_STATE sonuçlarından kümeyi kurar. active_at (alert'in firing'e
+        geçtiği unix zamanı) her poll'da değişen active_secs yerine saklanır.
+        """
+        active_at: Dict[str, float] = {}
+        coarse: Dict[str, float] = {}
+        for r in for_state:
+            m = r.get("metric", {})
+            try:
+                ts = float(r.get("value", [None, None])[1])
+            except (TypeError, ValueError):
+                continue
+            active_at[alert_id(m)] = ts
+            coarse[f"{m.get('alertname', '')}|{m.get('namespace', '')}"] = ts
+
+        current: Dict[str, Dict[str, Any]] = {}
+        for r in alerts:
+            m = r.get("metric", {})
+            aid = alert_id(m)
+            ts = active_at.get(aid)
+            if ts is None:
+                ts = coarse.get(f"{m.get('alertname', '')}|{m.get('namespace', '')}")
+            current[aid] = {"id": aid, "metric": m, "active_at": ts}
+        feed = self.feed(cluster)
+        feed.apply(current)
+        return feed
+
+    def clear(self) -> None:
+        self._feeds.clear()
+
+    def samples(self):
+        for cluster, feed in list(self._feeds.items()):
+            yield {"cluster": cluster or "global"}, len(feed.alerts)
+
+
+alert_store = AlertStore()
+
+registry.gauge("observe_alert_store_firing", "Alert store'daki firing alert sayısı.", alert_store.samples)
@@ -0,0 +1,175 @@
+"""
+Benchmark için yerel Prometheus ve OCP API taklitleri.
+Tek HTTP sunucusu tüm cluster'lara hizmet eder: /c/<cluster>/... öneki cluster'ı seçer.
+Payload boyutu (pod sayısı, seri kardinalitesi, log satırı), gecikme ve hata oranı ayarlanabilir.
+"""
+import json
+import random
+import threading
+import time
+from dataclasses import dataclass
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List, Tuple
+from urllib.parse import parse_qs, urlparse
+
+NAMESPACE = "bench"
+
+
+@dataclass
+class FakeProfile:
+    pods:         int   = 200
+    series:       int   = 50
+    log_lines:    int   = 2000
+    latency_ms:   float = 5.0
+    failure_rate: float = 0.0
+    seed:         int   = 42
+
+
+def _pod(i: int, rng: random.Random) -> Dict[str, Any]:
+    name = f"app-{i // 3}-{i:05d}"
+    phase = "Running" if rng.random() > 0.05 else "Pending"
+    restarts = rng.choice((0, 0, 0, 1, 2, 7))
+    return {
+        "metadata": {
+            "name": name, "namespace": NAMESPACE, "resourceVersion": str(1000 + i),
+            "uid": f"uid-{i}", "creationTimestamp": "2024-01-01T00:00:00Z",
+            "labels": {"app": f"app-{i // 3}", "tier": rng.choice(("web", "api", "worker"))},
+            "managedFields": [{"manager": "kubelet", "operation": "Update", "fieldsV1": {"f:status": {}}}],
+        },
+        "spec": {
+            "nodeName": f"node-{i % 12}",
+            "containers": [{"name": "app", "image": "registry.local/app:1.0",
+                            "resources": {"requests": {"cpu": "100m", "memory": "128Mi"}}}],
+        },
+        "status": {
+            "phase": phase,
+            "containerStatuses": [{"name": "app", "ready": phase == "Running", "restartCount": restarts,
+                                   "state": {"running": {"startedAt": "2024-01-01T00:00:00Z"}}}],
+        },
+    }
+
+
+class FakeUpstream:
+    """Prometheus (/api/v1/query, /query_range, /labels) + OCP (/api/v1/namespaces/...) tek sunucuda."""
+
+    def __init__(self, profile: FakeProfile, host: str = "127.0.0.1", port: int = 0):
+        self.profile = profile
+        rng = random.Random(profile.seed)
+        self.pods = [_pod(i, rng) for i in range(profile.pods)]
+        self.pods_by_name = {p["metadata"]["name"]: p for p in self.pods}
+        self.pod_list = json.dumps({"kind": "PodList", "metadata": {"resourceVersion": "5000"},
+                                    "items": self.pods}).encode()
+        self.log_text = "".join(
+            f"2024-01-01T00:00:{i % 60:02d}Z {rng.choice(('INFO', 'INFO', 'DEBUG', 'WARN', 'ERROR'))} "
+            f"request id={i} path=/api/v{i % 3} took={rng.randint(1, 900)}ms\n"
+            for i in range(profile.log_lines)
+        ).encode()
+        self.server = ThreadingHTTPServer((host, port), self._handler())
+        self.server.daemon_threads = True
+        self.url = f"http://{host}:{self.server.server_port}"
+
+    def start(self) -> "FakeUpstream":
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        return self
+
+    def stop(self) -> None:
+        self.server.shutdown()
+
+    def _vector(self) -> Dict[str, Any]:
+        now = time.time()
+        return {"resultType": "vector", "result": [
+            {"metric": {"namespace": NAMESPACE, "pod": p["metadata"]["name"], "node": p["spec"]["nodeName"]},
+             "value": [now, str(round(random.random() * 100, 3))]}
+            for p in self.pods[: self.profile.series]
+        ]}
+
+    def _matrix(self, q: Dict[str, str]) -> Dict[str, Any]:
+        start, end = float(q.get("start", 0)), float(q.get("end", 0))
+        step = float(q.get("step", 15) or 15)
+        n = max(0, min(11000, int((end - start) // step) + 1))
+        result = []
+        for s in range(self.profile.series):
+            base = (s * 7) % 100
+            result.append({
+                "metric": {"namespace": NAMESPACE, "pod": f"app-{s}", "container": "app"},
+                "values": [[start + i * step, str(base + (i % 17) * 0.5)] for i in range(n)],
+            })
+        return {"resultType": "matrix", "result": result}
+
+    def _handler(self):
+        fake = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+            # Başlık ve gövde ayrı segmentlerde gider; Nagle + delayed ACK ~40 ms ekler
+            disable_nagle_algorithm = True
+
+            def do_GET(self):
+                prof = fake.profile
+                if prof.latency_ms:
+                    time.sleep(prof.latency_ms / 1000 * random.uniform(0.5, 1.5))
+                if prof.failure_rate and random.random() < prof.failure_rate:
+                    return self._send(503, b'{"status":"error","error":"injected failure"}')
+                u = urlparse(self.path)
+                q = {k: v[0] for k, v in parse_qs(u.query).items()}
+                parts = u.path.split("/", 3)          # "", "c", <cluster>, rest
+                path = "/" + parts[3] if len(parts) > 3 else u.path
+                self._route(path, q)
+
+            def _route(self, path: str, q: Dict[str, str]):
+                if path == "/api/v1/query":
+                    return self._json({"status": "success", "data": fake._vector()})
+                if path == "/api/v1/query_range":
+                    return self._json({"status": "success", "data": fake._matrix(q)})
+                if path == "/api/v1/labels":
+                    return self._json({"status": "success", "data": ["namespace", "pod", "node", "container"]})
+                if path.startswith("/api/v1/label/"):
+                    return self._json({"status": "success",
+                                       "data": [p["metadata"]["name"] for p in fake.pods]})
+                if path == f"/api/v1/namespaces/{NAMESPACE}/pods":
+                    return self._send(200, fake.pod_list)
+                if path == f"/api/v1/namespaces/{NAMESPACE}/events":
+                    return self._json({"metadata": {"resourceVersion": "5000"}, "items": []})
+                if path.startswith(f"/api/v1/namespaces/{NAMESPACE}/pods/"):
+                    rest = path.rsplit("/pods/", 1)[1].split("/")
+                    pod = fake.pods_by_name.get(rest[0])
+                    if pod is None:
+                        return self._json({"kind": "Status", "code": 404}, 404)
+                    if len(rest) > 1 and rest[1] == "log":
+                        return self._log(int(q.get("tailLines", 0) or 0))
+                    return self._json(pod)
+                return self._json({"kind": "Status", "code": 404}, 404)
+
+            def _log(self, tail: int):
+                body = fake.log_text
+                if tail:
+                    lines = body.splitlines(keepends=True)
+                    body = b"".join(lines[-tail:])
+                self._send(200, body, "text/plain")
+
+            def _json(self, obj: Any, code: int = 200):
+                self._send(code, json.dumps(obj).encode())
+
+            def _send(self, code: int, raw: bytes, ctype: str = "application/json"):
+                self.send_response(code)
+                self.send_header("Content-Type", ctype)
+                self.send_header("Content-Length", str(len(raw)))
+                self.end_headers()
+                self.wfile.write(raw)
+
+            def log_message(self, *args):
+                pass
+
+        return Handler
+
+
+def serve(profile: FakeProfile, ready) -> None:
+    """Alt süreç girişi: sunucuyu başlatır, URL'i ready kuyruğuna yazar ve bekler."""
+    fake = FakeUpstream(profile)
+    ready.put(fake.url)
+    fake.server.serve_forever()
+
+
+def cluster_urls(base_url: str, clusters: int) -> List[Tuple[str, str]]:
+    """(cluster adı, cluster'a özel base URL) listesi."""
+    return [(f"bench-{i}", f"{base_url}/c/bench-{i}") for i in range(clusters)]
@@ -0,0 +1,252 @@
+"""
+Observe API yük testi.
+
+Sahte Prometheus/OCP sunucusu ayrı bir süreçte çalışır (RSS ve GIL ölçümü karışmasın);
+uygulama aynı süreçte httpx ASGITransport ile sürülür. Her senaryo × eşzamanlılık için
+p50/p99 gecikme, throughput ve tepe RSS raporlanır; sonuçlar bench/baselines.json'daki
+aynı profilin baseline'ı ile karşılaştırılır.
+
+    python -m bench.run                                  # varsayılan profil, baseline ile karşılaştır
+    python -m bench.run --clusters 8 --pods 2000 --latency-ms 20 --concurrency 1,16,64
+    python -m bench.run --save                           # sonucu baseline olarak yaz
+"""
+import argparse
+import asyncio
+import json
+import multiprocessing
+import os
+import resource
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from bench.fakes import NAMESPACE, FakeProfile, cluster_urls, serve
+
+BASELINE_FILE = Path(__file__).with_name("baselines.json")
+SCENARIOS = ("health_overview", "list_pods", "run_promql_range", "get_pod_logs")
+
+Request = Tuple[str, str, Optional[Dict[str, Any]]]
+
+
+def _parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    p = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    p.add_argument("--clusters", type=int, default=4)
+    p.add_argument("--pods", type=int, default=200, help="cluster başına pod sayısı")
+    p.add_argument("--series", type=int, default=50, help="sorgu başına seri kardinalitesi")
+    p.add_argument("--log-lines", type=int, default=2000)
+    p.add_argument("--latency-ms", type=float, default=5.0, help="upstream yapay gecikmesi")
+    p.add_argument("--failure-rate", type=float, default=0.0, help="upstream hata oranı (0-1)")
+    p.add_argument("--concurrency", default="1,8,32", help="virgülle ayrılmış eşzamanlılık seviyeleri")
+    p.add_argument("--requests", type=int, default=200, help="senaryo × seviye başına istek sayısı")
+    p.add_argument("--warmup", type=int, default=10)
+    p.add_argument("--scenarios", default=",".join(SCENARIOS))
+    p.add_argument("--watch-cache", action="store_true", help="OCP watch cache'i etkinleştir")
+    p.add_argument("--save", action="store_true", help="sonuçları baseline olarak kaydet")
+    p.add_argument("--tolerance", type=float, default=0.25, help="regresyon eşiği (oran)")
+    p.add_argument("--fail-on-regression", action="store_true")
+    p.add_argument("--output", help="ham sonuçları JSON olarak yaz")
+    return p.parse_args(argv)
+
+
+def profile_key(args: argparse.Namespace) -> str:
+    """Baseline anahtarı: yalnızca aynı payload / gecikme ayarlarıyla alınan sonuçlar karşılaştırılır."""
+    return (
+        f"c{args.clusters}-p{args.pods}-s{args.series}-l{args.log_lines}"
+        f"-lat{args.latency_ms:g}-f{args.failure_rate:g}-wc{int(args.watch_cache)}"
+    )
+
+
+def _write_config(root: Path, upstream_url: str, clusters: int) -> None:
+    lines = ["global:", "  scheduler:", "    enabled: false", "clusters:"]
+    for name, url in cluster_urls(upstream_url, clusters):
+        lines += [
+            f"  - name: {name}",
+            f"    ocp_api: {url}",
+            f"    prometheus_url: {url}",
+            "    insecure: true",
+        ]
+        (root / f"{name}.token").write_text("bench-token")
+        (root / f"{name}-prometheus.token").write_text("bench-token")
+    (root / "observe.yaml").write_text("\n".join(lines) + "\n")
+
+
+def _scenario(name: str, clusters: List[str], pods: int) -> Callable[[int], Request]:
+    def health_overview(i: int) -> Request:
+        return "GET", f"/api/observe/health/overview?cluster={clusters[i % len(clusters)]}", None
+
+    def list_pods(i: int) -> Request:
+        return "GET", f"/api/observe/pods?cluster={clusters[i % len(clusters)]}&namespace={NAMESPACE}", None
+
+    def run_promql_range(i: int) -> Request:
+        end = int(time.time())
+        return "POST", "/api/observe/promql/range", {
+            "query":   f'sum(rate(container_cpu_usage_seconds_total{{shard="{i % 10}"}}[5m])) by (pod)',
+            "cluster": clusters[i % len(clusters)],
+            "start":   end - 3600,
+            "end":     end,
+            "step":    "30s",
+        }
+
+    def get_pod_logs(i: int) -> Request:
+        pod = f"app-{(i % pods) // 3}-{i % pods:05d}"
+        return "GET", (
+            f"/api/observe/pod-logs?cluster={clusters[i % len(clusters)]}"
+            f"&namespace={NAMESPACE}&pod={pod}&tail_lines=500"
+        ), None
+
+    return locals()[name]
+
+
+def _percentile(sorted_ms: List[float], pct: float) -> float:
+    if not sorted_ms:
+        return 0.0
+    k = max(0, min(len(sorted_ms) - 1, int(round(pct / 100 * len(sorted_ms) + 0.5)) - 1))
+    return sorted_ms[k]
+
+
+def _peak_rss_mb() -> float:
+    # Linux'ta ru_maxrss KB cinsindendir (macOS'ta byte)
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return round(rss / (1024 * 1024 if sys.platform == "darwin" else 1024), 1)
+
+
+async def _load(client, make: Callable[[int], Request], total: int, concurrency: int) -> Dict[str, Any]:
+    latencies: List[float] = []
+    errors = 0
+    counter = iter(range(total))
+
+    async def worker() -> None:
+        nonlocal errors
+        for i in counter:
+            method, url, body = make(i)
+            started = time.perf_counter()
+            resp = await client.request(method, url, json=body)
+            payload = resp.content
+            latencies.append((time.perf_counter() - started) * 1000)
+            if resp.status_code >= 400 or b'"ok":false' in payload[:64]:
+                errors += 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+    latencies.sort()
+    return {
+        "requests":    total,
+        "errors":      errors,
+        "p50_ms":      round(_percentile(latencies, 50), 2),
+        "p99_ms":      round(_percentile(latencies, 99), 2),
+        "rps":         round(total / elapsed, 1) if elapsed else 0.0,
+        "peak_rss_mb": _peak_rss_mb(),
+    }
+
+
+async def run_benchmark(args: argparse.Namespace, upstream_url: str) -> Dict[str, Dict[str, Any]]:
+    """Uygulamayı süreç içinde sürer; {"senaryo@eşzamanlılık": metrikler} döner."""
+    import httpx
+    import upstream
+    from informer import informers
+    from main import app
+
+    clusters = [name for name, _ in cluster_urls(upstream_url, args.clusters)]
+    levels = [int(c) for c in str(args.concurrency).split(",") if c.strip()]
+    results: Dict[str, Dict[str, Any]] = {}
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=120) as client:
+        try:
+            for name in [s.strip() for s in args.scenarios.split(",") if s.strip()]:
+                if name not in SCENARIOS:
+                    raise SystemExit(f"Bilinmeyen senaryo: {name}")
+                make = _scenario(name, clusters, args.pods)
+                if args.warmup:
+                    await _load(client, make, args.warmup, 1)
+                for level in levels:
+                    results[f"{name}@{level}"] = await _load(client, make, args.requests, level)
+        finally:
+            await informers.close()
+            await upstream.close_all()
+    return results
+
+
+def compare(results: Dict[str, Dict[str, Any]], baseline: Dict[str, Dict[str, Any]], tolerance: float) -> List[str]:
+    """Baseline'a göre p99 artışı veya throughput düşüşü tolerance'ı aşan satırlar."""
+    regressions = []
+    for key, cur in results.items():
+        base = baseline.get(key)
+        if not base:
+            continue
+        if base["p99_ms"] and cur["p99_ms"] > base["p99_ms"] * (1 + tolerance):
+            regressions.append(f"{key}: p99 {base['p99_ms']}ms → {cur['p99_ms']}ms")
+        if base["rps"] and cur["rps"] < base["rps"] * (1 - tolerance):
+            regressions.append(f"{key}: rps {base['rps']} → {cur['rps']}")
+    return regressions
+
+
+def _delta(cur: float, base: Optional[float]) -> str:
+    if not base:
+        return ""
+    return f"{(cur - base) / base * 100:+.0f}%"
+
+
+def _report(results: Dict[str, Dict[str, Any]], baseline: Dict[str, Dict[str, Any]]) -> str:
+    head = f"{'scenario@conc':<24} {'req':>5} {'err':>4} {'p50 ms':>9} {'p99 ms':>9} {'Δp99':>6} {'rps':>8} {'Δrps':>6} {'rss MB':>7}"
+    rows = [head, "-" * len(head)]
+    for key, r in results.items():
+        base = baseline.get(key, {})
+        rows.append(
+            f"{key:<24} {r['requests']:>5} {r['errors']:>4} {r['p50_ms']:>9.2f} {r['p99_ms']:>9.2f} "
+            f"{_delta(r['p99_ms'], base.get('p99_ms')):>6} {r['rps']:>8.1f} "
+            f"{_delta(r['rps'], base.get('rps')):>6} {r['peak_rss_mb']:>7.1f}"
+        )
+    return "\n".join(rows)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = _parse_args(argv)
+    profile = FakeProfile(
+        pods=args.pods, series=args.series, log_lines=args.log_lines,
+        latency_ms=args.latency_ms, failure_rate=args.failure_rate,
+    )
+    ctx = multiprocessing.get_context("spawn")
+    ready = ctx.Queue()
+    proc = ctx.Process(target=serve, args=(profile, ready), daemon=True)
+    proc.start()
+    try:
+        upstream_url = ready.get(timeout=30)
+        with tempfile.TemporaryDirectory(prefix="observe-bench-") as tmp:
+            root = Path(tmp)
+            _write_config(root, upstream_url, args.clusters)
+            # config modülü yolları import anında okur — uygulama import edilmeden önce ayarlanmalı
+            os.environ["ALARMFW_CONFIG"] = str(root)
+            os.environ["ALARMFW_SECRETS"] = str(root)
+            os.environ["HEALTH_SCHEDULER"] = "false"
+            os.environ["OCP_WATCH_CACHE"] = "true" if args.watch_cache else "false"
+            results = asyncio.run(run_benchmark(args, upstream_url))
+    finally:
+        proc.terminate()
+
+    key = profile_key(args)
+    baselines = json.loads(BASELINE_FILE.read_text()) if BASELINE_FILE.exists() else {}
+    baseline = baselines.get(key, {})
+    print(f"profile: {key}")
+    print(_report(results, baseline))
+    if args.output:
+        Path(args.output).write_text(json.dumps({"profile": key, "results": results}, indent=2) + "\n")
+
+    if args.save:
+        baselines[key] = results
+        BASELINE_FILE.write_text(json.dumps(baselines, indent=2, sort_keys=True) + "\n")
+        print(f"baseline kaydedildi: {BASELINE_FILE.name} [{key}]")
+        return 0
+    if not baseline:
+        print("bu profil için baseline yok (--save ile oluşturun)")
+        return 0
+    regressions = compare(results, baseline, args.tolerance)
+    for line in regressions:
+        print(f"REGRESSION {line}")
+    return 1 if regressions and args.fail_on_regression else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,168 @@
+import os
+import time
+import logging
+from collections import deque
+from typing import Any, Dict, Optional, Tuple
+
+from telemetry import registry
+
+log = logging.getLogger("alarmfw.observe.breaker")
+
+# Art arda bu kadar upstream hatası (bağlantı hatası, timeout, 5xx) breaker'ı açar
+FAILURE_THRESHOLD = int(os.getenv("BREAKER_FAILURE_THRESHOLD", "5"))
+# Açık kalma süresi; half-open denemesi başarısız oldukça MAX_OPEN_SEC'e kadar ikiye katlanır
+OPEN_SEC          = float(os.getenv("BREAKER_OPEN_SEC", "30"))
+MAX_OPEN_SEC      = float(os.getenv("BREAKER_MAX_OPEN_SEC", "300"))
+# Adaptif timeout = p99 × FACTOR, [MIN_SEC, yapılandırılmış timeout] aralığında
+TIMEOUT_FACTOR    = float(os.getenv("ADAPTIVE_TIMEOUT_FACTOR", "3"))
+TIMEOUT_MIN_SEC   = float(os.getenv("ADAPTIVE_TIMEOUT_MIN_SEC", "2"))
+MIN_SAMPLES       = 20
+WINDOW            = 200
+
+CLOSED, OPEN, HALF_OPEN = "closed", "open", "half_open"
+
+
+class CircuitBreaker:
+    """
+    Tek upstream hedefi (cluster Prometheus'u / OCP API) için closed → open → half-open.
+    Açıkken çağrılar upstream'e gitmeden anında reddedilir; süre dolunca tek bir
+    deneme (probe) geçirilir, başarılıysa kapanır.
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self.state = CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+        self.open_sec = OPEN_SEC
+        self.probing = False
+        self.last_error = ""
+        self.stats = {"calls": 0, "rejected": 0, "failures": 0, "trips": 0}
+        # Uç nokta sınıfı başına gecikme penceresi: hafif health sorguları range / label
+        # çağrılarının timeout'unu aşağı çekmesin
+        self._latencies: Dict[str, deque] = {}
+        self._p99: Dict[str, float] = {}
+
+    def allow(self) -> bool:
+        """Çağrı upstream'e gidebilir mi? half-open'da yalnızca tek probe geçer."""
+        if self.state == OPEN:
+            if time.monotonic() - self.opened_at < self.open_sec:
+                self.stats["rejected"] += 1
+                return False
+            self.state = HALF_OPEN
+        if self.state == HALF_OPEN:
+            if self.probing:
+                self.stats["rejected"] += 1
+                return False
+            self.probing = True
+        self.stats["calls"] += 1
+        return True
+
+    def timeout(self, ceiling: float, cls: str = "") -> float:
+        """cls sınıfında gözlenen gecikmeden türetilen timeout; yeterli örnek yoksa ceiling."""
+        window = self._latencies.get(cls)
+        if window is None or len(window) < MIN_SAMPLES:
+            return ceiling
+        p99 = self._p99.get(cls)
+        if p99 is None:
+            ordered = sorted(window)
+            p99 = self._p99[cls] = ordered[min(len(ordered) - 1, int(len(ordered) * 0.99))]
+        return max(TIMEOUT_MIN_SEC, min(ceiling, p99 * TIMEOUT_FACTOR))
+
+    def success(self, latency: float, cls: str = "") -> None:
+        self._sample(latency, cls)
+        if self.state != CLOSED:
+            log.info("Circuit closed for %s", self.name)
+        self.state, self.failures, self.probing = CLOSED, 0, False
+        self.open_sec = OPEN_SEC
+
+    def failure(self, error: str, latency: Optional[float] = None, cls: str = "") -> None:
+        """latency: timeout'ta kullanılan süre — timeout'un zamanla ceiling'e doğru esnemesini sağlar."""
+        if latency is not None:
+            self._sample(latency, cls)
+        self.stats["failures"] += 1
+        self.failures += 1
+        self.last_error = error
+        if self.state == HALF_OPEN:
+            self.open_sec = min(self.open_sec * 2, MAX_OPEN_SEC)
+            self._trip()
+        elif self.state == CLOSED and self.failures >= FAILURE_THRESHOLD:
+            self._trip()
+        self.probing = False
+
+    def release(self) -> None:
+        """Sonucu bilinmeyen (iptal edilen) çağrı half-open probe hakkını geri verir."""
+        self.probing = False
+
+    def _trip(self) -> None:
+        self.state = OPEN
+        self.opened_at = time.monotonic()
+        self.stats["trips"] += 1
+        log.warning("Circuit opened for %s for %.0fs: %s", self.name, self.open_sec, self.last_error)
+
+    def _sample(self, latency: float, cls: str) -> None:
+        window = self._latencies.get(cls)
+        if window is None:
+            window = self._latencies[cls] = deque(maxlen=WINDOW)
+        window.append(latency)
+        self._p99.pop(cls, None)
+
+    def retry_in(self) -> float:
+        if self.state != OPEN:
+            return 0.0
+        return max(0.0, self.open_sec - (time.monotonic() - self.opened_at))
+
+    def _percentiles(self, cls: str) -> Dict[str, Optional[float]]:
+        ordered = sorted(self._latencies[cls])
+        pct = lambda p: round(ordered[min(len(ordered) - 1, int(len(ordered) * p))] * 1000, 1)
+        return {"p50_ms": pct(0.5), "p99_ms": pct(0.99)}
+
+    def status(self, ceiling: Optional[float] = None) -> Dict[str, Any]:
+        """Sınıflar farklı dağılımlardır (health sorgusu ms, range saniyeler): yüzdelikler ayrı raporlanır."""
+        classes = sorted(cls for cls, window in self._latencies.items() if window)
+        state = self.state
+        if state == OPEN and self.retry_in() == 0:
+            state = HALF_OPEN
+        return {
+            "state":        state,
+            "failures":     self.failures,
+            "retry_in_sec": round(self.retry_in(), 1),
+            "last_error":   self.last_error,
+            "latency":      {cls or "default": self._percentiles(cls) for cls in classes},
+            "timeouts":     {cls or "default": round(self.timeout(ceiling, cls), 2)
+                             for cls in classes} if ceiling else {},
+            **self.stats,
+        }
+
+
+class BreakerRegistry:
+    """(tür, hedef) başına breaker: ("prometheus", cluster) / ("ocp", ocp_api)."""
+
+    def __init__(self):
+        self._breakers: Dict[Tuple[str, str], CircuitBreaker] = {}
+
+    def get(self, kind: str, target: str) -> CircuitBreaker:
+        key = (kind, target.rstrip("/"))
+        br = self._breakers.get(key)
+        if br is None:
+            br = self._breakers[key] = CircuitBreaker(f"{kind}:{target or 'global'}")
+        return br
+
+    def peek(self, kind: str, target: str) -> Optional[CircuitBreaker]:
+        return self._breakers.get((kind, target.rstrip("/")))
+
+    def state(self, kind: str, target: str) -> str:
+        br = self.peek(kind, target)
+        return br.status()["state"] if br is not None else CLOSED
+
+    def clear(self) -> None:
+        self._breakers.clear()
+
+    def samples(self):
+        for (kind, target), br in list(self._breakers.items()):
+            yield {"kind": kind, "target": target or "global"}, 0 if br.status()["state"] == CLOSED else 1
+
+
+breakers = BreakerRegistry()
+
+registry.gauge("observe_circuit_open", "Upstream circuit breaker açık / half-open ise 1.", breakers.samples)
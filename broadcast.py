@@ -0,0 +1,125 @@
+import asyncio
+import logging
+from typing import Any, Awaitable, Callable, Dict, List, Set, Tuple
+
+from encoding import content_etag
+
+log = logging.getLogger("alarmfw.observe.broadcast")
+
+# (section, key) için yeni snapshot üretir
+Produce  = Callable[[str, str], Awaitable[Dict[str, Any]]]
+# section için yenileme aralığı (sn)
+Interval = Callable[[str], float]
+
+
+class Subscriber:
+    """
+    Tek bir izleyici. Section başına yalnızca en son frame tutulur: istemci yavaşsa
+    gönderilmemiş eski frame yenisiyle ezilir (dropped sayılır), kuyruk büyümez.
+    """
+
+    def __init__(self):
+        self.pending: Dict[str, Dict[str, Any]] = {}
+        self.dropped = 0
+        self._event = asyncio.Event()
+
+    def offer(self, section: str, frame: Dict[str, Any]) -> None:
+        if section in self.pending:
+            self.dropped += 1
+        self.pending[section] = frame
+        self._event.set()
+
+    async def next(self, timeout: float) -> List[Tuple[str, Dict[str, Any]]]:
+        """Bekleyen frame'leri döner; timeout dolarsa boş liste (heartbeat zamanı)."""
+        if not self.pending:
+            try:
+                await asyncio.wait_for(self._event.wait(), timeout)
+            except asyncio.TimeoutError:
+                return []
+        self._event.clear()
+        frames, self.pending = list(self.pending.items()), {}
+        return frames
+
+
+class _Channel:
+    """Tek key (cluster) için section başına yenileme task'ı + son yayınlanan frame'ler."""
+
+    def __init__(self):
+        self.subscribers: Set[Subscriber] = set()
+        self.last: Dict[str, Tuple[str, Dict[str, Any]]] = {}
+        self.tasks: List[asyncio.Task] = []
+
+
+class Broadcaster:
+    """
+    Key (cluster) başına tek yenileme döngüsünü tüm izleyicilere paylaştırır.
+    İlk izleyici gelince section task'ları başlar, son izleyici ayrılınca durur.
+    Snapshot yalnızca içeriği (VOLATILE_KEYS hariç) değiştiğinde yayınlanır.
+    """
+
+    def __init__(self, sections: Dict[str, Produce], interval: Interval):
+        self.sections = sections
+        self.interval = interval
+        self._channels: Dict[str, _Channel] = {}
+        self.stats = {"published": 0, "unchanged": 0, "errors": 0}
+
+    def subscribe(self, key: str) -> Subscriber:
+        ch = self._channels.get(key)
+        if ch is None:
+            ch = self._channels[key] = _Channel()
+        sub = Subscriber()
+        # Yeni izleyici ilk yenilemeyi beklemeden son durumu alır
+        for section, (_, frame) in ch.last.items():
+            sub.offer(section, frame)
+        ch.subscribers.add(sub)
+        if not ch.tasks:
+            loop = asyncio.get_running_loop()
+            ch.tasks = [loop.create_task(self._run(key, ch, section)) for section in self.sections]
+        return sub
+
+    def unsubscribe(self, key: str, sub: Subscriber) -> None:
+        ch = self._channels.get(key)
+        if ch is None:
+            return
+        ch.subscribers.discard(sub)
+        if not ch.subscribers:
+            for task in ch.tasks:
+                task.cancel()
+            del self._channels[key]
+
+    async def _run(self, key: str, ch: _Channel, section: str) -> None:
+        produce = self.sections[section]
+        while True:
+            try:
+                self._publish(ch, section, await produce(section, key))
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self.stats["errors"] += 1
+                log.warning("Broadcast refresh failed key=%s section=%s: %s", key, section, e)
+            await asyncio.sleep(self.interval(section))
+
+    def _publish(self, ch: _Channel, section: str, frame: Dict[str, Any]) -> None:
+        etag = content_etag(frame)
+        prev = ch.last.get(section)
+        if prev is not None and prev[0] == etag:
+            self.stats["unchanged"] += 1
+            return
+        ch.last[section] = (etag, frame)
+        self.stats["published"] += 1
+        for sub in list(ch.subscribers):
+            sub.offer(section, frame)
+
+    def status(self) -> Dict[str, Any]:
+        return {
+            "channels": {
+                key: {"subscribers": len(ch.subscribers), "dropped": sum(s.dropped for s in ch.subscribers)}
+                for key, ch in self._channels.items()
+            },
+            **self.stats,
+        }
+
+    def samples(self):
+        for key, ch in list(self._channels.items()):
+            yield {"cluster": key or "global"}, len(ch.subscribers)
+
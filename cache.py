@@ -0,0 +1,94 @@
+import time
+import asyncio
+import logging
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional, Tuple
+
+from telemetry import registry
+
+log = logging.getLogger("alarmfw.observe.cache")
+
+
+class TTLCache:
+    """
+    Async TTL cache + single-flight.
+    Aynı anahtar için eşzamanlı N istek tek bir upstream çağrısına indirgenir;
+    başarılı sonuçlar ttl süresince bellekte tutulur.
+    """
+
+    def __init__(self, max_entries: int = 2048):
+        self.max_entries = max_entries
+        self._data: "OrderedDict[Hashable, Tuple[float, Any]]" = OrderedDict()
+        self._inflight: Dict[Hashable, asyncio.Future] = {}
+        self.stats = {"hits": 0, "misses": 0, "coalesced": 0}
+
+    def peek(self, key: Hashable, ttl: float) -> Optional[Tuple[Any, float]]:
+        """Taze kayıt varsa (değer, yaş_sn) döner."""
+        entry = self._data.get(key)
+        if entry is None:
+            return None
+        age = time.monotonic() - entry[0]
+        if age > ttl:
+            return None
+        return entry[1], age
+
+    def put(self, key: Hashable, value: Any) -> None:
+        self._data[key] = (time.monotonic(), value)
+        self._data.move_to_end(key)
+        while len(self._data) > self.max_entries:
+            self._data.popitem(last=False)
+
+    async def get_or_fetch(
+        self,
+        key: Hashable,
+        ttl: float,
+        fetch: Callable[[], Awaitable[Any]],
+        cacheable: Callable[[Any], bool] = lambda v: True,
+    ) -> Tuple[Any, float]:
+        """(değer, yaş_sn) döner. Süresi dolmuşsa fetch tek sefer çalışır, bekleyenler onu paylaşır."""
+        if ttl > 0:
+            hit = self.peek(key, ttl)
+            if hit is not None:
+                self.stats["hits"] += 1
+                return hit
+
+        task = self._inflight.get(key)
+        if task is not None:
+            self.stats["coalesced"] += 1
+        else:
+            self.stats["misses"] += 1
+            task = asyncio.ensure_future(fetch())
+            self._inflight[key] = task
+
+            def _done(t: asyncio.Future, key=key) -> None:
+                if self._inflight.get(key) is t:
+                    del self._inflight[key]
+                if ttl > 0 and not t.cancelled() and t.exception() is None and cacheable(t.result()):
+                    self.put(key, t.result())
+
+            task.add_done_callback(_done)
+
+        # shield: bir bekleyenin timeout/iptali ortak fetch'i iptal etmesin
+        value = await asyncio.shield(task)
+        return value, 0.0
+
+    def clear(self) -> None:
+        self._data.clear()
+
+    def snapshot_stats(self) -> Dict[str, Any]:
+        total = self.stats["hits"] + self.stats["misses"] + self.stats["coalesced"]
+        return {
+            **self.stats,
+            "entries":   len(self._data),
+            "inflight":  len(self._inflight),
+            "hit_ratio": round((self.stats["hits"] + self.stats["coalesced"]) / total, 4) if total else 0.0,
+        }
+
+
+# Prometheus instant query sonuçları: (cluster, path, query) → sonuç
+query_cache = TTLCache()
+
+registry.gauge(
+    "observe_query_cache", "Instant query cache istatistikleri (stat label'ı ile; hit_ratio dahil).",
+    lambda: [({"stat": k}, v) for k, v in query_cache.snapshot_stats().items()],
+)
@@ -1,7 +1,10 @@
 import os
+import time
 import logging
+import threading
+from dataclasses import dataclass, field
 from pathlib import Path
-from typing import Any, Dict, List
+from typing import Any, Dict, List, Optional, Tuple
 import yaml
 
 ALARMFW_CONFIG  = Path(os.getenv("ALARMFW_CONFIG",  "/home/cnbrkgrcn/projects/alarmfw/config"))
@@ -10,6 +13,19 @@ ALARMFW_SECRETS = Path(os.getenv("ALARMFW_SECRETS", "/home/cnbrkgrcn/alarmfw-sec
 OCP_CONF_DIR = ALARMFW_CONFIG / "generated"
 OBSERVE_CONF = ALARMFW_CONFIG / "observe.yaml"
 DEFAULT_PROM_TIMEOUT_SEC = 20
+DEFAULT_SCHEDULER_INTERVALS = {
+    "overview":     30,
+    "alerts":       15,
+    "nodes":        15,
+    "workload":     15,
+    "capacity":     30,
+    "controlplane": 30,
+}
+DEFAULT_SCHEDULER_JITTER_SEC = 2.0
+DEFAULT_WATCH_IDLE_SEC       = 300
+DEFAULT_WATCH_SYNC_SEC       = 10
+# Dosya imzaları (inode/mtime/size) en fazla bu aralıkla kontrol edilir
+CONFIG_CHECK_INTERVAL_SEC = float(os.getenv("CONFIG_CHECK_INTERVAL_SEC", "2"))
 
 log = logging.getLogger("alarmfw.observe.config")
 
@@ -26,25 +42,68 @@ def _load_yaml(path: Path) -> Dict[str, Any]:
         return {}
 
 
+def _file_sig(path: Path) -> Optional[Tuple[int, int, int]]:
+    """Dosya değişim imzası: (inode, mtime_ns, size). Dosya yoksa None."""
+    try:
+        st = path.stat()
+    except OSError:
+        return None
+    return (st.st_ino, st.st_mtime_ns, st.st_size)
+
+
+# ── Secret cache ───────────────────────────────────────────────────────────────
+
+_secret_lock = threading.Lock()
+_secret_cache: Dict[str, Tuple[Optional[Tuple[int, int, int]], str]] = {}
+
+
 def _read_secret(path: Path) -> str:
-    if not path.exists():
+    """Token dosyasını okur; dosya imzası değişmedikçe önbellekteki değeri döner."""
+    sig = _file_sig(path)
+    if sig is None:
+        with _secret_lock:
+            _secret_cache.pop(str(path), None)
         return ""
+    with _secret_lock:
+        cached = _secret_cache.get(str(path))
+    if cached and cached[0] == sig:
+        return cached[1]
     try:
-        return path.read_text(encoding="utf-8").strip()
+        value = path.read_text(encoding="utf-8").strip()
     except Exception as e:
         log.warning("Secret read failed for '%s': %s", path, e)
         return ""
+    with _secret_lock:
+        _secret_cache[str(path)] = (sig, value)
+    return value
 
 
-def _load_observe_yaml() -> Dict[str, Any]:
-    if not OBSERVE_CONF.exists():
-        return {}
-    return _load_yaml(OBSERVE_CONF)
+# ── Config snapshot ────────────────────────────────────────────────────────────
+
+@dataclass(frozen=True)
+class ConfigSnapshot:
+    """observe.yaml + generated/*.yaml'ın çözümlenmiş, değişmez hali."""
+    signature:        Tuple[Any, ...]
+    observe:          Dict[str, Any]                   = field(default_factory=dict)
+    observe_clusters: Tuple[Dict[str, Any], ...]       = ()
+    clusters:         Dict[str, Dict[str, Any]]        = field(default_factory=dict)
+    loaded_at:        float                            = 0.0
 
 
-def _observe_clusters_list() -> List[Dict[str, Any]]:
+_snapshot_lock = threading.Lock()
+_snapshot: Optional[ConfigSnapshot] = None
+_snapshot_checked_at = 0.0
+
+
+def _config_signature() -> Tuple[Any, ...]:
+    generated: Tuple[Any, ...] = ()
+    if OCP_CONF_DIR.exists():
+        generated = tuple((f.name, _file_sig(f)) for f in sorted(OCP_CONF_DIR.glob("*.yaml")))
+    return (_file_sig(OBSERVE_CONF), generated)
+
+
+def _parse_observe_clusters(obs: Dict[str, Any]) -> List[Dict[str, Any]]:
     """observe.yaml'dan cluster listesini döner (list veya dict formatını destekler)."""
-    obs = _load_observe_yaml()
     raw = obs.get("clusters") or []
     if isinstance(raw, list):
         return [c for c in raw if isinstance(c, dict) and c.get("name")]
@@ -52,16 +111,15 @@ def _observe_clusters_list() -> List[Dict[str, Any]]:
     return [{"name": k, **v} for k, v in raw.items()]
 
 
-def get_clusters() -> Dict[str, Dict[str, Any]]:
+def _build_clusters(observe_clusters: List[Dict[str, Any]]) -> Dict[str, Dict[str, Any]]:
     """
     generated/ yaml'larından ocp_pod_health clusterlarını toplar.
     observe.yaml varsa Prometheus URL ve overrideları birleştirir.
-    Döner: {cluster_name: {name, ocp_api, insecure, token_file, prometheus_url, prometheus_token_file, loki_url}}
     """
     clusters: Dict[str, Dict[str, Any]] = {}
 
     if OCP_CONF_DIR.exists():
-        for f in OCP_CONF_DIR.glob("*.yaml"):
+        for f in sorted(OCP_CONF_DIR.glob("*.yaml")):
             data = _load_yaml(f)
             for check in data.get("checks", []) or []:
                 if not check.get("enabled", True):
@@ -82,7 +140,7 @@ def get_clusters() -> Dict[str, Dict[str, Any]]:
                     "loki_url":              "",
                 }
 
-    for cdata in _observe_clusters_list():
+    for cdata in observe_clusters:
         cname = cdata["name"]
         if cname in clusters:
             clusters[cname].update(cdata)
@@ -100,6 +158,68 @@ def get_clusters() -> Dict[str, Dict[str, Any]]:
     return clusters
 
 
+def _build_snapshot(signature: Tuple[Any, ...]) -> ConfigSnapshot:
+    obs = _load_yaml(OBSERVE_CONF) if OBSERVE_CONF.exists() else {}
+    observe_clusters = _parse_observe_clusters(obs)
+    return ConfigSnapshot(
+        signature=signature,
+        observe=obs,
+        observe_clusters=tuple(observe_clusters),
+        clusters=_build_clusters(observe_clusters),
+        loaded_at=time.time(),
+    )
+
+
+def get_snapshot(force: bool = False) -> ConfigSnapshot:
+    """
+    Güncel config snapshot'ı. Dosyalar en fazla CONFIG_CHECK_INTERVAL_SEC'de bir
+    stat edilir; YAML yalnızca bir dosyanın imzası değiştiğinde yeniden parse edilir.
+    """
+    global _snapshot, _snapshot_checked_at
+    now = time.monotonic()
+    snap = _snapshot
+    if not force and snap is not None and now - _snapshot_checked_at < CONFIG_CHECK_INTERVAL_SEC:
+        return snap
+    with _snapshot_lock:
+        snap = _snapshot
+        if not force and snap is not None and now - _snapshot_checked_at < CONFIG_CHECK_INTERVAL_SEC:
+            return snap
+        signature = _config_signature()
+        if force or snap is None or snap.signature != signature:
+            snap = _build_snapshot(signature)
+            _snapshot = snap
+            log.info("Config snapshot reloaded (%d clusters)", len(snap.clusters))
+        _snapshot_checked_at = time.monotonic()
+        return snap
+
+
+def reload_config() -> Dict[str, Any]:
+    """Snapshot'ı ve secret önbelleğini zorla yeniler."""
+    with _secret_lock:
+        _secret_cache.clear()
+    snap = get_snapshot(force=True)
+    return {"ok": True, "clusters": len(snap.clusters), "loaded_at": snap.loaded_at}
+
+
+def _load_observe_yaml() -> Dict[str, Any]:
+    return get_snapshot().observe
+
+
+def _observe_cluster(cluster_name: str) -> Optional[Dict[str, Any]]:
+    for c in get_snapshot().observe_clusters:
+        if c.get("name") == cluster_name:
+            return c
+    return None
+
+
+def get_clusters() -> Dict[str, Dict[str, Any]]:
+    """
+    Çözümlenmiş cluster haritası (snapshot'tan kopya).
+    Döner: {cluster_name: {name, ocp_api, insecure, token_file, prometheus_url, prometheus_token_file, loki_url}}
+    """
+    return {name: dict(c) for name, c in get_snapshot().clusters.items()}
+
+
 def get_token(cluster_name: str) -> str:
     """OCP API token'ı (/secrets/<cluster>.token)"""
     return _read_secret(ALARMFW_SECRETS / f"{cluster_name}.token")
@@ -167,27 +287,21 @@ def get_global_prometheus_timeout_sec() -> int:
 
 def get_cluster_prometheus_url(cluster_name: str) -> str:
     """Per-cluster Prometheus URL — observe.yaml'dan."""
-    for c in _observe_clusters_list():
-        if c.get("name") == cluster_name:
-            return c.get("prometheus_url", "").strip()
-    return ""
+    c = _observe_cluster(cluster_name)
+    return (c.get("prometheus_url") or "").strip() if c else ""
 
 
 def get_cluster_prometheus_insecure(cluster_name: str) -> bool:
     """Per-cluster Prometheus TLS doğrulama kapatma flag'i — observe.yaml'dan."""
-    for c in _observe_clusters_list():
-        if c.get("name") == cluster_name:
-            return _is_true(str(c.get("insecure", False)))
-    return False
+    c = _observe_cluster(cluster_name)
+    return _is_true(str(c.get("insecure", False))) if c else False
 
 
 def get_cluster_prometheus_token(cluster_name: str) -> str:
     """Per-cluster Prometheus token — token_file veya varsayılan dosyadan okur."""
-    for c in _observe_clusters_list():
-        if c.get("name") == cluster_name:
-            token_file = c.get("prometheus_token_file", "")
-            if token_file:
-                return _read_secret(Path(token_file))
+    c = _observe_cluster(cluster_name)
+    if c and c.get("prometheus_token_file"):
+        return _read_secret(Path(c["prometheus_token_file"]))
     # fallback: /secrets/<cluster>-prometheus.token
     return _read_secret(ALARMFW_SECRETS / f"{cluster_name}-prometheus.token")
 
@@ -218,6 +332,78 @@ def get_auth_status() -> Dict[str, Any]:
     }
 
 
+# ── Health scheduler ───────────────────────────────────────────────────────────
+
+def _positive_float(raw: Any, default: float, name: str) -> float:
+    try:
+        val = float(raw)
+    except (TypeError, ValueError):
+        log.warning("Invalid %s='%s', using default=%s", name, raw, default)
+        return default
+    return val if val > 0 else default
+
+
+def get_scheduler_config() -> Dict[str, Any]:
+    """
+    Arka plan health snapshot scheduler ayarları — observe.yaml global.scheduler:
+      enabled: true
+      jitter_sec: 2
+      intervals: {overview: 30, alerts: 15, nodes: 15, workload: 15, capacity: 30, controlplane: 30}
+    Öncelik (enabled): HEALTH_SCHEDULER env > observe.yaml
+    """
+    obs = _load_observe_yaml()
+    sched = ((obs.get("global") or {}).get("scheduler") or {})
+
+    env_val = os.getenv("HEALTH_SCHEDULER")
+    enabled = _is_true(env_val) if env_val is not None else _is_true(str(sched.get("enabled", "")))
+
+    raw_intervals = sched.get("intervals") or {}
+    intervals = {
+        section: _positive_float(
+            raw_intervals.get(section, default), default, f"global.scheduler.intervals.{section}",
+        )
+        for section, default in DEFAULT_SCHEDULER_INTERVALS.items()
+    }
+    jitter = sched.get("jitter_sec", DEFAULT_SCHEDULER_JITTER_SEC)
+    return {
+        "enabled":    enabled,
+        "jitter_sec": _positive_float(jitter, DEFAULT_SCHEDULER_JITTER_SEC, "global.scheduler.jitter_sec")
+                      if jitter else 0.0,
+        "intervals":  intervals,
+    }
+
+
+def get_prometheus_targets() -> List[str]:
+    """Prometheus'u tanımlı cluster adları; global Prometheus varsa "" de dahildir."""
+    targets = [""] if get_global_prometheus_url() else []
+    targets += [name for name in get_clusters() if get_cluster_prometheus_url(name)]
+    return targets
+
+
+# ── OCP watch cache ────────────────────────────────────────────────────────────
+
+def get_watch_cache_config() -> Dict[str, Any]:
+    """
+    Pod/event watch cache ayarları — observe.yaml global.watch_cache:
+      enabled: true
+      idle_sec: 300        # bu süre okunmayan namespace'in watch'u kapatılır
+      sync_timeout_sec: 10 # ilk LIST bu sürede bitmezse doğrudan API'ye düşülür
+    Öncelik (enabled): OCP_WATCH_CACHE env > observe.yaml
+    """
+    obs = _load_observe_yaml()
+    wc = ((obs.get("global") or {}).get("watch_cache") or {})
+
+    env_val = os.getenv("OCP_WATCH_CACHE")
+    enabled = _is_true(env_val) if env_val is not None else _is_true(str(wc.get("enabled", "")))
+    return {
+        "enabled":          enabled,
+        "idle_sec":         _positive_float(wc.get("idle_sec", DEFAULT_WATCH_IDLE_SEC),
+                                            DEFAULT_WATCH_IDLE_SEC, "global.watch_cache.idle_sec"),
+        "sync_timeout_sec": _positive_float(wc.get("sync_timeout_sec", DEFAULT_WATCH_SYNC_SEC),
+                                            DEFAULT_WATCH_SYNC_SEC, "global.watch_cache.sync_timeout_sec"),
+    }
+
+
 # ── Loki (ileride) ─────────────────────────────────────────────────────────────
 
 def get_loki_token(cluster_name: str) -> str:
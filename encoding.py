@@ -0,0 +1,179 @@
+import os
+import gzip
+import json
+import hashlib
+from typing import Any, Dict, List, Optional
+
+from fastapi.responses import JSONResponse
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - requirements.txt'te var; yoksa stdlib json
+    orjson = None
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - brotli opsiyonel; yoksa yalnızca gzip
+    brotli = None
+
+# Bu boyutun altındaki yanıtlar sıkıştırılmaz (CPU'ya değmez)
+COMPRESS_MIN_BYTES = int(os.getenv("COMPRESS_MIN_BYTES", "1024"))
+GZIP_LEVEL         = int(os.getenv("GZIP_LEVEL", "5"))
+BROTLI_QUALITY     = int(os.getenv("BROTLI_QUALITY", "4"))
+
+# Her yenilemede değişen meta alanlar (üst seviyede ya da fleet / batch sonuçlarında iç içe);
+# ETag bunlar hariç içerikten hesaplanır, böylece veri değişmediği sürece poll'lar 304 alır
+VOLATILE_KEYS = frozenset({"cache_age_sec", "age", "age_sec", "duration_ms", "latency_ms", "cache"})
+# Label kümeleri veri sayılır: "age" / "cache" adlı bir label atılmaz
+_OPAQUE_KEYS = frozenset({"metric"})
+
+
+def dumps(content: Any) -> bytes:
+    if orjson is not None:
+        # NaN/Inf → null (stdlib json allow_nan=False ile hata verirdi)
+        return orjson.dumps(content, option=orjson.OPT_NON_STR_KEYS)
+    return json.dumps(content, ensure_ascii=False, allow_nan=False, separators=(",", ":")).encode("utf-8")
+
+
+def _etag(body: bytes) -> str:
+    return 'W/"' + hashlib.blake2b(body, digest_size=12).hexdigest() + '"'
+
+
+def _strip_volatile(value: Any) -> Any:
+    """VOLATILE_KEYS'i iç içe dict'lerden atar; atılacak alan yoksa aynı nesneyi döner.
+    Dict içermeyen listeler (örnek / zaman dizileri) taranmaz.
+    """
+    if isinstance(value, dict):
+        out, changed = {}, False
+        for k, v in value.items():
+            if k in VOLATILE_KEYS:
+                changed = True
+                continue
+            nv = v if k in _OPAQUE_KEYS else _strip_volatile(v)
+            changed = changed or nv is not v
+            out[k] = nv
+        return out if changed else value
+    if isinstance(value, list) and value and isinstance(value[0], dict):
+        out_list = [_strip_volatile(v) for v in value]
+        return out_list if any(a is not b for a, b in zip(out_list, value)) else value
+    return value
+
+
+def content_etag(content: Any, body: Optional[bytes] = None) -> str:
+    """VOLATILE_KEYS hariç içerik hash'i; body verilirse (content'in serileştirilmiş hali) yeniden kullanılır."""
+    stripped = _strip_volatile(content)
+    if stripped is not content:
+        return _etag(dumps(stripped))
+    return _etag(body if body is not None else dumps(content))
+
+
+class FastJSONResponse(JSONResponse):
+    """orjson ile serileştirilen JSON yanıtı; içerik hash'i ETag olarak eklenir."""
+
+    def render(self, content: Any) -> bytes:
+        body = dumps(content)
+        self.etag = content_etag(content, body)
+        return body
+
+    def init_headers(self, headers: Optional[Dict[str, str]] = None) -> None:
+        super().init_headers(headers)
+        etag = getattr(self, "etag", None)
+        if etag and not any(k == b"etag" for k, _ in self.raw_headers):
+            self.raw_headers.append((b"etag", etag.encode("latin-1")))
+
+
+def _accepted(header: str) -> List[str]:
+    """Accept-Encoding'den q>0 olan kodlamalar."""
+    out = []
+    for part in header.split(","):
+        name, _, params = part.strip().partition(";")
+        q = 1.0
+        if params.strip().startswith("q="):
+            try:
+                q = float(params.strip()[2:])
+            except ValueError:
+                q = 0.0
+        if name and q > 0:
+            out.append(name.strip().lower())
+    return out
+
+
+def _etag_matches(if_none_match: str, etag: str) -> bool:
+    if if_none_match.strip() == "*":
+        return True
+    weak = lambda t: t.strip().removeprefix("W/")
+    return weak(etag) in {weak(t) for t in if_none_match.split(",")}
+
+
+class CompressionMiddleware:
+    """
+    Saf ASGI middleware (tek parça yanıtlar için):
+      - ETag'i If-None-Match ile eşleşen GET yanıtları 304 olarak gövdesiz döner
+      - COMPRESS_MIN_BYTES üzerindeki gövdeler br (varsa) veya gzip ile sıkıştırılır
+    Stream yanıtlar (log stream, SSE) olduğu gibi geçer.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        req_headers = {k.decode("latin-1"): v.decode("latin-1") for k, v in scope.get("headers") or []}
+        accepted = _accepted(req_headers.get("accept-encoding", ""))
+        if_none_match = req_headers.get("if-none-match", "")
+        cacheable = scope.get("method") in ("GET", "HEAD")
+        state: Dict[str, Any] = {"start": None, "passthrough": False}
+
+        async def _send(message):
+            if state["passthrough"]:
+                await send(message)
+                return
+            if message["type"] == "http.response.start":
+                state["start"] = message
+                return
+            if message["type"] != "http.response.body":
+                await send(message)
+                return
+            start = state["start"]
+            if message.get("more_body", False):
+                # Stream yanıt: dokunma
+                state["passthrough"] = True
+                await send(start)
+                await send(message)
+                return
+            await self._finish(start, message.get("body", b""), accepted, if_none_match, cacheable, send)
+
+        await self.app(scope, receive, _send)
+
+    @staticmethod
+    async def _finish(start, body: bytes, accepted, if_none_match: str, cacheable: bool, send) -> None:
+        headers = [(k, v) for k, v in start.get("headers", [])]
+        names = {k.lower() for k, _ in headers}
+        status = start["status"]
+        etag = next((v.decode("latin-1") for k, v in headers if k.lower() == b"etag"), "")
+
+        if cacheable and status == 200 and etag and if_none_match and _etag_matches(if_none_match, etag):
+            keep = {b"etag", b"cache-control", b"vary"}
+            await send({"type": "http.response.start", "status": 304,
+                        "headers": [(k, v) for k, v in headers if k.lower() in keep]})
+            await send({"type": "http.response.body", "body": b""})
+            return
+
+        encoding = None
+        if len(body) >= COMPRESS_MIN_BYTES and b"content-encoding" not in names:
+            if "br" in accepted and brotli is not None:
+                encoding, body = "br", brotli.compress(body, quality=BROTLI_QUALITY)
+            elif "gzip" in accepted:
+                encoding, body = "gzip", gzip.compress(body, compresslevel=GZIP_LEVEL, mtime=0)
+        if encoding:
+            vary = [v for k, v in headers if k.lower() == b"vary"]
+            headers = [(k, v) for k, v in headers if k.lower() not in (b"content-length", b"vary")]
+            headers += [
+                (b"content-encoding", encoding.encode()),
+                (b"content-length", str(len(body)).encode()),
+                (b"vary", b", ".join(vary + [b"Accept-Encoding"])),
+            ]
+        await send({**start, "headers": headers})
+        await send({"type": "http.response.body", "body": body})
@@ -0,0 +1,271 @@
+import json
+import time
+import random
+import asyncio
+import logging
+from typing import Any, Dict, List, Optional, Tuple
+
+import httpx
+
+from config import get_watch_cache_config
+from upstream import http_get, http_stream
+
+log = logging.getLogger("alarmfw.observe.informer")
+
+WATCH_TIMEOUT_SEC = 300
+BACKOFF_MAX_SEC   = 30.0
+
+
+class _Gone(Exception):
+    """Watch resourceVersion çok eski (HTTP 410) — yeniden LIST gerekir."""
+
+
+def _strip(item: Dict[str, Any]) -> Dict[str, Any]:
+    """Bellekte tutulmayan alanları (managedFields) atar."""
+    meta = item.get("metadata")
+    if isinstance(meta, dict) and "managedFields" in meta:
+        item["metadata"] = {k: v for k, v in meta.items() if k != "managedFields"}
+    return item
+
+
+class Informer:
+    """
+    Tek bir namespace + resource (pods/events) için LIST + WATCH cache.
+    resourceVersion ile kaldığı yerden izler; 410 Gone gelirse yeniden LIST eder.
+    """
+
+    def __init__(self, ocp_api: str, insecure: bool, token: str, namespace: str, resource: str):
+        self.ocp_api   = ocp_api
+        self.insecure  = insecure
+        self.token     = token
+        self.namespace = namespace
+        self.resource  = resource
+        self.path      = f"/api/v1/namespaces/{namespace}/{resource}"
+
+        self.items: Dict[str, Dict[str, Any]] = {}
+        self.resource_version = ""
+        self.synced = asyncio.Event()
+        # İlk LIST denemesi bitti (başarılı ya da değil); bekleyenler hatada timeout'u beklemez
+        self.listed = asyncio.Event()
+        self.last_error: Optional[str] = None
+        self.last_access = time.monotonic()
+        self.stats = {"lists": 0, "watches": 0, "events": 0, "relists_410": 0, "errors": 0}
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self) -> None:
+        task, self._task = self._task, None
+        if task is not None:
+            task.cancel()
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+
+    def list(self) -> List[Dict[str, Any]]:
+        self.last_access = time.monotonic()
+        return list(self.items.values())
+
+    def get(self, name: str) -> Optional[Dict[str, Any]]:
+        self.last_access = time.monotonic()
+        return self.items.get(name)
+
+    async def _run(self) -> None:
+        backoff = 1.0
+        while True:
+            try:
+                await self._list()
+                backoff = 1.0
+                while True:
+                    await self._watch()
+            except asyncio.CancelledError:
+                raise
+            except _Gone:
+                self.stats["relists_410"] += 1
+                log.info("Watch expired (410) for %s%s — relisting", self.ocp_api, self.path)
+            except Exception as e:
+                self.stats["errors"] += 1
+                log.warning("Informer failed for %s%s: %s", self.ocp_api, self.path, e)
+                await asyncio.sleep(backoff + random.uniform(0, backoff / 2))
+                backoff = min(backoff * 2, BACKOFF_MAX_SEC)
+
+    async def _list(self) -> None:
+        try:
+            await self._fetch()
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            # Relist başarısızsa eldeki item'lar artık izlenmiyor — bayat veri sunulmaz
+            self.last_error = str(e) or type(e).__name__
+            self.synced.clear()
+            raise
+        finally:
+            self.listed.set()
+
+    async def _fetch(self) -> None:
+        resp = await http_get(
+            self.ocp_api, self.path,
+            token=self.token,
+            headers={"Accept": "application/json"},
+            timeout=30,
+            verify=not self.insecure,
+        )
+        resp.raise_for_status()
+        data = resp.json()
+        self.items = {
+            item.get("metadata", {}).get("name", ""): _strip(item)
+            for item in data.get("items", [])
+        }
+        self.resource_version = (data.get("metadata") or {}).get("resourceVersion", "")
+        self.stats["lists"] += 1
+        self.last_error = None
+        self.synced.set()
+
+    async def _watch(self) -> None:
+        params = {
+            "watch":               "1",
+            "resourceVersion":     self.resource_version,
+            "allowWatchBookmarks": "true",
+            "timeoutSeconds":      str(WATCH_TIMEOUT_SEC),
+        }
+        self.stats["watches"] += 1
+        async with http_stream(
+            self.ocp_api, self.path,
+            token=self.token,
+            headers={"Accept": "application/json"},
+            params=params,
+            timeout=httpx.Timeout(15, read=WATCH_TIMEOUT_SEC + 30),
+            verify=not self.insecure,
+            pool="watch",
+        ) as resp:
+            if resp.status_code == 410:
+                raise _Gone()
+            resp.raise_for_status()
+            async for line in resp.aiter_lines():
+                if line.strip():
+                    self._apply(json.loads(line))
+
+    def _apply(self, event: Dict[str, Any]) -> None:
+        etype = event.get("type")
+        obj   = event.get("object") or {}
+        if etype == "ERROR":
+            if obj.get("code") == 410:
+                raise _Gone()
+            raise RuntimeError(obj.get("message") or "watch error")
+        meta = obj.get("metadata") or {}
+        rv = meta.get("resourceVersion")
+        if rv:
+            self.resource_version = rv
+        if etype == "BOOKMARK":
+            return
+        self.stats["events"] += 1
+        name = meta.get("name", "")
+        if etype == "DELETED":
+            self.items.pop(name, None)
+        elif etype in ("ADDED", "MODIFIED"):
+            self.items[name] = _strip(obj)
+
+    def status(self) -> Dict[str, Any]:
+        return {
+            "namespace":        self.namespace,
+            "resource":         self.resource,
+            "synced":           self.synced.is_set(),
+            "last_error":       self.last_error,
+            "items":            len(self.items),
+            "resource_version": self.resource_version,
+            "idle_sec":         round(time.monotonic() - self.last_access, 1),
+            **self.stats,
+        }
+
+
+_InformerKey = Tuple[str, bool, str, str, str]
+
+
+class InformerRegistry:
+    """Görüntülenen namespace'ler için informer'ları başlatır, boşta kalanları kapatır."""
+
+    def __init__(self):
+        self._informers: Dict[_InformerKey, Informer] = {}
+        self._janitor: Optional[asyncio.Task] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    def enabled(self) -> bool:
+        return get_watch_cache_config()["enabled"]
+
+    def _ensure_loop(self) -> None:
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            # Önceki loop'un task'ları geçersiz (test / yeniden başlatma)
+            self._informers.clear()
+            self._janitor = None
+            self._loop = loop
+
+    async def items(
+        self, cluster: Dict[str, Any], token: str, namespace: str, resource: str,
+    ) -> Optional[List[Dict[str, Any]]]:
+        """
+        Cache'teki nesneler. Watch cache kapalıysa, ilk LIST sync_timeout_sec içinde
+        bitmezse veya son LIST başarısızsa None döner (çağıran doğrudan API'ye düşer).
+        """
+        inf = await self._synced(cluster, token, namespace, resource)
+        return inf.list() if inf is not None else None
+
+    async def get(
+        self, cluster: Dict[str, Any], token: str, namespace: str, resource: str, name: str,
+    ) -> Optional[Dict[str, Any]]:
+        inf = await self._synced(cluster, token, namespace, resource)
+        return inf.get(name) if inf is not None else None
+
+    async def _synced(
+        self, cluster: Dict[str, Any], token: str, namespace: str, resource: str,
+    ) -> Optional[Informer]:
+        cfg = get_watch_cache_config()
+        if not cfg["enabled"]:
+            return None
+        self._ensure_loop()
+        key = (cluster["ocp_api"], bool(cluster["insecure"]), token, namespace, resource)
+        inf = self._informers.get(key)
+        if inf is None:
+            inf = Informer(cluster["ocp_api"], cluster["insecure"], token, namespace, resource)
+            self._informers[key] = inf
+            inf.start()
+            if self._janitor is None or self._janitor.done():
+                self._janitor = asyncio.get_running_loop().create_task(self._evict_idle())
+        if not inf.listed.is_set():
+            try:
+                await asyncio.wait_for(inf.listed.wait(), cfg["sync_timeout_sec"])
+            except asyncio.TimeoutError:
+                return None
+        if not inf.synced.is_set():
+            # LIST hata veriyor: beklemeden düş; last_access yenilenmez, janitor kapatır
+            return None
+        return inf
+
+    async def _evict_idle(self) -> None:
+        while self._informers:
+            idle_sec = get_watch_cache_config()["idle_sec"]
+            await asyncio.sleep(min(idle_sec / 4, 30))
+            now = time.monotonic()
+            for key, inf in list(self._informers.items()):
+                if now - inf.last_access > idle_sec:
+                    del self._informers[key]
+                    await inf.stop()
+                    log.info("Informer evicted after %ss idle: %s", idle_sec, inf.path)
+
+    def status(self) -> List[Dict[str, Any]]:
+        return [inf.status() for inf in self._informers.values()]
+
+    async def close(self) -> None:
+        informers = list(self._informers.values())
+        self._informers.clear()
+        if self._janitor is not None:
+            self._janitor.cancel()
+            self._janitor = None
+        for inf in informers:
+            await inf.stop()
+
+
+informers = InformerRegistry()
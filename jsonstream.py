@@ -0,0 +1,146 @@
+import os
+import re
+import json
+from typing import Any, AsyncIterator, Callable, Dict, List, Optional
+
+try:
+    import orjson
+    _loads = orjson.loads
+except ImportError:  # pragma: no cover - requirements.txt'te var; yoksa stdlib json
+    _loads = json.loads
+
+# Bir sonraki yapısal parantez; aradaki string'ler (kaçışlarıyla) ve düz değerler tek seferde atlanır.
+# Possessive niceleyiciler geri izlemeyi engeller — tamamlanmamış string'de eşleşme doğrusal sürede başarısız olur.
+_STRING = rb'"(?:[^"\\]++|\\.)*+"'
+_NEXT_BRACKET = re.compile(rb'(?:' + _STRING + rb'|[^"{}\[\]]++)*+([{}\[\]])', re.S)
+
+
+def _nested(depth: int) -> bytes:
+    """En fazla depth seviye iç içe {…} / […] değeri (re özyineleme desteklemez; seviyeler açılır)."""
+    inner = b""
+    for _ in range(depth):
+        inner = rb'[{\[](?:' + _STRING + rb'|[^"{}\[\]]++' + (b"|" + inner if inner else b"") + rb')*+[}\]]'
+    return inner
+
+
+# Tamamı tamponda olan bir item tek regex eşleşmesiyle bulunur (hızlı yol); daha derin
+# ya da henüz yarım gelen item'lar parantez parantez taranır.
+_ITEM = re.compile(_nested(24), re.S)
+_ITEMS_KEY = re.compile(rb'"items"\s*:\s*$')
+
+# Bu boyutun altındaki gövdeler tek seferde çözülür (artımlı ayrıştırmanın CPU maliyetine değmez)
+STREAM_PARSE_MIN_BYTES = int(os.getenv("STREAM_PARSE_MIN_BYTES", str(1 << 20)))
+
+Projection = Dict[str, Any]
+
+
+def project(obj: Any, spec: Optional[Projection]) -> Any:
+    """
+    Nesneden yalnızca spec'teki alanları tutar; yapı (iç içe dict / list) korunur.
+    spec: alan → None (değeri olduğu gibi al) veya alt spec. Listelerde spec her elemana uygulanır.
+    """
+    if spec is None:
+        return obj
+    if isinstance(obj, list):
+        return [project(o, spec) for o in obj]
+    if not isinstance(obj, dict):
+        return obj
+    return {k: project(obj[k], sub) for k, sub in spec.items() if k in obj}
+
+
+class ListParser:
+    """
+    Kubernetes LIST yanıtı ({"metadata": ..., "items": [...]}) için artımlı ayrıştırıcı.
+    Gövde parça parça beslenir; items dizisindeki her nesne tamamlandığı anda çözülüp
+    project ile budanır. Bellekte en fazla bir ham nesne + budanmış sonuçlar tutulur.
+    Dizi dışındaki üst seviye alanlar (kind, metadata) küçüktür ve sonda bir kez çözülür.
+    """
+
+    def __init__(self, transform: Callable[[Any], Any]):
+        self.transform = transform
+        self.items: List[Any] = []
+        self._buf = bytearray()
+        self._pos = 0              # _buf içinde taranmamış ilk bayt
+        self._depth = 0
+        self._in_items = False
+        self._items_done = False
+        self._item_start = -1      # _buf içinde açık nesnenin başlangıcı
+        self._skeleton = bytearray()
+
+    def feed(self, chunk: bytes) -> None:
+        self._buf += chunk
+        buf, pos = self._buf, self._pos
+        while True:
+            m = _NEXT_BRACKET.match(buf, pos)
+            if m is None:
+                break
+            ch, at, pos = buf[m.start(1)], m.start(1), m.end()
+            if ch in b"{[":
+                self._depth += 1
+                if self._depth == 2 and ch == ord("[") and not self._in_items and not self._items_done:
+                    if _ITEMS_KEY.search((self._skeleton + buf[:at])[-64:]):
+                        self._in_items = True
+                        self._skeleton += buf[:at + 1]
+                        del buf[:at + 1]
+                        pos -= at + 1
+                elif self._depth == 3 and self._in_items:
+                    whole = _ITEM.match(buf, at)
+                    if whole is not None:
+                        self.items.append(self.transform(_loads(buf[at:whole.end()])))
+                        del buf[:whole.end()]
+                        pos = 0
+                        self._depth -= 1
+                    else:
+                        self._item_start = at
+            else:
+                if self._depth == 3 and self._in_items:
+                    self.items.append(self.transform(_loads(buf[self._item_start:at + 1])))
+                    del buf[:at + 1]
+                    pos -= at + 1
+                    self._item_start = -1
+                elif self._depth == 2 and self._in_items:
+                    self._in_items = False
+                    self._items_done = True
+                    # "items": [ ... ] → skeleton'da "items": []
+                    del buf[:at]
+                    pos -= at
+                self._depth -= 1
+        if not self._in_items and self._item_start < 0:
+            # items dışındaki (küçük) bölümü skeleton'a taşı
+            self._skeleton += buf[:pos]
+            del buf[:pos]
+            pos = 0
+        self._pos = pos
+
+    def close(self) -> Dict[str, Any]:
+        """Kalan gövdeyi tamamlar; {..üst seviye alanlar.., "items": [budanmış nesneler]} döner."""
+        if self._depth or self._in_items:
+            raise ValueError("LIST yanıtı eksik (JSON tamamlanmadı)")
+        data = _loads(self._skeleton + self._buf)
+        if not isinstance(data, dict):
+            raise ValueError("LIST yanıtı bir JSON nesnesi değil")
+        data["items"] = self.items
+        return data
+
+
+async def parse_list(chunks: AsyncIterator[bytes], spec: Optional[Projection] = None) -> Dict[str, Any]:
+    """Akan LIST gövdesini ayrıştırır; items spec'e göre budanır (spec=None → tam nesne).
+    Gövde STREAM_PARSE_MIN_BYTES'ı aşana kadar biriktirilir; aşmazsa tek seferde çözülür.
+    """
+    head = bytearray()
+    parser: Optional[ListParser] = None
+    async for chunk in chunks:
+        if parser is None:
+            head += chunk
+            if len(head) < STREAM_PARSE_MIN_BYTES:
+                continue
+            parser = ListParser(lambda item: project(item, spec))
+            chunk, head = bytes(head), bytearray()
+        parser.feed(chunk)
+    if parser is not None:
+        return parser.close()
+    data = _loads(head)
+    if not isinstance(data, dict):
+        raise ValueError("LIST yanıtı bir JSON nesnesi değil")
+    data["items"] = [project(item, spec) for item in data.get("items") or []]
+    return data
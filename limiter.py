@@ -0,0 +1,229 @@
+import os
+import asyncio
+import contextvars
+import logging
+from collections import OrderedDict, deque
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Deque, Dict, Optional
+
+from fastapi import HTTPException
+
+from telemetry import registry
+
+log = logging.getLogger("alarmfw.observe.limiter")
+
+# Tür başına (tüm cluster'lar) ve cluster başına aynı anda upstream'e giden istek sayısı
+PROM_MAX_CONCURRENCY         = int(os.getenv("PROM_MAX_CONCURRENCY", "64"))
+PROM_CLUSTER_MAX_CONCURRENCY = int(os.getenv("PROM_CLUSTER_MAX_CONCURRENCY", "16"))
+OCP_MAX_CONCURRENCY          = int(os.getenv("OCP_MAX_CONCURRENCY", "64"))
+OCP_CLUSTER_MAX_CONCURRENCY  = int(os.getenv("OCP_CLUSTER_MAX_CONCURRENCY", "16"))
+# Kuyruk sınırları: toplam kuyruk dolarsa 503, tek istemcinin kuyruğu dolarsa 429
+UPSTREAM_MAX_QUEUE           = int(os.getenv("UPSTREAM_MAX_QUEUE", "500"))
+UPSTREAM_CLIENT_MAX_QUEUE    = int(os.getenv("UPSTREAM_CLIENT_MAX_QUEUE", "100"))
+UPSTREAM_QUEUE_TIMEOUT_SEC   = float(os.getenv("UPSTREAM_QUEUE_TIMEOUT_SEC", "10"))
+
+# İsteği yapan istemci (ClientIdMiddleware doldurur); arka plan işleri "internal"
+client_id: contextvars.ContextVar[str] = contextvars.ContextVar("client_id", default="internal")
+
+
+class Overloaded(HTTPException):
+    """Upstream kuyruğu dolu — istek kuyruğa alınmadan reddedildi."""
+
+    def __init__(self, status_code: int, detail: str, retry_after: int = 1):
+        super().__init__(status_code, detail, headers={"Retry-After": str(retry_after)})
+
+
+class FairLimiter:
+    """
+    Tek upstream türü (prometheus / ocp) için eşzamanlılık sınırı.
+    Global ve hedef (cluster) başına slot sayısı sınırlıdır; slot bekleyenler hedef
+    başına, istemci başına FIFO kuyruklarda tutulur ve istemciler arasında sırayla
+    (round-robin) servis edilir — tek bir kullanıcının 100 sorgusu diğerlerini aç bırakmaz.
+    """
+
+    def __init__(
+        self,
+        kind: str,
+        global_limit: int,
+        target_limit: int,
+        max_queue: int = UPSTREAM_MAX_QUEUE,
+        client_max_queue: int = UPSTREAM_CLIENT_MAX_QUEUE,
+        queue_timeout: float = UPSTREAM_QUEUE_TIMEOUT_SEC,
+    ):
+        self.kind             = kind
+        self.global_limit     = global_limit
+        self.target_limit     = target_limit
+        self.max_queue        = max_queue
+        self.client_max_queue = client_max_queue
+        self.queue_timeout    = queue_timeout
+        self.stats = {"admitted": 0, "queued": 0, "shed_429": 0, "shed_503": 0, "queue_timeouts": 0}
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._reset()
+
+    def _reset(self) -> None:
+        self.active_total = 0
+        self.queued_total = 0
+        self._active: Dict[str, int] = {}
+        # hedef → (istemci → bekleyen future'lar); OrderedDict sırası round-robin sırasıdır
+        self._queues: "OrderedDict[str, OrderedDict[str, Deque[asyncio.Future]]]" = OrderedDict()
+
+    def _ensure_loop(self) -> None:
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            # Future'lar loop'a bağlı; önceki loop'un kuyrukları geçersiz (test / yeniden başlatma)
+            self._reset()
+            self._loop = loop
+
+    def _has_capacity(self, target: str) -> bool:
+        return self.active_total < self.global_limit and self._active.get(target, 0) < self.target_limit
+
+    def _grant(self, target: str) -> None:
+        self.active_total += 1
+        self._active[target] = self._active.get(target, 0) + 1
+        self.stats["admitted"] += 1
+
+    async def acquire(self, target: str) -> None:
+        self._ensure_loop()
+        if self._has_capacity(target) and not self._queues.get(target):
+            self._grant(target)
+            return
+        client = client_id.get()
+        if self.queued_total >= self.max_queue:
+            self.stats["shed_503"] += 1
+            raise Overloaded(503, f"{self.kind} upstream kuyruğu dolu ({self.queued_total} istek bekliyor)", 5)
+        clients = self._queues.setdefault(target, OrderedDict())
+        queue = clients.setdefault(client, deque())
+        if len(queue) >= self.client_max_queue:
+            self.stats["shed_429"] += 1
+            raise Overloaded(429, f"Çok fazla bekleyen {self.kind} isteği ({len(queue)})", 2)
+
+        fut = asyncio.get_running_loop().create_future()
+        queue.append(fut)
+        self.queued_total += 1
+        self.stats["queued"] += 1
+        try:
+            await asyncio.wait_for(asyncio.shield(fut), self.queue_timeout)
+        except BaseException as e:
+            if fut.done() and not fut.cancelled():
+                # Slot tam zaman aşımı/iptal anında verilmiş — geri bırak
+                self.release(target)
+            else:
+                fut.cancel()
+                self._forget(target, client, fut)
+            if isinstance(e, asyncio.TimeoutError):
+                self.stats["queue_timeouts"] += 1
+                raise Overloaded(503, f"{self.kind} upstream kuyruğunda {self.queue_timeout:.0f}s beklendi", 5)
+            raise
+
+    def _forget(self, target: str, client: str, fut: asyncio.Future) -> None:
+        clients = self._queues.get(target)
+        queue = clients.get(client) if clients else None
+        if queue is None:
+            return
+        try:
+            queue.remove(fut)
+            self.queued_total -= 1
+        except ValueError:
+            return
+        if not queue:
+            del clients[client]
+            if not clients:
+                del self._queues[target]
+
+    def release(self, target: str) -> None:
+        self.active_total -= 1
+        self._active[target] -= 1
+        if not self._active[target]:
+            del self._active[target]
+        self._dispatch()
+
+    def _dispatch(self) -> None:
+        """Boş slotları hedefler ve istemciler arasında sırayla dağıtır."""
+        progressed = True
+        while progressed and self.active_total < self.global_limit and self._queues:
+            progressed = False
+            for target in list(self._queues):
+                if not self._has_capacity(target):
+                    continue
+                clients = self._queues[target]
+                client, queue = next(iter(clients.items()))
+                fut = queue.popleft()
+                self.queued_total -= 1
+                # İstemciyi sonraya al (round-robin); hedefi de
+                if queue:
+                    clients.move_to_end(client)
+                else:
+                    del clients[client]
+                if clients:
+                    self._queues.move_to_end(target)
+                else:
+                    del self._queues[target]
+                if fut.done():
+                    progressed = True
+                    continue
+                self._grant(target)
+                fut.set_result(None)
+                progressed = True
+                break
+
+    @asynccontextmanager
+    async def slot(self, target: str) -> AsyncIterator[None]:
+        await self.acquire(target)
+        try:
+            yield
+        finally:
+            self.release(target)
+
+    def status(self) -> Dict[str, Any]:
+        return {
+            "kind":         self.kind,
+            "global_limit": self.global_limit,
+            "target_limit": self.target_limit,
+            "active":       self.active_total,
+            "queued":       self.queued_total,
+            "targets": {
+                t: {"active": self._active.get(t, 0),
+                    "queued": sum(len(q) for q in self._queues.get(t, {}).values())}
+                for t in sorted(set(self._active) | set(self._queues))
+            },
+            **self.stats,
+        }
+
+
+prometheus_limiter = FairLimiter("prometheus", PROM_MAX_CONCURRENCY, PROM_CLUSTER_MAX_CONCURRENCY)
+ocp_limiter        = FairLimiter("ocp", OCP_MAX_CONCURRENCY, OCP_CLUSTER_MAX_CONCURRENCY)
+
+
+class ClientIdMiddleware:
+    """İstemci kimliği: X-Observe-Client başlığı > X-Forwarded-For'un ilk adresi > bağlantı adresi."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        headers = dict(scope.get("headers") or [])
+        ident = headers.get(b"x-observe-client") or headers.get(b"x-forwarded-for", b"").split(b",")[0].strip()
+        if ident:
+            ident = ident.decode("latin-1")
+        else:
+            ident = (scope.get("client") or ("unknown",))[0]
+        token = client_id.set(ident)
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            client_id.reset(token)
+
+
+def _limiter_samples():
+    for lim in (prometheus_limiter, ocp_limiter):
+        st = lim.status()
+        yield {"kind": lim.kind, "state": "active"}, st["active"]
+        yield {"kind": lim.kind, "state": "queued"}, st["queued"]
+        yield {"kind": lim.kind, "state": "shed_429"}, st["shed_429"]
+        yield {"kind": lim.kind, "state": "shed_503"}, st["shed_503"]
+
+
+registry.gauge("observe_upstream_limiter", "Upstream eşzamanlılık sınırlayıcısı: aktif / kuyrukta / reddedilen.", _limiter_samples)
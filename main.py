@@ -1,11 +1,35 @@
 import os
+from contextlib import asynccontextmanager
 
+import anyio.to_thread
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import PlainTextResponse
 
-from routers import clusters, resources, metrics, health
+import upstream
+import telemetry
+from encoding import CompressionMiddleware, FastJSONResponse
+from limiter import ClientIdMiddleware
+from informer import informers
+from scheduler import scheduler
+from routers import clusters, resources, logs, metrics, health
 
-app = FastAPI(title="AlarmFW Observe", version="0.1.0")
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    scheduler.start()
+    yield
+    await scheduler.stop()
+    await informers.close()
+    await upstream.close_all()
+
+
+app = FastAPI(
+    title="AlarmFW Observe",
+    version="0.1.0",
+    lifespan=lifespan,
+    default_response_class=FastJSONResponse,
+)
 
 
 def _load_allow_origins() -> list[str]:
@@ -24,12 +48,43 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+app.add_middleware(CompressionMiddleware)
+app.add_middleware(ClientIdMiddleware)
+app.add_middleware(telemetry.MetricsMiddleware)
+
 app.include_router(clusters.router)
 app.include_router(resources.router)
+app.include_router(logs.router)
 app.include_router(metrics.router)
 app.include_router(health.router)
 
 
 @app.get("/api/health")
-def health():
+async def health():
     return {"status": "ok"}
+
+
+def _threadpool_usage():
+    """Sync endpoint'lerin çalıştığı anyio thread havuzu: kullanılan / toplam."""
+    limiter = anyio.to_thread.current_default_thread_limiter()
+    yield {"state": "busy"}, limiter.borrowed_tokens
+    yield {"state": "total"}, limiter.total_tokens
+    yield {"state": "waiting"}, limiter.statistics().tasks_waiting
+
+
+def _scheduler_failures():
+    for item in scheduler.status()["items"]:
+        yield {"cluster": item["cluster"], "section": item["section"]}, item["failures"]
+
+
+telemetry.registry.gauge("observe_threadpool_threads", "anyio thread havuzu doluluğu.", _threadpool_usage)
+telemetry.registry.gauge("observe_scheduler_failures", "Scheduler snapshot hata sayısı.", _scheduler_failures)
+telemetry.registry.gauge(
+    "observe_watch_cache_items", "Informer başına cache'teki nesne sayısı.",
+    lambda: (({"namespace": s["namespace"], "resource": s["resource"]}, s["items"]) for s in informers.status()),
+)
+
+
+@app.get("/metrics", include_in_schema=False)
+async def prometheus_metrics():
+    return PlainTextResponse(telemetry.registry.render(), media_type="text/plain; version=0.0.4")
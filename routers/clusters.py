@@ -1,17 +1,39 @@
 from fastapi import APIRouter
 from typing import Any, Dict, List
+from breaker import CLOSED, breakers
 from config import (
-    get_clusters, get_auth_status,
+    get_clusters, get_auth_status, reload_config,
     get_cluster_prometheus_url, get_cluster_prometheus_token,
+    get_global_prometheus_timeout_sec,
 )
+from upstream import pool_stats
+from limiter import ocp_limiter, prometheus_limiter
+from routers.resources import OCP_TIMEOUT_SEC
 
 router = APIRouter(prefix="/api/observe", tags=["observe"])
 
 
+def _breaker_status(kind: str, target: str, ceiling: float) -> Dict[str, Any]:
+    br = breakers.peek(kind, target)
+    if br is None:
+        return {"state": CLOSED, "failures": 0, "retry_in_sec": 0.0, "timeout_sec": ceiling}
+    return br.status(ceiling)
+
+
 @router.get("/auth")
 def auth_status() -> Dict[str, Any]:
-    """OCP cluster durumu. UI bu endpoint'i poll eder."""
-    return get_auth_status()
+    """OCP cluster durumu. UI bu endpoint'i poll eder.
+    breakers: cluster başına Prometheus / OCP circuit durumu; degraded: devresi kapalı olmayan cluster'lar.
+    """
+    states = {
+        name: {"prometheus": breakers.state("prometheus", name), "ocp": breakers.state("ocp", c["ocp_api"])}
+        for name, c in get_clusters().items()
+    }
+    return {
+        **get_auth_status(),
+        "breakers": states,
+        "degraded": sorted(name for name, st in states.items() if set(st.values()) != {CLOSED}),
+    }
 
 
 @router.get("/clusters")
@@ -31,5 +53,21 @@ def list_clusters() -> List[Dict[str, Any]]:
             "loki_url":             c.get("loki_url", ""),
             "loki_available":       bool(c.get("loki_url")),
             "prometheus_available": bool(prom_url and prom_token),
+            "breaker": {
+                "prometheus": _breaker_status("prometheus", cluster_name, get_global_prometheus_timeout_sec()),
+                "ocp":        _breaker_status("ocp", c["ocp_api"], OCP_TIMEOUT_SEC),
+            },
         })
     return result
+
+
+@router.post("/config/reload")
+def config_reload() -> Dict[str, Any]:
+    """observe.yaml / generated/ ve token dosyalarını beklemeden yeniden yükler."""
+    return reload_config()
+
+
+@router.get("/upstream/pools")
+def upstream_pools() -> Dict[str, Any]:
+    """Upstream HTTP session havuzu: hit/miss, bağlantı yeniden kullanımı ve eşzamanlılık sınırlayıcıları."""
+    return {**pool_stats(), "limiters": [prometheus_limiter.status(), ocp_limiter.status()]}
@@ -1,11 +1,36 @@
-from fastapi import APIRouter, Query
-from typing import Any, Dict, List
-from concurrent.futures import ThreadPoolExecutor
-
-from routers.metrics import _prom_request
+import os
+import time
+import bisect
+import asyncio
+from fastapi import APIRouter, Header, HTTPException, Query
+from fastapi.responses import StreamingResponse
+from typing import Any, Dict, List, Optional
+
+from alertstore import alert_store
+from broadcast import Broadcaster
+from cache import query_cache
+from encoding import dumps
+from config import get_prometheus_targets, get_scheduler_config
+from scheduler import scheduler
+from telemetry import query_name, registry
+from limiter import Overloaded
+from routers.metrics import _coalesced, _prom_request
 
 router = APIRouter(prefix="/api/observe/health", tags=["health"])
 
+# Result cache TTL per section (seconds) — kept below each UI polling interval
+_TTL = {
+    "overview":     20,
+    "alerts":       10,
+    "nodes":        10,
+    "workload":     10,
+    "capacity":     10,
+    "controlplane": 10,
+}
+
+# Max clusters queried at once by /fleet
+FLEET_CONCURRENCY = int(os.getenv("FLEET_CONCURRENCY", "8"))
+
 
 # ── Helpers ────────────────────────────────────────────────────────────────────
 
@@ -26,14 +51,43 @@ def _scalar(res: dict) -> int:
         return len(results)
 
 
-def _par(queries: Dict[str, str], cluster: str, timeout: int = 25) -> Dict[str, dict]:
-    """Run multiple PromQL instant queries in parallel, return raw results keyed by name."""
-    with ThreadPoolExecutor(max_workers=min(len(queries), 10)) as pool:
-        futures = {
-            k: pool.submit(_prom_request, "/api/v1/query", {"query": q}, cluster)
-            for k, q in queries.items()
-        }
-        return {k: fut.result(timeout=timeout) for k, fut in futures.items()}
+async def _query(query: str, cluster: str, timeout: float, ttl: float = 0, name: str = "") -> dict:
+    """Single instant query with its own deadline; a timeout or a full upstream queue
+    becomes a failed result, so one query never fails the whole _par gather.
+    With ttl > 0 the result is shared through query_cache (identical concurrent
+    queries hit Prometheus once). The returned dict carries the cache age in 'age'.
+    name (the query dict key) labels the upstream call in /metrics.
+    """
+    key = (cluster, "/api/v1/query", query)
+    # The fetch task copies the current context, so the name reaches _prom_request
+    token = query_name.set(name)
+    try:
+        res, age = await asyncio.wait_for(
+            _coalesced(
+                key, ttl,
+                lambda: _prom_request("/api/v1/query", {"query": query}, cluster),
+                cacheable=lambda r: r.get("ok", False),
+            ),
+            timeout,
+        )
+    except asyncio.TimeoutError:
+        return {"ok": False, "error": f"Sorgu zaman aşımı ({timeout}s)", "result": [], "age": 0.0}
+    except Overloaded as e:
+        return {"ok": False, "error": e.detail, "result": [], "age": 0.0}
+    finally:
+        query_name.reset(token)
+    return {**res, "age": age}
+
+
+async def _par(queries: Dict[str, str], cluster: str, timeout: float = 25, ttl: float = 0) -> Dict[str, dict]:
+    """Run multiple PromQL instant queries concurrently, return raw results keyed by name."""
+    results = await asyncio.gather(*(_query(q, cluster, timeout, ttl, name) for name, q in queries.items()))
+    return dict(zip(queries.keys(), results))
+
+
+def _cache_age(raw: Dict[str, dict]) -> float:
+    """Age in seconds of the oldest cached result in a _par result set."""
+    return round(max((v.get("age", 0.0) for v in raw.values()), default=0.0), 1)
 
 
 def _rows(res: dict) -> List[dict]:
@@ -46,154 +100,437 @@ def _par_result(raw: Dict[str, dict]) -> Dict[str, Any]:
     """
     errors = {k: v.get("error", "query failed") for k, v in raw.items() if not v.get("ok")}
     data   = {k: _rows(v) for k, v in raw.items()}
-    return {"ok": True, "errors": errors, **data}
+    return {"ok": True, "errors": errors, "cache_age_sec": _cache_age(raw), **data}
+
+
+async def _serve(section: str, cluster: str, compute) -> Dict[str, Any]:
+    """Serve the scheduler's latest snapshot when fresh, otherwise compute live (TTL-cached)."""
+    snap = scheduler.latest(cluster, section)
+    if snap is not None:
+        value, age = snap
+        return {**value, "cache_age_sec": round(age, 1)}
+    return await compute(cluster, _TTL[section])
 
 
 # ── Overview (30s polling) ─────────────────────────────────────────────────────
 
-@router.get("/overview")
-def health_overview(cluster: str = Query("")) -> Dict[str, Any]:
-    """All cluster health counts in a single call. Poll at 30 s."""
-    queries = {
-        "firing_alerts":           'count(ALERTS{alertstate="firing"}) or vector(0)',
-        "crashloop":               'count(kube_pod_container_status_waiting_reason{reason="CrashLoopBackOff"} > 0) or vector(0)',
-        "oomkilled":               'count(kube_pod_container_status_last_terminated_reason{reason="OOMKilled"} > 0) or vector(0)',
-        "imagepull":               'count(kube_pod_container_status_waiting_reason{reason=~"ImagePullBackOff|ErrImagePull"} > 0) or vector(0)',
-        "pending_pods":            'count(kube_pod_status_phase{phase="Pending"} == 1) or vector(0)',
-        "notready_nodes":          'count(kube_node_status_condition{condition="Ready",status!="true"} == 1) or vector(0)',
-        "unavailable_deployments": 'count(kube_deployment_status_replicas_unavailable > 0) or vector(0)',
-        "failed_jobs":             'count(kube_job_status_failed > 0) or vector(0)',
-    }
-    raw = _par(queries, cluster)
+OVERVIEW_QUERIES = {
+    "firing_alerts":           'count(ALERTS{alertstate="firing"}) or vector(0)',
+    "crashloop":               'count(kube_pod_container_status_waiting_reason{reason="CrashLoopBackOff"} > 0) or vector(0)',
+    "oomkilled":               'count(kube_pod_container_status_last_terminated_reason{reason="OOMKilled"} > 0) or vector(0)',
+    "imagepull":               'count(kube_pod_container_status_waiting_reason{reason=~"ImagePullBackOff|ErrImagePull"} > 0) or vector(0)',
+    "pending_pods":            'count(kube_pod_status_phase{phase="Pending"} == 1) or vector(0)',
+    "notready_nodes":          'count(kube_node_status_condition{condition="Ready",status!="true"} == 1) or vector(0)',
+    "unavailable_deployments": 'count(kube_deployment_status_replicas_unavailable > 0) or vector(0)',
+    "failed_jobs":             'count(kube_job_status_failed > 0) or vector(0)',
+}
+
+
+async def _overview(cluster: str, ttl: float = 0) -> Dict[str, Any]:
+    raw = await _par(OVERVIEW_QUERIES, cluster, ttl=ttl)
     counts = {}
     for k, res in raw.items():
         try:
             counts[k] = _scalar(res)
         except Exception:
             counts[k] = -1
-    return {"ok": True, "cluster": cluster, **counts}
+    errors = {k: v.get("error", "query failed") for k, v in raw.items() if not v.get("ok")}
+    return {"ok": True, "cluster": cluster, "errors": errors, "cache_age_sec": _cache_age(raw), **counts}
 
 
-# ── Enhanced Alerts (15s polling) ─────────────────────────────────────────────
+@router.get("/overview")
+async def health_overview(cluster: str = Query("")) -> Dict[str, Any]:
+    """All cluster health counts in a single call. Poll at 30 s."""
+    return await _serve("overview", cluster, _overview)
 
-_SEV_ORDER = {"critical": 0, "warning": 1, "error": 2, "info": 3}
 
+# ── Fleet overview (30s polling) ───────────────────────────────────────────────
+
+async def _fleet_member(cluster: str, sem: asyncio.Semaphore, deadline: float) -> Dict[str, Any]:
+    async with sem:
+        started = time.monotonic()
+        try:
+            data = await asyncio.wait_for(_serve("overview", cluster, _overview), deadline)
+        except asyncio.TimeoutError:
+            data = {"ok": False, "error": f"Cluster deadline aşıldı ({deadline}s)"}
+        except Exception as e:
+            data = {"ok": False, "error": str(e)}
+        latency_ms = round((time.monotonic() - started) * 1000, 1)
+
+    errors = data.get("errors") or {}
+    if data.get("ok") and errors and len(errors) == len(OVERVIEW_QUERIES):
+        # Every query failed — cluster's Prometheus is effectively down
+        data = {**data, "ok": False, "error": next(iter(errors.values()))}
+    return {**data, "cluster": cluster, "error": data.get("error", ""), "latency_ms": latency_ms}
+
+
+@router.get("/fleet")
+async def health_fleet(deadline: float = Query(10, gt=0, le=60)) -> Dict[str, Any]:
+    """Overview counts for every configured cluster, fetched concurrently.
+    Each cluster has its own deadline; slow or failing clusters are reported
+    with an error instead of holding up the whole response.
+    """
+    sem = asyncio.Semaphore(max(1, FLEET_CONCURRENCY))
+    targets = get_prometheus_targets()
+    results = await asyncio.gather(*(_fleet_member(c, sem, deadline) for c in targets))
+    return {
+        "ok":       True,
+        "total":    len(results),
+        "failed":   sum(1 for r in results if not r.get("ok")),
+        "clusters": results,
+    }
 
-@router.get("/alerts")
-def health_alerts(cluster: str = Query("")) -> Dict[str, Any]:
-    """Firing alerts enriched with active duration in seconds."""
-    raw = _par({
-        "alerts":   'ALERTS{alertstate="firing"}',
-        "duration": 'time() - ALERTS_FOR_STATE{alertstate="firing"}',
-    }, cluster)
 
-    alerts_res   = raw["alerts"]
-    duration_res = raw["duration"]
+# ── Enhanced Alerts (15s polling) ─────────────────────────────────────────────
 
+ALERTS_QUERIES = {
+    "alerts":    'ALERTS{alertstate="firing"}',
+    # Value is the unix time the alert became active; it carries no alertstate label
+    "for_state": "ALERTS_FOR_STATE",
+}
+
+# Long-poll upper bound and SSE keep-alive interval for /alerts/feed
+ALERT_FEED_MAX_WAIT_SEC  = int(os.getenv("ALERT_FEED_MAX_WAIT_SEC", "60"))
+ALERT_FEED_HEARTBEAT_SEC = int(os.getenv("ALERT_FEED_HEARTBEAT_SEC", "15"))
+
+
+async def _alerts(cluster: str, ttl: float = 0) -> Dict[str, Any]:
+    """Refresh the cluster's alert store; the store keeps the data, the snapshot only the outcome."""
+    raw = await _par(ALERTS_QUERIES, cluster, ttl=ttl)
+    alerts_res = raw["alerts"]
     if not alerts_res.get("ok"):
-        return {"ok": False, "error": alerts_res.get("error", ""), "result": []}
-
-    # Build duration map keyed by alertname|namespace
-    dur_map: Dict[str, float] = {}
-    for r in _rows(duration_res):
-        m   = r.get("metric", {})
-        key = f"{m.get('alertname', '')}|{m.get('namespace', '')}"
-        val = r.get("value", [None, None])[1]
+        return {"ok": False, "error": alerts_res.get("error", "")}
+    feed = alert_store.update(cluster, _rows(alerts_res), _rows(raw["for_state"]))
+    errors = {k: v.get("error", "query failed") for k, v in raw.items() if not v.get("ok")}
+    return {"ok": True, "errors": errors, "version": feed.version, "cache_age_sec": _cache_age(raw)}
+
+
+@router.get("/alerts")
+async def health_alerts(cluster: str = Query("")) -> Dict[str, Any]:
+    """Firing alerts enriched with active duration in seconds."""
+    res = await _serve("alerts", cluster, _alerts)
+    if not res.get("ok"):
+        return {"ok": False, "error": res.get("error", ""), "result": []}
+
+    feed = alert_store.feed(cluster)
+    now = time.time()
+    enriched = [
+        {
+            "metric":      a["metric"],
+            "value":       [feed.updated_ts, "1"],
+            "active_secs": now - a["active_at"] if a["active_at"] is not None else None,
+        }
+        for a in feed.sorted_alerts()
+    ]
+    return {"ok": True, "cache_age_sec": res["cache_age_sec"], "version": feed.version, "result": enriched}
+
+
+def _sse(event: str, version: int, payload: Dict[str, Any]) -> str:
+    return f"id: {version}\nevent: {event}\ndata: {dumps(payload).decode()}\n\n"
+
+
+@router.get("/alerts/feed")
+async def health_alerts_feed(
+    cluster:       str           = Query(""),
+    since:         int           = Query(0, ge=0),
+    wait:          float         = Query(0, ge=0, le=ALERT_FEED_MAX_WAIT_SEC),
+    fmt:           str           = Query("json", alias="format", pattern="^(json|sse)$"),
+    last_event_id: Optional[str] = Header(None),
+) -> Any:
+    """Incremental firing-alert feed.
+    Returns alerts added / changed / resolved since the client's version, or a full
+    snapshot (full=true) when since=0 or the version is no longer in the change log.
+    wait>0 long-polls until something changes; format=sse streams diffs as they happen
+    (reconnects resume from Last-Event-ID). Alerts carry active_at (unix time) instead
+    of active_secs, so an unchanged alert stays out of the diff.
+    """
+    if cluster not in get_prometheus_targets():
+        # The name comes from the client; only configured clusters get a feed in the store
+        raise HTTPException(404, f"Unknown cluster: {cluster or 'global'}")
+    if last_event_id and not since:
         try:
-            dur_map[key] = float(val)
-        except (TypeError, ValueError):
+            since = int(last_event_id)
+        except ValueError:
             pass
+    feed = alert_store.feed(cluster)
+
+    if fmt == "json":
+        res = await _serve("alerts", cluster, _alerts)
+        if not res.get("ok"):
+            return {"ok": False, "error": res.get("error", ""), "version": feed.version}
+        deadline = time.monotonic() + wait
+        while since and feed.version == since:
+            left = deadline - time.monotonic()
+            if left <= 0:
+                break
+            # Wake at least once per TTL to refresh when no scheduler is feeding the store
+            if not await feed.wait(since, min(left, _TTL["alerts"])):
+                await _serve("alerts", cluster, _alerts)
+        return {"ok": True, "cache_age_sec": res["cache_age_sec"], **feed.since(since)}
+
+    async def _events():
+        version, last_sent, error = since, 0.0, ""
+        while True:
+            res = await _serve("alerts", cluster, _alerts)
+            if not res.get("ok"):
+                if res.get("error", "") != error:
+                    error = res.get("error", "")
+                    yield f"event: error\ndata: {dumps({'ok': False, 'error': error}).decode()}\n\n"
+                    last_sent = time.monotonic()
+            else:
+                error = ""
+            if feed.version != version:
+                payload = feed.since(version)
+                version = payload["version"]
+                yield _sse("snapshot" if payload["full"] else "diff", version, payload)
+                last_sent = time.monotonic()
+            elif time.monotonic() - last_sent >= ALERT_FEED_HEARTBEAT_SEC:
+                yield ": ping\n\n"
+                last_sent = time.monotonic()
+            await feed.wait(version, min(ALERT_FEED_HEARTBEAT_SEC, _TTL["alerts"]))
+
+    return StreamingResponse(
+        _events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
 
-    enriched = []
-    for r in _rows(alerts_res):
-        m   = r.get("metric", {})
-        key = f"{m.get('alertname', '')}|{m.get('namespace', '')}"
-        enriched.append({
-            "metric":      m,
-            "value":       r.get("value"),
-            "active_secs": dur_map.get(key),
-        })
 
-    enriched.sort(key=lambda x: (
-        _SEV_ORDER.get((x["metric"].get("severity") or "").lower(), 9),
-        -(x["active_secs"] or 0),
-    ))
+# ── Nodes (15s polling) ────────────────────────────────────────────────────────
 
-    return {"ok": True, "result": enriched}
+NODES_QUERIES = {
+    "notready": 'kube_node_status_condition{condition="Ready",status!="true"} == 1',
+    "pressure": 'kube_node_status_condition{condition=~"MemoryPressure|DiskPressure|PIDPressure",status="true"} == 1',
+    "cpu":      'topk(30, 100 - avg by(node) (rate(node_cpu_seconds_total{mode="idle"}[5m])) * 100)',
+    "memory":   'topk(30, (node_memory_MemTotal_bytes - node_memory_MemAvailable_bytes) / node_memory_MemTotal_bytes * 100)',
+    "disk":     'topk(30, (1 - node_filesystem_avail_bytes{mountpoint="/"} / node_filesystem_size_bytes{mountpoint="/"}) * 100)',
+}
 
 
-# ── Nodes (15s polling) ────────────────────────────────────────────────────────
+async def _nodes(cluster: str, ttl: float = 0) -> Dict[str, Any]:
+    return _par_result(await _par(NODES_QUERIES, cluster, ttl=ttl))
+
 
 @router.get("/nodes")
-def health_nodes(cluster: str = Query("")) -> Dict[str, Any]:
+async def health_nodes(cluster: str = Query("")) -> Dict[str, Any]:
     """Node health: NotReady, pressure conditions, CPU/memory/disk usage."""
-    queries = {
-        "notready": 'kube_node_status_condition{condition="Ready",status!="true"} == 1',
-        "pressure": 'kube_node_status_condition{condition=~"MemoryPressure|DiskPressure|PIDPressure",status="true"} == 1',
-        "cpu":      'topk(30, 100 - avg by(node) (rate(node_cpu_seconds_total{mode="idle"}[5m])) * 100)',
-        "memory":   'topk(30, (node_memory_MemTotal_bytes - node_memory_MemAvailable_bytes) / node_memory_MemTotal_bytes * 100)',
-        "disk":     'topk(30, (1 - node_filesystem_avail_bytes{mountpoint="/"} / node_filesystem_size_bytes{mountpoint="/"}) * 100)',
-    }
-    raw = _par(queries, cluster)
-    return _par_result(raw)
+    return await _serve("nodes", cluster, _nodes)
 
 
 # ── Workload Issues (15s polling) ─────────────────────────────────────────────
 
+WORKLOAD_QUERIES = {
+    "crashloop":   'topk(50, kube_pod_container_status_waiting_reason{reason="CrashLoopBackOff"} > 0)',
+    "oomkilled":   'topk(50, kube_pod_container_status_last_terminated_reason{reason="OOMKilled"} > 0)',
+    "imagepull":   'topk(50, kube_pod_container_status_waiting_reason{reason=~"ImagePullBackOff|ErrImagePull"} > 0)',
+    "pending":     'topk(50, kube_pod_status_phase{phase="Pending"} == 1)',
+    "unavailable": 'topk(20, kube_deployment_status_replicas_unavailable > 0)',
+    "failed_jobs": 'topk(20, kube_job_status_failed > 0)',
+}
+
+
+async def _workload(cluster: str, ttl: float = 0) -> Dict[str, Any]:
+    return _par_result(await _par(WORKLOAD_QUERIES, cluster, ttl=ttl))
+
+
 @router.get("/workload")
-def health_workload(cluster: str = Query("")) -> Dict[str, Any]:
+async def health_workload(cluster: str = Query("")) -> Dict[str, Any]:
     """Workload problems: CrashLoop, OOMKilled, ImagePull, Pending pods, Unavailable deployments, Failed jobs."""
-    queries = {
-        "crashloop":   'topk(50, kube_pod_container_status_waiting_reason{reason="CrashLoopBackOff"} > 0)',
-        "oomkilled":   'topk(50, kube_pod_container_status_last_terminated_reason{reason="OOMKilled"} > 0)',
-        "imagepull":   'topk(50, kube_pod_container_status_waiting_reason{reason=~"ImagePullBackOff|ErrImagePull"} > 0)',
-        "pending":     'topk(50, kube_pod_status_phase{phase="Pending"} == 1)',
-        "unavailable": 'topk(20, kube_deployment_status_replicas_unavailable > 0)',
-        "failed_jobs": 'topk(20, kube_job_status_failed > 0)',
-    }
-    raw = _par(queries, cluster)
-    return _par_result(raw)
+    return await _serve("workload", cluster, _workload)
 
 
 # ── Capacity (15s polling) ────────────────────────────────────────────────────
 
+CAPACITY_QUERIES = {
+    # CPU usage ÷ request per namespace (cores used / cores requested)
+    "cpu_ratio": (
+        'topk(20, '
+        '  sum by(namespace) (rate(container_cpu_usage_seconds_total{container!="",container!="POD"}[5m])) '
+        '/ ignoring(resource) '
+        '  sum by(namespace) (kube_pod_container_resource_requests{resource="cpu",container!="",container!="POD"}) '
+        '> 0)'
+    ),
+    "quota_used": 'kube_resourcequota{type="used"} > 0',
+    "quota_hard": 'kube_resourcequota{type="hard"} > 0',
+    "pvc_ratio":  'topk(20, kubelet_volume_stats_used_bytes / kubelet_volume_stats_capacity_bytes > 0.5)',
+    # Absolute CPU usage per namespace (for namespaces without requests)
+    "cpu_abs": (
+        'topk(20, '
+        '  sum by(namespace) (rate(container_cpu_usage_seconds_total{container!="",container!="POD"}[5m])) > 0)'
+    ),
+}
+
+
+_QUOTA_COLUMNS = ("namespace", "quota", "resource", "used", "hard", "pct")
+
+# cluster → (used rows, hard rows, joined table); reused while the raw results are the same objects
+_quota_tables: Dict[str, tuple] = {}
+
+
+def _quota_key(m: Dict[str, str]) -> tuple:
+    return m.get("namespace", ""), m.get("resourcequota", ""), m.get("resource", "")
+
+
+def _quota_table(used_rows: List[dict], hard_rows: List[dict]) -> Dict[str, list]:
+    """Join quota used/hard per (namespace, quota, resource) into a column-oriented table
+    sorted by utilisation percentage, highest first.
+    """
+    hard: Dict[tuple, float] = {}
+    for r in hard_rows:
+        try:
+            hard[_quota_key(r.get("metric", {}))] = float(r.get("value", [None, None])[1])
+        except (TypeError, ValueError):
+            pass
+    rows = []
+    for r in used_rows:
+        key = _quota_key(r.get("metric", {}))
+        limit = hard.get(key)
+        try:
+            used = float(r.get("value", [None, None])[1])
+        except (TypeError, ValueError):
+            continue
+        if limit:
+            rows.append((*key, used, limit, round(used / limit * 100, 1)))
+    rows.sort(key=lambda row: (-row[5], row[0], row[1], row[2]))
+    return {col: [row[i] for row in rows] for i, col in enumerate(_QUOTA_COLUMNS)}
+
+
+def _cached_quota_table(cluster: str, used_rows: List[dict], hard_rows: List[dict]) -> Dict[str, list]:
+    entry = _quota_tables.get(cluster)
+    if entry is None or entry[0] is not used_rows or entry[1] is not hard_rows:
+        entry = _quota_tables[cluster] = (used_rows, hard_rows, _quota_table(used_rows, hard_rows))
+    return entry[2]
+
+
+def _top_quota(table: Dict[str, list], top: int, min_pct: float) -> Dict[str, Any]:
+    """Rows with pct >= min_pct, at most top; the table is already sorted so this is a slice."""
+    matching = bisect.bisect_right(table["pct"], -min_pct, key=lambda p: -p) if min_pct > 0 else len(table["pct"])
+    n = min(matching, top)
+    return {**{col: vals[:n] for col, vals in table.items()}, "total": matching, "truncated": matching > n}
+
+
+async def _capacity(cluster: str, ttl: float = 0) -> Dict[str, Any]:
+    raw = await _par(CAPACITY_QUERIES, cluster, ttl=ttl)
+    result = _par_result(raw)
+    result["quota"] = _cached_quota_table(cluster, result["quota_used"], result["quota_hard"])
+    return result
+
+
 @router.get("/capacity")
-def health_capacity(cluster: str = Query("")) -> Dict[str, Any]:
-    """Capacity: CPU usage/request ratio, ResourceQuota usage, PVC fill level."""
-    queries = {
-        # CPU usage ÷ request per namespace (cores used / cores requested)
-        "cpu_ratio": (
-            'topk(20, '
-            '  sum by(namespace) (rate(container_cpu_usage_seconds_total{container!="",container!="POD"}[5m])) '
-            '/ ignoring(resource) '
-            '  sum by(namespace) (kube_pod_container_resource_requests{resource="cpu",container!="",container!="POD"}) '
-            '> 0)'
-        ),
-        "quota_used": 'kube_resourcequota{type="used"} > 0',
-        "quota_hard": 'kube_resourcequota{type="hard"} > 0',
-        "pvc_ratio":  'topk(20, kubelet_volume_stats_used_bytes / kubelet_volume_stats_capacity_bytes > 0.5)',
-        # Absolute CPU usage per namespace (for namespaces without requests)
-        "cpu_abs": (
-            'topk(20, '
-            '  sum by(namespace) (rate(container_cpu_usage_seconds_total{container!="",container!="POD"}[5m])) > 0)'
-        ),
-    }
-    raw = _par(queries, cluster)
-    return _par_result(raw)
+async def health_capacity(
+    cluster: str   = Query(""),
+    top:     int   = Query(50, ge=1, le=5000),
+    min_pct: float = Query(0, ge=0),
+    raw:     bool  = Query(False),
+) -> Dict[str, Any]:
+    """Capacity: CPU usage/request ratio, ResourceQuota usage, PVC fill level.
+    quota is joined server-side: {namespace, quota, resource, used, hard, pct} columns,
+    sorted by pct, filtered by min_pct and cut to top (total / truncated describe the rest).
+    raw=true also returns the unjoined quota_used / quota_hard series.
+    """
+    res = await _serve("capacity", cluster, _capacity)
+    if "quota" not in res:
+        return res
+    out = {k: v for k, v in res.items() if raw or k not in ("quota_used", "quota_hard")}
+    out["quota"] = _top_quota(res["quota"], top, min_pct)
+    return out
 
 
 # ── Control Plane (15s polling) ───────────────────────────────────────────────
 
+CONTROLPLANE_QUERIES = {
+    "etcd_db_size":       "etcd_mvcc_db_total_size_in_bytes",
+    "etcd_has_leader":    "etcd_server_has_leader",
+    "etcd_leader_changes":"rate(etcd_server_leader_changes_seen_total[1h])",
+    "apiserver_5xx_rate": 'sum(rate(apiserver_request_total{code=~"5.."}[5m])) or vector(0)',
+    "apiserver_p99":      'histogram_quantile(0.99, sum by(le,verb) (rate(apiserver_request_duration_seconds_bucket[5m])))',
+    "cert_expiry_7d":     'sum(apiserver_client_certificate_expiration_seconds_bucket{le="604800"}) or vector(0)',
+}
+
+
+async def _controlplane(cluster: str, ttl: float = 0) -> Dict[str, Any]:
+    return _par_result(await _par(CONTROLPLANE_QUERIES, cluster, ttl=ttl))
+
+
 @router.get("/controlplane")
-def health_controlplane(cluster: str = Query("")) -> Dict[str, Any]:
+async def health_controlplane(cluster: str = Query("")) -> Dict[str, Any]:
     """Control plane: etcd health, API server error rate & latency, certificate expiry."""
-    queries = {
-        "etcd_db_size":       "etcd_mvcc_db_total_size_in_bytes",
-        "etcd_has_leader":    "etcd_server_has_leader",
-        "etcd_leader_changes":"rate(etcd_server_leader_changes_seen_total[1h])",
-        "apiserver_5xx_rate": 'sum(rate(apiserver_request_total{code=~"5.."}[5m])) or vector(0)',
-        "apiserver_p99":      'histogram_quantile(0.99, sum by(le,verb) (rate(apiserver_request_duration_seconds_bucket[5m])))',
-        "cert_expiry_7d":     'sum(apiserver_client_certificate_expiration_seconds_bucket{le="604800"}) or vector(0)',
-    }
-    raw = _par(queries, cluster)
-    return _par_result(raw)
+    return await _serve("controlplane", cluster, _controlplane)
+
+
+# ── Background snapshots ──────────────────────────────────────────────────────
+
+_SECTIONS = {
+    "overview":     _overview,
+    "alerts":       _alerts,
+    "nodes":        _nodes,
+    "workload":     _workload,
+    "capacity":     _capacity,
+    "controlplane": _controlplane,
+}
+
+for _section, _compute in _SECTIONS.items():
+    scheduler.register(_section, _compute)
+
+
+@router.get("/scheduler")
+def scheduler_status() -> Dict[str, Any]:
+    """Background refresh state per cluster/section, including lag behind schedule."""
+    return {**scheduler.status(), "stream": health_hub.status()}
+
+
+# ── Push channel (SSE) ────────────────────────────────────────────────────────
+
+HEALTH_STREAM_HEARTBEAT_SEC = int(os.getenv("HEALTH_STREAM_HEARTBEAT_SEC", "15"))
+
+
+async def _stream_section(section: str, cluster: str) -> Dict[str, Any]:
+    """Same payload as the section's endpoint (alerts carry active_at, like /alerts/feed)."""
+    if section == "alerts":
+        res = await _serve("alerts", cluster, _alerts)
+        if not res.get("ok"):
+            return {"ok": False, "error": res.get("error", "")}
+        feed = alert_store.feed(cluster)
+        return {"ok": True, "cache_age_sec": res["cache_age_sec"], "version": feed.version,
+                "alerts": feed.sorted_alerts()}
+    if section == "capacity":
+        return await health_capacity(cluster, top=50, min_pct=0, raw=False)
+    return await _serve(section, cluster, _SECTIONS[section])
+
+
+def _stream_interval(section: str) -> float:
+    interval = get_scheduler_config()["intervals"].get(section, 15)
+    # With the scheduler running a refresh is only a snapshot read; poll it twice per interval
+    return interval / 2 if scheduler.running else interval
+
+
+health_hub = Broadcaster({section: _stream_section for section in _SECTIONS}, _stream_interval)
+
+registry.gauge("observe_health_stream_subscribers", "Open /health/stream connections.", health_hub.samples)
+
+
+@router.get("/stream")
+async def health_stream(cluster: str = Query("")) -> StreamingResponse:
+    """SSE push of every health section (overview, alerts, nodes, workload, capacity, controlplane).
+    One event per section, named after it, sent only when its content changes; every viewer
+    of a cluster shares one refresh loop. A slow client gets the latest frame per section,
+    stale ones are dropped. Comment heartbeats keep idle connections open.
+    """
+    async def _events():
+        sub = health_hub.subscribe(cluster)
+        try:
+            yield "retry: 5000\n\n"
+            while True:
+                frames = await sub.next(HEALTH_STREAM_HEARTBEAT_SEC)
+                if not frames:
+                    yield ": ping\n\n"
+                for section, frame in frames:
+                    yield f"event: {section}\ndata: {dumps(frame).decode()}\n\n"
+        finally:
+            health_hub.unsubscribe(cluster, sub)
+
+    return StreamingResponse(
+        _events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
@@ -0,0 +1,252 @@
+from fastapi import APIRouter, Query, HTTPException
+from typing import Any, Dict, List, Optional, Pattern
+from collections import deque
+import re
+import time
+import asyncio
+import httpx
+from config import get_token
+from limiter import ocp_limiter
+from upstream import http_stream
+from routers.resources import _resolve_cluster, _list_page, _ocp_get, informers
+
+router = APIRouter(prefix="/api/observe", tags=["observe"])
+
+# Aynı anda taranan log stream'i sayısı (selector ile çok pod arandığında)
+SEARCH_CONCURRENCY = 8
+MAX_PODS           = 50
+# Kullanıcı deseni event loop'u bloklamasın: eşleştirme thread'de, satır grupları halinde,
+# satırın yalnızca ilk MAX_LINE_CHARS karakterinde yapılır
+MAX_PATTERN_CHARS  = 1000
+MAX_LINE_CHARS     = 8192
+MATCH_BATCH_LINES  = 1000
+
+_LEVEL_ORDER = {"trace": 0, "debug": 1, "info": 2, "warn": 3, "error": 4, "fatal": 5}
+_LEVEL_ALIASES = {
+    "trace": "trace", "debug": "debug", "info": "info", "notice": "info",
+    "warn": "warn", "warning": "warn",
+    "err": "error", "error": "error", "severe": "error",
+    "fatal": "fatal", "critical": "fatal", "crit": "fatal", "panic": "fatal",
+}
+_LEVEL_RE = re.compile(
+    r"\b(TRACE|DEBUG|INFO|NOTICE|WARN(?:ING)?|ERR(?:OR)?|SEVERE|FATAL|CRIT(?:ICAL)?|PANIC)\b",
+    re.IGNORECASE,
+)
+
+
+def _line_level(line: str) -> Optional[str]:
+    m = _LEVEL_RE.search(line)
+    return _LEVEL_ALIASES.get(m.group(1).lower()) if m else None
+
+
+def _compile(patterns: List[str], regex: bool, ignore_case: bool) -> Optional[Pattern[str]]:
+    """Tüm desenleri tek bir alternation regex'inde birleştirir (satır başına tek tarama)."""
+    parts = [p if regex else re.escape(p) for p in patterns if p]
+    if not parts:
+        return None
+    if sum(len(p) for p in patterns) > MAX_PATTERN_CHARS:
+        raise HTTPException(400, f"Desen çok uzun (en fazla {MAX_PATTERN_CHARS} karakter)")
+    try:
+        return re.compile("|".join(f"(?:{p})" for p in parts), re.IGNORECASE if ignore_case else 0)
+    except re.error as e:
+        raise HTTPException(400, f"Geçersiz regex: {e}")
+
+
+def _match_batch(lines: List[str], matcher: Optional[Pattern[str]], min_level: Optional[int]) -> List[bool]:
+    """Satır grubu için eşleşme bayrakları; event loop dışında (thread'de) çalışır."""
+    hits = []
+    for line in lines:
+        head = line[:MAX_LINE_CHARS]
+        hit = matcher is None or matcher.search(head) is not None
+        if hit and min_level is not None:
+            level = _line_level(head)
+            hit = level is not None and _LEVEL_ORDER[level] >= min_level
+        hits.append(hit)
+    return hits
+
+
+class _Budget:
+    """Yanıt genelinde kalan eşleşme sayısı; tükenince tüm taramalar durur."""
+
+    __slots__ = ("left",)
+
+    def __init__(self, total: int):
+        self.left = total
+
+
+async def _scan(
+    c: Dict[str, Any],
+    token: str,
+    namespace: str,
+    pod: str,
+    container: str,
+    params: Dict[str, Any],
+    matcher: Optional[Pattern[str]],
+    min_level: Optional[int],
+    context: int,
+    budget: _Budget,
+    sem: asyncio.Semaphore,
+) -> Dict[str, Any]:
+    """Tek container logunu satır satır tarar; yalnızca eşleşen satırları (ve bağlamı) tutar."""
+    matches: List[Dict[str, Any]] = []
+    before: deque = deque(maxlen=context)
+    pending: List[Dict[str, Any]] = []
+    line_no = offset = 0
+    truncated = False
+    started = time.monotonic()
+
+    def _take(batch: List[str], hits: List[bool]) -> bool:
+        """Eşleşmeleri bağlamıyla kaydeder; bütçe tükendiyse False (tarama durur)."""
+        nonlocal pending, line_no, offset, truncated
+        for line, hit in zip(batch, hits):
+            if pending:
+                for m in pending:
+                    m["after"].append(line)
+                pending = [m for m in pending if len(m["after"]) < context]
+            if hit:
+                if budget.left <= 0:
+                    truncated = True
+                    return False
+                budget.left -= 1
+                m = {"line_no": line_no, "offset": offset, "line": line,
+                     "before": list(before), "after": []}
+                matches.append(m)
+                if context:
+                    pending.append(m)
+            if context:
+                before.append(line)
+            line_no += 1
+            offset += len(line.encode("utf-8")) + 1
+        return True
+
+    async def _consume(batch: List[str]) -> bool:
+        nonlocal truncated
+        if budget.left <= 0:
+            # Başka bir container toplam sınırı doldurdu
+            truncated = True
+            return False
+        hits = await asyncio.to_thread(_match_batch, batch, matcher, min_level)
+        return _take(batch, hits)
+
+    async with sem:
+        try:
+            # Her log stream'i OCP upstream sınırına (cluster başına adil kuyruk) tabidir
+            async with ocp_limiter.slot(c["ocp_api"]):
+                async with http_stream(
+                    c["ocp_api"], f"/api/v1/namespaces/{namespace}/pods/{pod}/log",
+                    token=token,
+                    headers={"Accept": "text/plain"},
+                    params={**params, "container": container},
+                    timeout=httpx.Timeout(15, read=60),
+                    verify=not c["insecure"],
+                ) as resp:
+                    if resp.status_code != 200:
+                        return {"pod": pod, "container": container, "error": f"HTTP {resp.status_code}",
+                                "lines_scanned": 0, "matches": []}
+                    batch: List[str] = []
+                    async for line in resp.aiter_lines():
+                        batch.append(line)
+                        if len(batch) >= MATCH_BATCH_LINES:
+                            if not await _consume(batch):
+                                break
+                            batch = []
+                    else:
+                        if batch:
+                            await _consume(batch)
+        except Exception as e:
+            return {"pod": pod, "container": container, "error": str(e),
+                    "lines_scanned": line_no, "matches": matches}
+    return {
+        "pod":           pod,
+        "container":     container,
+        "error":         "",
+        "lines_scanned": line_no,
+        "truncated":     truncated,
+        "duration_ms":   round((time.monotonic() - started) * 1000, 1),
+        "matches":       matches,
+    }
+
+
+def _containers(item: Dict[str, Any]) -> List[str]:
+    return [co.get("name", "") for co in (item.get("spec") or {}).get("containers", [])]
+
+
+@router.get("/pod-logs/search")
+async def search_pod_logs(
+    cluster:        str            = Query(...),
+    namespace:      str            = Query(...),
+    pattern:        List[str]      = Query([]),
+    pod:            Optional[str]  = Query(None),
+    label_selector: Optional[str]  = Query(None, alias="labelSelector"),
+    container:      Optional[str]  = Query(None),
+    regex:          bool           = Query(False),
+    ignore_case:    bool           = Query(True),
+    level:          Optional[str]  = Query(None),
+    context:        int            = Query(0, ge=0, le=20),
+    tail_lines:     int            = Query(5000, ge=1, le=50000),
+    since_seconds:  Optional[int]  = Query(None, alias="sinceSeconds", ge=1),
+    previous:       bool           = Query(False),
+    max_matches:    int            = Query(500, ge=1, le=5000),
+) -> Dict[str, Any]:
+    """Pod loglarında sunucu tarafı arama.
+    pod verilirse o pod'un (container verilmezse tüm) container'ları, labelSelector
+    verilirse eşleşen tüm pod'lar paralel taranır. Yalnızca eşleşen satırlar,
+    satır numarası / byte offset ve context satırları ile döner.
+    max_matches yanıtın tamamı içindir; dolunca tüm taramalar durur (truncated=true).
+    """
+    if not pod and not label_selector:
+        raise HTTPException(400, "pod veya labelSelector gerekli")
+    min_level = None
+    if level:
+        canon = _LEVEL_ALIASES.get(level.lower())
+        if canon is None:
+            raise HTTPException(400, f"Geçersiz level: {level}")
+        min_level = _LEVEL_ORDER[canon]
+    matcher = _compile(pattern, regex, ignore_case)
+    if matcher is None and min_level is None:
+        raise HTTPException(400, "pattern veya level gerekli")
+
+    c = _resolve_cluster(cluster)
+    token = get_token(cluster)
+
+    try:
+        if pod:
+            item = await informers.get(c, token, namespace, "pods", pod)
+            if item is None:
+                item = await _ocp_get(c["ocp_api"], c["insecure"], token,
+                                      f"/api/v1/namespaces/{namespace}/pods/{pod}")
+            pods = [item]
+        else:
+            pods, _, _ = await _list_page(c, token, namespace, "pods", label_selector=label_selector or "")
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(502, str(e))
+
+    pods_truncated = len(pods) > MAX_PODS
+    pods = sorted(pods, key=lambda i: (i.get("metadata") or {}).get("name", ""))[:MAX_PODS]
+    targets = [
+        ((item.get("metadata") or {}).get("name", ""), cname)
+        for item in pods
+        for cname in ([container] if container else _containers(item))
+    ]
+
+    params: Dict[str, Any] = {"tailLines": tail_lines}
+    if since_seconds:
+        params["sinceSeconds"] = since_seconds
+    if previous:
+        params["previous"] = "true"
+
+    sem = asyncio.Semaphore(SEARCH_CONCURRENCY)
+    budget = _Budget(max_matches)
+    results = await asyncio.gather(*(
+        _scan(c, token, namespace, p, cname, params, matcher, min_level, context, budget, sem)
+        for p, cname in targets
+    ))
+    return {
+        "ok":             True,
+        "total_matches":  sum(len(r["matches"]) for r in results),
+        "truncated":      any(r.get("truncated") for r in results),
+        "pods_truncated": pods_truncated,
+        "results":        results,
+    }
@@ -1,6 +1,21 @@
+import os
+import re
+import json
+import math
+import time
+import asyncio
+from array import array
+from bisect import bisect_left, bisect_right
+from collections import OrderedDict
+from datetime import datetime
+import httpx
 from fastapi import APIRouter, Query
-from typing import Any, Dict
-import requests
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+from upstream import http_get
+from breaker import CircuitBreaker, breakers
+from limiter import Overloaded, client_id, prometheus_limiter
+from cache import query_cache
+from telemetry import observe_upstream, query_name, registry
 from config import (
     get_global_prometheus_url,
     get_global_prometheus_token,
@@ -14,7 +29,74 @@ from config import (
 router = APIRouter(prefix="/api/observe", tags=["observe"])
 
 
-def _prom_request(path: str, params: dict, cluster: str = "") -> dict:
+_LABEL_VALUES_RE = re.compile(r"^/api/v1/label/[^/]+/values$")
+
+
+def _endpoint(path: str) -> str:
+    """Metrik label'ı için path; label adı gibi değişken kısımlar sabitlenir."""
+    return "/api/v1/label/:name/values" if _LABEL_VALUES_RE.match(path) else path
+
+
+async def _prom_request(path: str, params: dict, cluster: str = "") -> dict:
+    if cluster and not get_cluster_prometheus_url(cluster):
+        # Tanımsız cluster (ad istemciden gelir): breaker / limiter / metrik durumu oluşturulmaz
+        return {"ok": False, "error": f"Cluster için Prometheus tanımlanmamış: {cluster}", "result": []}
+    started = time.monotonic()
+    br = breakers.get("prometheus", cluster)
+    if not br.allow():
+        # Devre açık: upstream'i bekletmeden anında hata (degrade cluster milisaniyeler harcar)
+        res = {
+            "ok": False, "circuit": "open", "result": [],
+            "error": f"Prometheus erişilemiyor (circuit open, {br.retry_in():.0f}s sonra yeniden denenecek): {br.last_error}",
+        }
+    else:
+        try:
+            # Dolu kuyrukta Overloaded (429/503) yükselir — istek upstream'e hiç gitmez
+            async with prometheus_limiter.slot(cluster or "global"):
+                res = await _prom_call(path, params, cluster, br)
+        finally:
+            br.release()
+    observe_upstream(cluster, _endpoint(path), started, res.get("ok", False))
+    return res
+
+
+async def _coalesced(
+    key: Tuple,
+    ttl: float,
+    fetch: Callable[[], Awaitable[dict]],
+    cacheable: Callable[[dict], bool] = lambda r: True,
+) -> Tuple[dict, float]:
+    """
+    query_cache.get_or_fetch + adil kuyruk: ortak fetch ilk çağıranın client_id'siyle
+    limiter'a girer. Kuyruk dolu diye reddedilirse Overloaded yalnızca o istemciye
+    yükselir; aynı sorguyu bekleyen diğer istemciler kendi sıralarıyla yeniden dener.
+    """
+    async def _guarded() -> dict:
+        try:
+            return await fetch()
+        except Overloaded as e:
+            return {"ok": False, "error": e.detail, "result": [], "_shed": (client_id.get(), e)}
+
+    shed = None
+    for _ in range(2):
+        res, age = await query_cache.get_or_fetch(
+            key, ttl, _guarded, cacheable=lambda r: "_shed" not in r and cacheable(r),
+        )
+        shed = res.get("_shed")
+        if shed is None:
+            return res, age
+        if shed[0] == client_id.get():
+            raise shed[1]
+    # Üst üste başka istemcilerin reddine denk geldi: istisna yerine başarısız sonuç
+    return {k: v for k, v in res.items() if k != "_shed"}, 0.0
+
+
+def _latency_class(path: str) -> str:
+    """Adaptif timeout penceresi: health sorguları (query_name dolu) ayrı, diğerleri uç nokta bazında."""
+    return "health" if query_name.get() else _endpoint(path)
+
+
+async def _prom_call(path: str, params: dict, cluster: str, br: Optional[CircuitBreaker] = None) -> dict:
     if cluster:
         prom_url = get_cluster_prometheus_url(cluster).rstrip("/")
         token    = get_cluster_prometheus_token(cluster)
@@ -27,17 +109,34 @@ def _prom_request(path: str, params: dict, cluster: str = "") -> dict:
     if not token:
         return {"ok": False, "error": "Prometheus token bulunamadı — Secrets sayfasından cluster yapılandırın", "result": []}
 
-    headers = {"Authorization": f"Bearer {token}"}
-    timeout_sec = get_global_prometheus_timeout_sec()
+    ceiling     = get_global_prometheus_timeout_sec()
+    cls         = _latency_class(path)
+    timeout_sec = br.timeout(ceiling, cls) if br else ceiling
     verify_tls  = (not get_cluster_prometheus_insecure(cluster)) if cluster else get_global_prometheus_verify_tls()
+    started = time.monotonic()
     try:
-        resp = requests.get(
-            f"{prom_url}{path}",
-            headers=headers,
+        resp = await http_get(
+            prom_url, path,
+            token=token,
             params=params,
             timeout=timeout_sec,
             verify=verify_tls,
         )
+    except httpx.TimeoutException:
+        if br:
+            br.failure(f"timeout ({timeout_sec:.1f}s)", timeout_sec, cls)
+        return {"ok": False, "error": f"Prometheus zaman aşımı ({timeout_sec:.1f}s)", "result": []}
+    except Exception as e:
+        if br:
+            br.failure(str(e) or type(e).__name__)
+        return {"ok": False, "error": str(e), "result": []}
+    # 4xx (hatalı PromQL vb.) upstream'in sağlıklı olduğunu gösterir; yalnızca 5xx breaker'a sayılır
+    if br:
+        if resp.status_code >= 500:
+            br.failure(f"HTTP {resp.status_code}")
+        else:
+            br.success(time.monotonic() - started, cls)
+    try:
         resp.raise_for_status()
         data = resp.json()
         if data.get("status") != "success":
@@ -54,7 +153,7 @@ def _prom_request(path: str, params: dict, cluster: str = "") -> dict:
 # ── Instant query ─────────────────────────────────────────────────────────────
 
 @router.post("/promql")
-def run_promql(body: Dict[str, Any]) -> Dict[str, Any]:
+async def run_promql(body: Dict[str, Any]) -> Dict[str, Any]:
     """Prometheus instant query. body: {query, time?, cluster?}"""
     query   = body.get("query", "").strip()
     cluster = body.get("cluster", "")
@@ -63,14 +162,391 @@ def run_promql(body: Dict[str, Any]) -> Dict[str, Any]:
     params: Dict[str, Any] = {"query": query}
     if body.get("time"):
         params["time"] = body["time"]
-    return _prom_request("/api/v1/query", params, cluster)
+    return await _prom_request("/api/v1/query", params, cluster)
 
 
 # ── Range query ───────────────────────────────────────────────────────────────
 
+# Range cache'te tutulacak toplam örnek (sample) üst sınırı — LRU ile boşaltılır
+RANGE_CACHE_MAX_POINTS  = int(os.getenv("RANGE_CACHE_MAX_POINTS", "500000"))
+# Kayıt (cluster, query, step) sayısı üst sınırı — anahtarlar istemciden gelir, boş kayıtlar da sayılır
+RANGE_CACHE_MAX_ENTRIES = int(os.getenv("RANGE_CACHE_MAX_ENTRIES", "2000"))
+# Son bu kadar saniye her istekte yeniden çekilir (geç gelen örnekler için)
+RANGE_CACHE_REFRESH_SEC = float(os.getenv("RANGE_CACHE_REFRESH_SEC", "60"))
+# Aynı sorgunun bu süre içinde istenen en geniş penceresi korunur (1h / 6h panel birbirini budamaz)
+RANGE_CACHE_WINDOW_TTL_SEC = float(os.getenv("RANGE_CACHE_WINDOW_TTL_SEC", "600"))
+
+_DURATION_RE = re.compile(r"(\d+(?:\.\d+)?)(ms|s|m|h|d|w|y)")
+_DURATION_UNITS = {"ms": 0.001, "s": 1, "m": 60, "h": 3600, "d": 86400, "w": 604800, "y": 31536000}
+
+
+def _parse_step(value: Any) -> Optional[float]:
+    """Prometheus step: saniye (float) veya süre ifadesi ('15s', '1m30s')."""
+    try:
+        step = float(value)
+    except (TypeError, ValueError):
+        text = str(value or "").strip()
+        parts = _DURATION_RE.findall(text)
+        if not parts or "".join(n + u for n, u in parts) != text:
+            return None
+        step = sum(float(n) * _DURATION_UNITS[u] for n, u in parts)
+    return step if step > 0 else None
+
+
+def _parse_time(value: Any) -> Optional[float]:
+    """Prometheus zaman parametresi: unix saniye veya RFC3339."""
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        pass
+    try:
+        return datetime.fromisoformat(str(value).replace("Z", "+00:00")).timestamp()
+    except (TypeError, ValueError):
+        return None
+
+
+def _to_float(value: Any) -> float:
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return math.nan
+
+
+def _fmt_value(v: float) -> str:
+    """float → Prometheus örnek string'i ("3", "0.25", "NaN", "+Inf")."""
+    if math.isnan(v):
+        return "NaN"
+    if math.isinf(v):
+        return "+Inf" if v > 0 else "-Inf"
+    if v.is_integer() and abs(v) < 1e15:
+        return str(int(v))
+    return repr(v)
+
+
+def _fmt_ts(t: float) -> Any:
+    return int(t) if t.is_integer() else t
+
+
+def _lttb(ts: array, vals: array, threshold: int) -> Tuple[array, array]:
+    """Largest-Triangle-Three-Buckets: seri şeklini koruyarak threshold noktaya indirger."""
+    n = len(ts)
+    if threshold >= n or threshold < 3:
+        return ts, vals
+    out_t, out_v = array("d", [ts[0]]), array("d", [vals[0]])
+    every = (n - 2) / (threshold - 2)
+    a = 0
+    for i in range(threshold - 2):
+        # Sonraki bucket'ın ortalaması (üçgenin üçüncü köşesi)
+        nxt_lo = int((i + 1) * every) + 1
+        nxt_hi = min(int((i + 2) * every) + 1, n)
+        cnt = nxt_hi - nxt_lo
+        avg_t = sum(ts[nxt_lo:nxt_hi]) / cnt
+        avg_v = sum(vals[nxt_lo:nxt_hi]) / cnt
+
+        lo = int(i * every) + 1
+        hi = int((i + 1) * every) + 1
+        at, av = ts[a], vals[a]
+        best, best_area = lo, -1.0
+        for j in range(lo, hi):
+            area = abs((at - avg_t) * (vals[j] - av) - (at - ts[j]) * (avg_v - av))
+            if area > best_area:
+                best, best_area = j, area
+        out_t.append(ts[best])
+        out_v.append(vals[best])
+        a = best
+    out_t.append(ts[n - 1])
+    out_v.append(vals[n - 1])
+    return out_t, out_v
+
+
+def _minmax(ts: array, vals: array, threshold: int) -> Tuple[array, array]:
+    """Her bucket'tan min ve max örneği (zaman sırasıyla) tutar — tepe noktaları kaybolmaz."""
+    n = len(ts)
+    buckets = threshold // 2
+    if threshold >= n or buckets < 1:
+        return ts, vals
+    out_t, out_v = array("d"), array("d")
+    size = n / buckets
+    for b in range(buckets):
+        lo, hi = int(b * size), int((b + 1) * size)
+        if lo >= hi:
+            continue
+        seg = vals[lo:hi]
+        i_min = lo + min(range(hi - lo), key=seg.__getitem__)
+        i_max = lo + max(range(hi - lo), key=seg.__getitem__)
+        for j in sorted({i_min, i_max}):
+            out_t.append(ts[j])
+            out_v.append(vals[j])
+    return out_t, out_v
+
+
+def _downsample(ts: array, vals: array, max_points: Optional[int], method: str) -> Tuple[array, array]:
+    if not max_points or len(ts) <= max_points:
+        return ts, vals
+    # NaN örnekler üçgen alanını bozar — indirgeme yalnızca sonlu örnekler üzerinde yapılır
+    if any(math.isnan(v) for v in vals):
+        keep = [i for i, v in enumerate(vals) if not math.isnan(v)]
+        ts   = array("d", (ts[i] for i in keep))
+        vals = array("d", (vals[i] for i in keep))
+    return (_minmax if method == "minmax" else _lttb)(ts, vals, max_points)
+
+
+def _format_series(
+    metric: Dict[str, str], ts: array, vals: array, fmt: str,
+) -> Dict[str, Any]:
+    """'values' → Prometheus biçimi [[ts, "v"], ...]; 'columns' → {timestamps: [...], values: [...]}."""
+    if fmt == "columns":
+        return {
+            "metric":     metric,
+            "timestamps": [_fmt_ts(t) for t in ts],
+            "values":     [v if math.isfinite(v) else None for v in vals],
+        }
+    return {"metric": metric, "values": [[_fmt_ts(t), _fmt_value(v)] for t, v in zip(ts, vals)]}
+
+
+class _Series:
+    """Tek seri: zaman damgaları ve değerler paralel float dizilerinde (bisect ile dilimlenir)."""
+
+    __slots__ = ("metric", "ts", "vals")
+
+    def __init__(self, metric: Dict[str, str]):
+        self.metric = metric
+        self.ts   = array("d")
+        self.vals = array("d")
+
+
+class _RangeEntry:
+    __slots__ = ("series", "lo", "hi", "points", "windows")
+
+    def __init__(self, lo: float, hi: float):
+        self.series: Dict[Tuple, _Series] = {}
+        self.lo = lo
+        self.hi = hi
+        self.points = 0
+        # pencere uzunluğu (end - start) → son istenme zamanı (monotonic)
+        self.windows: Dict[float, float] = {}
+
+
+class RangeCache:
+    """
+    (cluster, query, step) anahtarlı range query cache.
+    start/end step'e hizalanır; kayan pencerede yalnızca eksik kuyruk
+    (+ RANGE_CACHE_REFRESH_SEC) Prometheus'tan çekilip mevcut serilerle birleştirilir.
+    window_ttl içinde istenen en geniş pencerenin dışına düşen örnekler ve boşalan seriler
+    atılır; toplam örnek sayısı max_points'i ya da kayıt sayısı max_entries'i aşarsa en az
+    kullanılan kayıtlar çıkarılır. Seri dönmeyen sorgular için kayıt tutulmaz.
+    """
+
+    def __init__(
+        self,
+        max_points: int,
+        refresh_sec: float,
+        window_ttl: float = RANGE_CACHE_WINDOW_TTL_SEC,
+        max_entries: int = RANGE_CACHE_MAX_ENTRIES,
+    ):
+        self.max_points  = max_points
+        self.max_entries = max_entries
+        self.refresh_sec = refresh_sec
+        self.window_ttl  = window_ttl
+        self._entries: "OrderedDict[Tuple[str, str, float], _RangeEntry]" = OrderedDict()
+        # Anahtar başına lock + onu tutan / bekleyen istek sayısı; kayıtla birlikte yaşar
+        self._locks: Dict[Tuple[str, str, float], asyncio.Lock] = {}
+        self._lock_users: Dict[Tuple[str, str, float], int] = {}
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self.points = 0
+        self.stats = {"hits": 0, "partial": 0, "misses": 0, "evictions": 0, "fetched_points": 0}
+
+    def _lock(self, key: Tuple[str, str, float]) -> asyncio.Lock:
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            self._locks.clear()
+            self._lock_users.clear()
+            self._loop = loop
+        lock = self._locks.get(key)
+        if lock is None:
+            lock = self._locks[key] = asyncio.Lock()
+        self._lock_users[key] = self._lock_users.get(key, 0) + 1
+        return lock
+
+    def _unlock(self, key: Tuple[str, str, float]) -> None:
+        users = self._lock_users.get(key, 0) - 1
+        if users > 0:
+            self._lock_users[key] = users
+            return
+        self._lock_users.pop(key, None)
+        if key not in self._entries:
+            # Başarısız / boş sorgu ya da çıkarılmış kayıt: lock da gider
+            self._locks.pop(key, None)
+
+    async def query(
+        self,
+        key: Tuple[str, str, float],
+        start: float,
+        end: float,
+        fetch: Callable[[float, float], Awaitable[dict]],
+        max_points: Optional[int] = None,
+        method: str = "lttb",
+        fmt: str = "values",
+    ) -> dict:
+        step = key[2]
+        start = math.floor(start / step) * step
+        end   = math.floor(end / step) * step
+        lock = self._lock(key)
+        try:
+            async with lock:
+                return await self._query_locked(key, start, end, fetch, max_points, method, fmt)
+        finally:
+            self._unlock(key)
+
+    async def _query_locked(
+        self,
+        key: Tuple[str, str, float],
+        start: float,
+        end: float,
+        fetch: Callable[[float, float], Awaitable[dict]],
+        max_points: Optional[int],
+        method: str,
+        fmt: str,
+    ) -> dict:
+        step = key[2]
+        entry = self._entries.get(key)
+        if entry is not None and entry.lo <= start <= entry.hi + step and end <= entry.hi:
+            self.stats["hits"] += 1
+            mode, fetch_start = "hit", None
+        elif entry is not None and entry.lo <= start <= entry.hi + step:
+            self.stats["partial"] += 1
+            tail = math.floor((entry.hi - self.refresh_sec) / step) * step
+            mode, fetch_start = "partial", max(start, tail)
+        else:
+            self.stats["misses"] += 1
+            mode, fetch_start = "miss", start
+
+        fetched = 0
+        if fetch_start is not None:
+            res = await fetch(fetch_start, end)
+            if not res.get("ok"):
+                return res
+            if mode == "miss" or entry is None:
+                self._drop(key)
+                entry = _RangeEntry(start, end)
+                self._entries[key] = entry
+            fetched = self._merge(entry, res.get("result", []), fetch_start)
+            entry.hi = max(entry.hi, end)
+            self.stats["fetched_points"] += fetched
+
+        self._trim(entry, self._keep_from(entry, end - start))
+        if entry.series:
+            self._entries.move_to_end(key)
+        else:
+            # Seri yok (boş sonuç / tümü budandı): boş kayıt tutulmaz
+            self._drop(key)
+        result = [
+            _format_series(metric, *_downsample(ts, vals, max_points, method), fmt)
+            for metric, ts, vals in self._slice(entry, start, end)
+        ]
+        self._evict()
+        return {
+            "ok": True,
+            "result": result,
+            "cache": {"mode": mode, "fetched_points": fetched, "start": start, "end": end},
+        }
+
+    def _merge(self, entry: _RangeEntry, rows: List[dict], fetch_start: float) -> int:
+        """fetch_start'tan itibaren eski örnekleri yenileriyle değiştirir."""
+        for series in entry.series.values():
+            cut = bisect_left(series.ts, fetch_start)
+            removed = len(series.ts) - cut
+            if removed:
+                del series.ts[cut:], series.vals[cut:]
+                entry.points -= removed
+                self.points  -= removed
+        fetched = 0
+        for row in rows:
+            metric = row.get("metric", {})
+            skey = tuple(sorted(metric.items()))
+            series = entry.series.get(skey)
+            if series is None:
+                series = entry.series[skey] = _Series(metric)
+            for ts, val in row.get("values", []):
+                series.ts.append(float(ts))
+                series.vals.append(_to_float(val))
+                fetched += 1
+        entry.points += fetched
+        self.points  += fetched
+        return fetched
+
+    def _keep_from(self, entry: _RangeEntry, window: float) -> float:
+        """Son window_ttl içinde istenen en geniş pencerenin (entry.hi'ye göre) başlangıcı."""
+        now = time.monotonic()
+        entry.windows[window] = now
+        for w, seen in list(entry.windows.items()):
+            if now - seen > self.window_ttl:
+                del entry.windows[w]
+        return entry.hi - max(entry.windows)
+
+    def _trim(self, entry: _RangeEntry, start: float) -> None:
+        """Pencerenin başından düşen örnekleri ve boşalan serileri atar."""
+        for skey in list(entry.series):
+            series = entry.series[skey]
+            cut = bisect_left(series.ts, start)
+            if cut:
+                del series.ts[:cut], series.vals[:cut]
+                entry.points -= cut
+                self.points  -= cut
+            if not series.ts:
+                del entry.series[skey]
+        entry.lo = max(entry.lo, start)
+
+    @staticmethod
+    def _slice(entry: _RangeEntry, start: float, end: float) -> List[Tuple[Dict[str, str], array, array]]:
+        result = []
+        for series in entry.series.values():
+            i = bisect_left(series.ts, start)
+            j = bisect_right(series.ts, end)
+            if i < j:
+                result.append((series.metric, series.ts[i:j], series.vals[i:j]))
+        return result
+
+    def _drop(self, key: Tuple[str, str, float]) -> None:
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self.points -= entry.points
+
+    def _evict(self) -> None:
+        while len(self._entries) > self.max_entries or (self.points > self.max_points and len(self._entries) > 1):
+            key = next(iter(self._entries))
+            self._drop(key)
+            if key not in self._lock_users:
+                self._locks.pop(key, None)
+            self.stats["evictions"] += 1
+
+    def snapshot_stats(self) -> Dict[str, Any]:
+        return {**self.stats, "entries": len(self._entries), "points": self.points, "locks": len(self._locks)}
+
+
+range_cache = RangeCache(RANGE_CACHE_MAX_POINTS, RANGE_CACHE_REFRESH_SEC)
+
+
+def _shape_range_result(res: dict, max_points: Optional[int], method: str, fmt: str) -> dict:
+    """Cache'siz range sonucunu indirger / biçimler."""
+    if not res.get("ok") or (not max_points and fmt == "values"):
+        return res
+    result = []
+    for row in res.get("result", []):
+        values = row.get("values", [])
+        ts   = array("d", (float(t) for t, _ in values))
+        vals = array("d", (_to_float(v) for _, v in values))
+        result.append(_format_series(row.get("metric", {}), *_downsample(ts, vals, max_points, method), fmt))
+    return {**res, "result": result}
+
+
 @router.post("/promql/range")
-def run_promql_range(body: Dict[str, Any]) -> Dict[str, Any]:
-    """Prometheus range query. body: {query, start, end, step, cluster?}"""
+async def run_promql_range(body: Dict[str, Any]) -> Dict[str, Any]:
+    """Prometheus range query. body: {query, start, end, step, cluster?, cache?, max_points?, downsample?, format?}
+    start/end/step çözümlenebiliyorsa sonuç range cache'ten (artımlı) sunulur; cache=false ile atlanır.
+    max_points verilirse her seri sunucuda indirgenir (downsample: "lttb" | "minmax").
+    format="columns" örnekleri {timestamps, values} sayısal dizileri olarak döner.
+    """
     query   = body.get("query", "").strip()
     cluster = body.get("cluster", "")
     if not query:
@@ -79,52 +555,354 @@ def run_promql_range(body: Dict[str, Any]) -> Dict[str, Any]:
     for k in ("start", "end", "step"):
         if body.get(k):
             params[k] = body[k]
-    return _prom_request("/api/v1/query_range", params, cluster)
+
+    method = body.get("downsample") or "lttb"
+    fmt    = body.get("format") or "values"
+    if method not in ("lttb", "minmax") or fmt not in ("values", "columns"):
+        return {"ok": False, "error": "Geçersiz downsample/format", "result": []}
+    try:
+        max_points = int(body["max_points"]) if body.get("max_points") else None
+    except (TypeError, ValueError):
+        return {"ok": False, "error": "Geçersiz max_points", "result": []}
+    if max_points is not None and max_points < 3:
+        return {"ok": False, "error": "max_points en az 3 olmalı", "result": []}
+
+    start = _parse_time(body.get("start"))
+    end   = _parse_time(body.get("end"))
+    step  = _parse_step(body.get("step"))
+    if body.get("cache", True) is False or start is None or end is None or step is None or end < start:
+        res = await _prom_request("/api/v1/query_range", params, cluster)
+        return _shape_range_result(res, max_points, method, fmt)
+
+    async def _fetch(fetch_start: float, fetch_end: float) -> dict:
+        return await _prom_request("/api/v1/query_range", {
+            "query": query, "start": fetch_start, "end": fetch_end, "step": step,
+        }, cluster)
+
+    return await range_cache.query((cluster, query, step), start, end, _fetch, max_points, method, fmt)
+
+
+# ── Batch ─────────────────────────────────────────────────────────────────────
+
+# Tek batch'te kabul edilen sorgu sayısı ve aynı anda upstream'e giden sorgu sayısı
+BATCH_MAX_QUERIES  = int(os.getenv("PROMQL_BATCH_MAX_QUERIES", "100"))
+BATCH_CONCURRENCY  = int(os.getenv("PROMQL_BATCH_CONCURRENCY", "10"))
+
+
+async def _batch_instant(spec: Dict[str, Any]) -> Dict[str, Any]:
+    query, cluster = spec.get("query", "").strip(), spec.get("cluster", "")
+    if not query:
+        return {"ok": False, "error": "Sorgu boş", "result": []}
+    if spec.get("time"):
+        return await _prom_request("/api/v1/query", {"query": query, "time": spec["time"]}, cluster)
+    # health endpoint'leriyle aynı anahtar: uçuştaki özdeş sorgu paylaşılır
+    res, _ = await _coalesced(
+        (cluster, "/api/v1/query", query), 0,
+        lambda: _prom_request("/api/v1/query", {"query": query}, cluster),
+    )
+    return res
+
+
+async def _batch_one(spec: Dict[str, Any], timeout: float, sem: asyncio.Semaphore) -> Dict[str, Any]:
+    async with sem:
+        started = time.monotonic()
+        run = run_promql_range(spec) if spec.get("type") == "range" else _batch_instant(spec)
+        try:
+            res = await asyncio.wait_for(run, timeout)
+        except asyncio.TimeoutError:
+            res = {"ok": False, "error": f"Sorgu zaman aşımı ({timeout}s)", "result": []}
+        except Exception as e:
+            res = {"ok": False, "error": str(e), "result": []}
+        return {**res, "duration_ms": round((time.monotonic() - started) * 1000, 1)}
+
+
+@router.post("/promql/batch")
+async def run_promql_batch(body: Dict[str, Any]) -> Dict[str, Any]:
+    """Birden çok instant/range sorgusunu tek istekte çalıştırır.
+    body: {cluster?, timeout?, queries: [{id, query, type?: "instant"|"range", cluster?, time?,
+    start?, end?, step?, max_points?, downsample?, format?}, ...]}
+    Özdeş sorgular bir kez çalışır; sonuçlar id ile, sorgu başına süre ve hata bilgisiyle döner.
+    """
+    queries = body.get("queries")
+    if not isinstance(queries, list) or not queries:
+        return {"ok": False, "error": "queries listesi boş", "results": {}}
+    if len(queries) > BATCH_MAX_QUERIES:
+        return {"ok": False, "error": f"En fazla {BATCH_MAX_QUERIES} sorgu gönderilebilir", "results": {}}
+    try:
+        timeout = float(body.get("timeout") or get_global_prometheus_timeout_sec())
+    except (TypeError, ValueError):
+        return {"ok": False, "error": "Geçersiz timeout", "results": {}}
+
+    default_cluster = body.get("cluster", "")
+    ids: List[str] = []
+    keys: List[str] = []
+    unique: Dict[str, Dict[str, Any]] = {}
+    for i, q in enumerate(queries):
+        if not isinstance(q, dict):
+            return {"ok": False, "error": f"Geçersiz sorgu (index {i})", "results": {}}
+        qid = str(q.get("id", i))
+        if qid in ids:
+            return {"ok": False, "error": f"Tekrarlanan id: {qid}", "results": {}}
+        spec = {k: v for k, v in q.items() if k != "id"}
+        spec.setdefault("cluster", default_cluster)
+        spec["type"] = spec.get("type") or "instant"
+        spec["query"] = str(spec.get("query", "")).strip()
+        key = json.dumps(spec, sort_keys=True, default=str)
+        ids.append(qid)
+        keys.append(key)
+        unique.setdefault(key, spec)
+
+    started = time.monotonic()
+    sem = asyncio.Semaphore(BATCH_CONCURRENCY)
+    done = dict(zip(unique, await asyncio.gather(*(
+        _batch_one(spec, timeout, sem) for spec in unique.values()
+    ))))
+
+    results: Dict[str, Any] = {}
+    seen = set()
+    for qid, key in zip(ids, keys):
+        results[qid] = {**done[key], "deduplicated": key in seen}
+        seen.add(key)
+    return {
+        "ok":          True,
+        "total":       len(ids),
+        "executed":    len(unique),
+        "failed":      sum(1 for r in results.values() if not r.get("ok")),
+        "duration_ms": round((time.monotonic() - started) * 1000, 1),
+        "results":     results,
+    }
 
 
 # ── Label helpers ─────────────────────────────────────────────────────────────
 
+# Label / label-value listeleri bu süreden eskiyse arka planda yenilenir (istek beklemez)
+LABEL_INDEX_REFRESH_SEC = float(os.getenv("LABEL_INDEX_REFRESH_SEC", "300"))
+# Bellekte tutulan liste sayısı (cluster × label × match[]) — LRU ile boşaltılır
+LABEL_INDEX_MAX_LISTS   = int(os.getenv("LABEL_INDEX_MAX_LISTS", "512"))
+
+_LabelKey = Tuple[str, str, Tuple[str, ...]]
+
+
+class _LabelList:
+    """
+    Küçük harfe göre sıralı değerler + paralel küçük harf listesi (bisect ile prefix arama).
+    Substring / fuzzy arama için küçük harfli değerler tek bir metinde birleştirilir;
+    tarama Python döngüsü yerine str.find / regex ile yapılır.
+    """
+
+    __slots__ = ("items", "lower", "blob", "starts", "loaded_at", "refreshing")
+
+    def __init__(self, values: List[str]):
+        self.items = sorted((str(v) for v in values), key=str.lower)
+        self.lower = [v.lower().replace("\n", " ") for v in self.items]
+        self.blob = "\n".join(self.lower) + "\n"
+        self.starts = array("q")
+        pos = 0
+        for low in self.lower:
+            self.starts.append(pos)
+            pos += len(low) + 1
+        self.loaded_at = time.monotonic()
+        self.refreshing = False
+
+    def _scan(self, find: Callable[[int], int], out: List[str], taken: set, cap: int) -> bool:
+        """find(pos) → eşleşme offset'i (yoksa -1). Kesildiyse True döner."""
+        pos = 0
+        n = len(self.starts)
+        while True:
+            hit = find(pos)
+            if hit < 0:
+                return False
+            k = bisect_right(self.starts, hit) - 1
+            if k not in taken:
+                if len(out) >= cap:
+                    return True
+                out.append(self.items[k])
+                taken.add(k)
+            if k + 1 >= n:
+                return False
+            pos = self.starts[k + 1]
+
+    def search(self, q: str, limit: Optional[int], fuzzy: bool) -> Tuple[List[str], bool]:
+        """Önce prefix, sonra (fuzzy ise) substring ve alt dizi eşleşmeleri; (sonuç, kesildi_mi)."""
+        if not q:
+            if limit is None or len(self.items) <= limit:
+                return self.items, False
+            return self.items[:limit], True
+        q = q.lower()
+        cap = limit if limit is not None else len(self.items)
+        i = bisect_left(self.lower, q)
+        j = i
+        n = len(self.lower)
+        while j < n and self.lower[j].startswith(q) and j - i <= cap:
+            j += 1
+        out = self.items[i:min(j, i + cap)]
+        if j - i > cap:
+            return out, True
+        if not fuzzy:
+            return out, False
+        taken = set(range(i, j))
+        if self._scan(lambda pos: self.blob.find(q, pos), out, taken, cap):
+            return out, True
+        # a[^\nb]*b[^\nc]*c — negatif karakter sınıfı geri izlemeyi (backtracking) sınırlar
+        subseq = re.compile(re.escape(q[0]) + "".join(
+            f"[^\\n{re.escape(ch)}]*{re.escape(ch)}" for ch in q[1:]
+        ))
+
+        def _find(pos: int) -> int:
+            m = subseq.search(self.blob, pos)
+            return m.start() if m else -1
+
+        return out, self._scan(_find, out, taken, cap)
+
+
+class LabelIndex:
+    """
+    Cluster başına label adları ve label değerleri için bellek içi index.
+    İlk istek listeyi Prometheus'tan çeker; sonraki aramalar bellekten yanıtlanır,
+    liste bayatladığında yenileme arka planda yapılır.
+    """
+
+    def __init__(self, refresh_sec: float, max_lists: int):
+        self.refresh_sec = refresh_sec
+        self.max_lists   = max_lists
+        self._lists: "OrderedDict[_LabelKey, _LabelList]" = OrderedDict()
+        self._tasks: set = set()
+        self.stats = {"hits": 0, "misses": 0, "refreshes": 0, "refresh_errors": 0}
+
+    async def lookup(
+        self, key: _LabelKey, fetch: Callable[[], Awaitable[dict]],
+    ) -> Tuple[Optional[_LabelList], str]:
+        entry = self._lists.get(key)
+        if entry is None:
+            self.stats["misses"] += 1
+            res, _ = await _coalesced(("label-index",) + key, 0, fetch)
+            if not res.get("ok"):
+                return None, res.get("error", "query failed")
+            entry = self._store(key, res.get("result", []))
+            return entry, ""
+        self.stats["hits"] += 1
+        self._lists.move_to_end(key)
+        if time.monotonic() - entry.loaded_at > self.refresh_sec and not entry.refreshing:
+            entry.refreshing = True
+            task = asyncio.get_running_loop().create_task(self._refresh(key, entry, fetch))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+        return entry, ""
+
+    async def _refresh(self, key: _LabelKey, entry: _LabelList, fetch: Callable[[], Awaitable[dict]]) -> None:
+        try:
+            res = await fetch()
+            if res.get("ok"):
+                self.stats["refreshes"] += 1
+                self._store(key, res.get("result", []))
+            else:
+                self.stats["refresh_errors"] += 1
+        finally:
+            entry.refreshing = False
+
+    def _store(self, key: _LabelKey, values: List[str]) -> _LabelList:
+        entry = self._lists[key] = _LabelList(values)
+        self._lists.move_to_end(key)
+        while len(self._lists) > self.max_lists:
+            self._lists.popitem(last=False)
+        return entry
+
+    def clear(self) -> None:
+        self._lists.clear()
+
+    def snapshot_stats(self) -> Dict[str, Any]:
+        return {
+            **self.stats,
+            "lists":  len(self._lists),
+            "values": sum(len(e.items) for e in self._lists.values()),
+        }
+
+
+label_index = LabelIndex(LABEL_INDEX_REFRESH_SEC, LABEL_INDEX_MAX_LISTS)
+
+registry.gauge(
+    "observe_range_cache", "Range cache istatistikleri (stat label'ı ile).",
+    lambda: [({"stat": k}, v) for k, v in range_cache.snapshot_stats().items() if isinstance(v, (int, float))],
+)
+registry.gauge(
+    "observe_label_index", "Label index istatistikleri (stat label'ı ile).",
+    lambda: [({"stat": k}, v) for k, v in label_index.snapshot_stats().items()],
+)
+
+
+async def _label_search(
+    path: str, label: str, cluster: str, q: str, limit: Optional[int], match: List[str], fuzzy: bool,
+) -> Dict[str, Any]:
+    matches = tuple(sorted(set(m for m in match if m)))
+    params: Dict[str, Any] = {"match[]": list(matches)} if matches else {}
+    entry, error = await label_index.lookup(
+        (cluster, label, matches), lambda: _prom_request(path, params, cluster),
+    )
+    if entry is None:
+        return {"ok": False, "error": error, "result": []}
+    result, truncated = entry.search(q, limit, fuzzy)
+    return {
+        "ok":        True,
+        "result":    result,
+        "truncated": truncated,
+        "age_sec":   round(time.monotonic() - entry.loaded_at, 1),
+    }
+
+
 @router.get("/promql/labels")
-def list_labels(cluster: str = Query("")) -> Dict[str, Any]:
-    """Prometheus'taki tüm label adlarını döner."""
-    return _prom_request("/api/v1/labels", {}, cluster)
+async def list_labels(
+    cluster: str           = Query(""),
+    q:       str           = Query(""),
+    limit:   Optional[int] = Query(None, ge=1, le=10000),
+    match:   List[str]     = Query([], alias="match[]"),
+    fuzzy:   bool          = Query(True),
+) -> Dict[str, Any]:
+    """Label adları (bellek içi index'ten). q: prefix/fuzzy arama, match[]: seri seçicisiyle daraltma."""
+    return await _label_search("/api/v1/labels", "", cluster, q, limit, match, fuzzy)
 
 
 @router.get("/promql/label-values")
-def list_label_values(label: str = Query(...), cluster: str = Query("")) -> Dict[str, Any]:
-    """Belirtilen label'ın tüm değerlerini döner."""
-    return _prom_request(f"/api/v1/label/{label}/values", {}, cluster)
+async def list_label_values(
+    label:   str           = Query(...),
+    cluster: str           = Query(""),
+    q:       str           = Query(""),
+    limit:   Optional[int] = Query(None, ge=1, le=10000),
+    match:   List[str]     = Query([], alias="match[]"),
+    fuzzy:   bool          = Query(True),
+) -> Dict[str, Any]:
+    """Belirtilen label'ın değerleri (bellek içi index'ten). q / limit / match[] list_labels ile aynı."""
+    return await _label_search(f"/api/v1/label/{label}/values", label, cluster, q, limit, match, fuzzy)
 
 
 # ── Alerts ────────────────────────────────────────────────────────────────────
 
 @router.get("/alerts")
-def get_alerts(cluster: str = Query("")) -> Dict[str, Any]:
+async def get_alerts(cluster: str = Query("")) -> Dict[str, Any]:
     """Prometheus'tan şu an firing olan alert listesi."""
-    return _prom_request("/api/v1/query", {"query": 'ALERTS{alertstate="firing"}'}, cluster)
+    return await _prom_request("/api/v1/query", {"query": 'ALERTS{alertstate="firing"}'}, cluster)
 
 
 # ── Pod Metrics ───────────────────────────────────────────────────────────────
 
 @router.get("/pod-metrics")
-def get_pod_metrics(
+async def get_pod_metrics(
     pod:       str = Query(...),
     namespace: str = Query(...),
     cluster:   str = Query(""),
 ) -> Dict[str, Any]:
     """Pod başına container CPU (rate 5m, cores) ve Memory (working set, bytes)."""
-    cpu = _prom_request("/api/v1/query", {
-        "query": (
-            f'sum(rate(container_cpu_usage_seconds_total{{'
-            f'pod="{pod}",namespace="{namespace}",'
-            f'container!="",container!="POD"}}[5m])) by (container)'
-        ),
-    }, cluster)
-    mem = _prom_request("/api/v1/query", {
-        "query": (
-            f'sum(container_memory_working_set_bytes{{'
-            f'pod="{pod}",namespace="{namespace}",'
-            f'container!="",container!="POD"}}) by (container)'
-        ),
-    }, cluster)
+    cpu_query = (
+        f'sum(rate(container_cpu_usage_seconds_total{{'
+        f'pod="{pod}",namespace="{namespace}",'
+        f'container!="",container!="POD"}}[5m])) by (container)'
+    )
+    mem_query = (
+        f'sum(container_memory_working_set_bytes{{'
+        f'pod="{pod}",namespace="{namespace}",'
+        f'container!="",container!="POD"}}) by (container)'
+    )
+    cpu, mem = await asyncio.gather(
+        _prom_request("/api/v1/query", {"query": cpu_query}, cluster),
+        _prom_request("/api/v1/query", {"query": mem_query}, cluster),
+    )
     return {"cpu": cpu, "memory": mem}
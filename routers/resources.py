@@ -1,22 +1,92 @@
+from contextlib import AsyncExitStack
 from fastapi import APIRouter, Query, HTTPException
-from typing import Any, Dict, List, Optional
-import requests
+from fastapi.responses import StreamingResponse
+from typing import Any, Callable, Dict, List, Optional, Tuple, Union
+import re
 import time
+import asyncio
+import httpx
+from breaker import breakers
+from limiter import Overloaded, ocp_limiter
 from config import get_clusters, get_token
+from informer import informers
+from jsonstream import Projection, parse_list
+from upstream import http_get, http_stream
+from routers.metrics import _prom_request
 
 router = APIRouter(prefix="/api/observe", tags=["observe"])
 
 
-def _ocp_get(ocp_api: str, insecure: bool, token: str, path: str, params: dict = None) -> dict:
-    resp = requests.get(
-        f"{ocp_api}{path}",
-        headers={"Authorization": f"Bearer {token}", "Accept": "application/json"},
-        params=params or {},
-        timeout=15,
-        verify=not insecure,
-    )
+OCP_TIMEOUT_SEC = 15
+
+# Yalnızca metadata okunan LIST'lerde sunucu PartialObjectMetadataList döndürür (spec/status
+# hiç gönderilmez). Desteklemeyen sunucu Accept'teki application/json'a düşer; yine de
+# 406/415 dönerse o API için bir daha denenmez.
+_METADATA_ACCEPT = "application/json;as=PartialObjectMetadataList;g=meta.k8s.io;v=v1,application/json"
+_metadata_rejected: set = set()
+
+
+def _metadata_only(projection: Optional[Projection]) -> bool:
+    return projection is not None and set(projection) <= {"metadata"}
+
+
+async def _ocp_get(
+    ocp_api: str, insecure: bool, token: str, path: str, params: dict = None,
+    projection: Optional[Projection] = None,
+) -> dict:
+    """
+    OCP API GET. projection verilirse LIST gövdesi akarken ayrıştırılır ve her item
+    yalnızca projection'daki alanlara budanır — tepe bellek tüm liste değil tek item kadardır.
+    projection yalnızca metadata alanlarıysa PartialObjectMetadataList istenir.
+    """
+    accept = "application/json"
+    if _metadata_only(projection) and ocp_api.rstrip("/") not in _metadata_rejected:
+        accept = _METADATA_ACCEPT
+    br = breakers.get("ocp", ocp_api)
+    if not br.allow():
+        raise HTTPException(503, f"OCP API erişilemiyor (circuit open, {br.retry_in():.0f}s sonra yeniden denenecek): {br.last_error}")
+    timeout = br.timeout(OCP_TIMEOUT_SEC)
+    data = None
+    try:
+        async with ocp_limiter.slot(ocp_api):
+            started = time.monotonic()
+            if projection is None:
+                resp = await http_get(
+                    ocp_api, path,
+                    token=token,
+                    headers={"Accept": "application/json"},
+                    params=params,
+                    timeout=timeout,
+                    verify=not insecure,
+                )
+            else:
+                async with http_stream(
+                    ocp_api, path,
+                    token=token,
+                    headers={"Accept": accept},
+                    params=params,
+                    timeout=timeout,
+                    verify=not insecure,
+                ) as resp:
+                    if resp.status_code < 400:
+                        data = await parse_list(resp.aiter_bytes(), projection)
+    except httpx.TimeoutException:
+        br.failure(f"timeout ({timeout:.1f}s)", timeout)
+        raise
+    except httpx.TransportError as e:
+        br.failure(str(e) or type(e).__name__)
+        raise
+    finally:
+        br.release()
+    if resp.status_code >= 500:
+        br.failure(f"HTTP {resp.status_code}")
+    else:
+        br.success(time.monotonic() - started)
+    if resp.status_code in (406, 415) and accept != "application/json":
+        _metadata_rejected.add(ocp_api.rstrip("/"))
+        return await _ocp_get(ocp_api, insecure, token, path, params, projection)
     resp.raise_for_status()
-    return resp.json()
+    return data if data is not None else resp.json()
 
 
 def _resolve_cluster(cluster: str) -> Dict[str, Any]:
@@ -29,20 +99,150 @@ def _resolve_cluster(cluster: str) -> Dict[str, Any]:
     return c
 
 
+# ── Listing helpers (watch cache / API, pagination, selectors) ──────────────
+
+# Watch cache'ten sunulan sayfaların continue token öneki (API token'larından ayırt etmek için)
+_CACHE_CURSOR = "wc:"
+
+_SET_EXPR = re.compile(r"^\s*([\w./-]+)\s+(in|notin)\s+\(([^)]*)\)\s*$")
+
+
+def _split_selector(selector: str) -> List[str]:
+    """Virgülle ayır; 'in (a,b)' içindeki virgülleri koru."""
+    parts, depth, cur = [], 0, ""
+    for ch in selector:
+        if ch == "(":
+            depth += 1
+        elif ch == ")":
+            depth -= 1
+        if ch == "," and depth == 0:
+            parts.append(cur)
+            cur = ""
+        else:
+            cur += ch
+    parts.append(cur)
+    return [p.strip() for p in parts if p.strip()]
+
+
+def _labels_match(selector: str, labels: Dict[str, str]) -> bool:
+    """Kubernetes labelSelector değerlendirmesi (=, ==, !=, in, notin, exists, !exists)."""
+    for req in _split_selector(selector or ""):
+        m = _SET_EXPR.match(req)
+        if m:
+            key, op, values = m.group(1), m.group(2), {v.strip() for v in m.group(3).split(",")}
+            if (labels.get(key) in values) != (op == "in"):
+                return False
+        elif "!=" in req:
+            key, val = (x.strip() for x in req.split("!=", 1))
+            if labels.get(key) == val:
+                return False
+        elif "=" in req:
+            key, val = (x.strip() for x in req.replace("==", "=").split("=", 1))
+            if labels.get(key) != val:
+                return False
+        elif req.startswith("!"):
+            if req[1:].strip() in labels:
+                return False
+        elif req not in labels:
+            return False
+    return True
+
+
+def _field_value(item: Dict[str, Any], path: str) -> Any:
+    cur: Any = item
+    for part in path.split("."):
+        if not isinstance(cur, dict):
+            return None
+        cur = cur.get(part)
+    return cur
+
+
+async def _list_page(
+    c: Dict[str, Any],
+    token: str,
+    namespace: str,
+    resource: str,
+    fields: Optional[Dict[str, str]] = None,
+    label_selector: str = "",
+    limit: Optional[int] = None,
+    cont: Optional[str] = None,
+    predicate: Optional[Callable[[Dict[str, Any]], bool]] = None,
+    projection: Optional[Projection] = None,
+) -> Tuple[List[Dict[str, Any]], Optional[str], Optional[int]]:
+    """
+    Tek sayfa nesne döner: (items, continue, remaining).
+    Watch cache açıksa filtre + sayfalama bellekte, değilse fieldSelector /
+    labelSelector / limit / continue doğrudan Kubernetes API'sine iletilir.
+    predicate API'nin desteklemediği filtreler içindir; API yolunda sayfa
+    geldikten sonra uygulandığından sayfa limit'ten kısa olabilir.
+    projection API yolunda item'ları akış sırasında budar (predicate'in okuduğu alanları içermeli).
+    """
+    fields = fields or {}
+    if not cont or cont.startswith(_CACHE_CURSOR):
+        items = await informers.items(c, token, namespace, resource)
+        if items is not None:
+            items = [
+                i for i in items
+                if all(_field_value(i, k) == v for k, v in fields.items())
+                and _labels_match(label_selector, (i.get("metadata") or {}).get("labels") or {})
+                and (predicate is None or predicate(i))
+            ]
+            if limit is None:
+                return items, None, None
+            items.sort(key=lambda i: (i.get("metadata") or {}).get("name", ""))
+            try:
+                offset = int(cont[len(_CACHE_CURSOR):]) if cont else 0
+            except ValueError:
+                raise HTTPException(400, "Geçersiz continue token")
+            end = offset + limit
+            remaining = max(0, len(items) - end)
+            return items[offset:end], (f"{_CACHE_CURSOR}{end}" if remaining else None), remaining
+
+    params: Dict[str, Any] = {}
+    if fields:
+        params["fieldSelector"] = ",".join(f"{k}={v}" for k, v in fields.items())
+    if label_selector:
+        params["labelSelector"] = label_selector
+    if limit:
+        params["limit"] = limit
+    if cont and not cont.startswith(_CACHE_CURSOR):
+        params["continue"] = cont
+    data = await _ocp_get(c["ocp_api"], c["insecure"], token,
+                          f"/api/v1/namespaces/{namespace}/{resource}", params, projection)
+    meta = data.get("metadata") or {}
+    items = data.get("items", [])
+    if predicate is not None:
+        items = [i for i in items if predicate(i)]
+    return items, meta.get("continue") or None, meta.get("remainingItemCount")
+
+
+def _page_response(rows: List[Dict[str, Any]], cont: Optional[str], remaining: Optional[int]) -> Dict[str, Any]:
+    return {"items": rows, "continue": cont, "remaining": remaining}
+
+
+@router.get("/watch-cache")
+def watch_cache_status() -> Dict[str, Any]:
+    """Aktif pod/event watch'ları: senkron durumu, nesne sayısı, relist sayaçları."""
+    return {"enabled": informers.enabled(), "informers": informers.status()}
+
+
 # ── Namespaces ────────────────────────────────────────────────────────────────
 
+_NAME_FIELDS: Projection = {"metadata": {"name": None}}
+
 @router.get("/namespaces")
-def list_namespaces(cluster: str = Query(...)) -> List[str]:
+async def list_namespaces(cluster: str = Query(...)) -> List[str]:
     """OpenShift projects (veya K8s namespaces) listesi."""
     c = _resolve_cluster(cluster)
     token = get_token(cluster)
     try:
         # Önce OpenShift projects API'sini dene
         try:
-            data = _ocp_get(c["ocp_api"], c["insecure"], token,
-                            "/apis/project.openshift.io/v1/projects")
+            data = await _ocp_get(c["ocp_api"], c["insecure"], token,
+                                  "/apis/project.openshift.io/v1/projects", projection=_NAME_FIELDS)
         except Exception:
-            data = _ocp_get(c["ocp_api"], c["insecure"], token, "/api/v1/namespaces")
+            data = await _ocp_get(c["ocp_api"], c["insecure"], token, "/api/v1/namespaces",
+                                  projection=_NAME_FIELDS)
         return sorted(item["metadata"]["name"] for item in data.get("items", []))
     except HTTPException:
         raise
@@ -52,51 +252,113 @@ def list_namespaces(cluster: str = Query(...)) -> List[str]:
 
 # ── Pods ──────────────────────────────────────────────────────────────────────
 
-@router.get("/pods")
-def list_pods(
-    cluster:   str = Query(...),
-    namespace: str = Query(...),
+# _pod_row, _pod_filter ve watch cache filtrelerinin okuduğu alanlar; managedFields,
+# annotations, env, volume vb. LIST akarken atılır
+_POD_FIELDS: Projection = {
+    "metadata": {"name": None, "namespace": None, "creationTimestamp": None, "labels": None},
+    "spec":     {"nodeName": None, "containers": {"name": None, "image": None}},
+    "status": {
+        "phase":             None,
+        "conditions":        {"type": None, "status": None},
+        "containerStatuses": {"name": None, "ready": None, "restartCount": None},
+    },
+}
+
+def _pod_row(item: Dict[str, Any]) -> Dict[str, Any]:
+    meta   = item.get("metadata", {})
+    spec   = item.get("spec", {})
+    status = item.get("status", {})
+
+    conditions = {cond["type"]: cond["status"]
+                  for cond in status.get("conditions", []) if "type" in cond}
+
+    container_statuses = {cs["name"]: cs
+                          for cs in status.get("containerStatuses", [])}
+
+    containers = []
+    for co in spec.get("containers", []):
+        cname = co.get("name", "")
+        cs = container_statuses.get(cname, {})
+        containers.append({
+            "name":     cname,
+            "image":    co.get("image", ""),
+            "ready":    cs.get("ready", False),
+            "restarts": cs.get("restartCount", 0),
+        })
+
+    return {
+        "name":       meta.get("name"),
+        "namespace":  meta.get("namespace"),
+        "phase":      status.get("phase"),
+        "ready":      conditions.get("Ready", "False"),
+        "containers": containers,
+        "node":       spec.get("nodeName"),
+        "created_at": meta.get("creationTimestamp"),
+        "labels":     meta.get("labels", {}),
+    }
+
+
+async def _pod_items(
+    c: Dict[str, Any], token: str, namespace: str, projection: Optional[Projection] = None,
 ) -> List[Dict[str, Any]]:
-    """Namespace'teki pod listesi."""
+    """Namespace'teki tüm pod nesneleri — watch cache açıksa bellekten, değilse LIST ile."""
+    items, _, _ = await _list_page(c, token, namespace, "pods", projection=projection)
+    return items
+
+
+def _pod_filter(ready: Optional[bool], restarts_gt: Optional[int]) -> Optional[Callable[[Dict[str, Any]], bool]]:
+    """ready / restarts_gt için pod predicate'i (Kubernetes selector'ları bunları desteklemez)."""
+    if ready is None and restarts_gt is None:
+        return None
+
+    def _match(item: Dict[str, Any]) -> bool:
+        status = item.get("status", {})
+        if ready is not None:
+            is_ready = any(cond.get("type") == "Ready" and cond.get("status") == "True"
+                           for cond in status.get("conditions", []))
+            if is_ready != ready:
+                return False
+        if restarts_gt is not None:
+            restarts = sum(cs.get("restartCount", 0) or 0 for cs in status.get("containerStatuses", []))
+            if restarts <= restarts_gt:
+                return False
+        return True
+
+    return _match
+
+
+@router.get("/pods")
+async def list_pods(
+    cluster:        str            = Query(...),
+    namespace:      str            = Query(...),
+    phase:          Optional[str]  = Query(None),
+    node:           Optional[str]  = Query(None),
+    label_selector: Optional[str]  = Query(None, alias="labelSelector"),
+    ready:          Optional[bool] = Query(None),
+    restarts_gt:    Optional[int]  = Query(None, ge=0),
+    limit:          Optional[int]  = Query(None, ge=1, le=5000),
+    cont:           Optional[str]  = Query(None, alias="continue"),
+) -> Union[List[Dict[str, Any]], Dict[str, Any]]:
+    """Namespace'teki pod listesi.
+    phase/node/labelSelector API'ye selector olarak iletilir; ready ve restarts_gt sunucuda süzülür.
+    limit verilirse {items, continue, remaining} sayfası döner (continue ile sonraki sayfa).
+    """
     c = _resolve_cluster(cluster)
     token = get_token(cluster)
+    fields: Dict[str, str] = {}
+    if phase:
+        fields["status.phase"] = phase
+    if node:
+        fields["spec.nodeName"] = node
     try:
-        data = _ocp_get(c["ocp_api"], c["insecure"], token,
-                        f"/api/v1/namespaces/{namespace}/pods")
-        pods = []
-        for item in data.get("items", []):
-            meta   = item.get("metadata", {})
-            spec   = item.get("spec", {})
-            status = item.get("status", {})
-
-            conditions = {cond["type"]: cond["status"]
-                          for cond in status.get("conditions", []) if "type" in cond}
-
-            container_statuses = {cs["name"]: cs
-                                  for cs in status.get("containerStatuses", [])}
-
-            containers = []
-            for co in spec.get("containers", []):
-                cname = co.get("name", "")
-                cs = container_statuses.get(cname, {})
-                containers.append({
-                    "name":     cname,
-                    "image":    co.get("image", ""),
-                    "ready":    cs.get("ready", False),
-                    "restarts": cs.get("restartCount", 0),
-                })
-
-            pods.append({
-                "name":       meta.get("name"),
-                "namespace":  meta.get("namespace"),
-                "phase":      status.get("phase"),
-                "ready":      conditions.get("Ready", "False"),
-                "containers": containers,
-                "node":       spec.get("nodeName"),
-                "created_at": meta.get("creationTimestamp"),
-                "labels":     meta.get("labels", {}),
-            })
-        return pods
+        items, next_cont, remaining = await _list_page(
+            c, token, namespace, "pods", fields, label_selector or "", limit, cont,
+            _pod_filter(ready, restarts_gt), _POD_FIELDS,
+        )
+        rows = [_pod_row(item) for item in items]
+        if limit is None:
+            return rows
+        return _page_response(rows, next_cont, remaining)
     except HTTPException:
         raise
     except Exception as e:
@@ -105,44 +367,71 @@ def list_pods(
 
 # ── Events ────────────────────────────────────────────────────────────────────
 
+_EVENT_FIELDS: Projection = {
+    "metadata":       {"name": None, "namespace": None},
+    "type":           None,
+    "reason":         None,
+    "message":        None,
+    "count":          None,
+    "firstTimestamp": None,
+    "lastTimestamp":  None,
+    "involvedObject": {"name": None, "kind": None},
+}
+
+def _event_row(item: Dict[str, Any]) -> Dict[str, Any]:
+    return {
+        "type":       item.get("type"),
+        "reason":     item.get("reason"),
+        "message":    item.get("message"),
+        "count":      item.get("count"),
+        "first_time": item.get("firstTimestamp"),
+        "last_time":  item.get("lastTimestamp"),
+        "object":     item.get("involvedObject", {}).get("name"),
+        "kind":       item.get("involvedObject", {}).get("kind"),
+    }
+
+
+async def _event_items(
+    c: Dict[str, Any], token: str, namespace: str, fields: Dict[str, str],
+    projection: Optional[Projection] = None,
+) -> List[Dict[str, Any]]:
+    """Namespace event nesneleri — watch cache açıksa bellekten, değilse LIST ile."""
+    items, _, _ = await _list_page(c, token, namespace, "events", fields, projection=projection)
+    return items
+
+
 @router.get("/events")
-def list_events(
+async def list_events(
     cluster:   str           = Query(...),
     namespace: str           = Query(...),
     pod:       Optional[str] = Query(None),
     kind:      Optional[str] = Query(None),
     event_type: Optional[str] = Query(None, alias="type"),
-) -> List[Dict[str, Any]]:
-    """Namespace'teki Kubernetes event listesi. pod ile filtrelenebilir."""
+    limit:     Optional[int] = Query(None, ge=1, le=5000),
+    cont:      Optional[str] = Query(None, alias="continue"),
+) -> Union[List[Dict[str, Any]], Dict[str, Any]]:
+    """Namespace'teki Kubernetes event listesi. pod ile filtrelenebilir.
+    limit verilirse {items, continue, remaining} sayfası döner; sıralama sayfa içindedir.
+    """
     c = _resolve_cluster(cluster)
     token = get_token(cluster)
 
-    field_parts = []
+    fields: Dict[str, str] = {}
     if pod:
-        field_parts.append(f"involvedObject.name={pod}")
-        field_parts.append(f"involvedObject.kind={kind or 'Pod'}")
+        fields["involvedObject.name"] = pod
+        fields["involvedObject.kind"] = kind or "Pod"
     if event_type:
-        field_parts.append(f"type={event_type}")
-
-    params = {"fieldSelector": ",".join(field_parts)} if field_parts else {}
+        fields["type"] = event_type
 
     try:
-        data = _ocp_get(c["ocp_api"], c["insecure"], token,
-                        f"/api/v1/namespaces/{namespace}/events", params)
-        events = []
-        for item in data.get("items", []):
-            events.append({
-                "type":       item.get("type"),
-                "reason":     item.get("reason"),
-                "message":    item.get("message"),
-                "count":      item.get("count"),
-                "first_time": item.get("firstTimestamp"),
-                "last_time":  item.get("lastTimestamp"),
-                "object":     item.get("involvedObject", {}).get("name"),
-                "kind":       item.get("involvedObject", {}).get("kind"),
-            })
+        items, next_cont, remaining = await _list_page(
+            c, token, namespace, "events", fields, "", limit, cont, projection=_EVENT_FIELDS,
+        )
+        events = [_event_row(item) for item in items]
         events.sort(key=lambda e: (e.get("last_time") or ""), reverse=True)
-        return events
+        if limit is None:
+            return events
+        return _page_response(events, next_cont, remaining)
     except HTTPException:
         raise
     except Exception as e:
@@ -151,25 +440,17 @@ def list_events(
 
 # ── Pod Logs ──────────────────────────────────────────────────────────────────
 
-@router.get("/pod-logs")
-def get_pod_logs(
-    cluster:    str           = Query(...),
-    namespace:  str           = Query(...),
-    pod:        str           = Query(...),
-    container:  Optional[str] = Query(None),
-    tail_lines: int           = Query(200, ge=1, le=2000),
-    previous:   bool          = Query(False),
-) -> Dict[str, Any]:
-    """Pod log içeriği (son tail_lines satır, max 2000)."""
-    c = _resolve_cluster(cluster)
-    token = get_token(cluster)
-
-    # Pod durumunu al — container adı ve CrashLoopBackOff tespiti için
+async def _log_target(
+    c: Dict[str, Any], token: str, namespace: str, pod: str, container: Optional[str],
+) -> Tuple[Optional[str], bool]:
+    """Pod durumundan log alınacak container'ı ve CrashLoopBackOff durumunu belirler."""
     resolved_container = container
     is_crash_loop = False
     try:
-        pod_data = _ocp_get(c["ocp_api"], c["insecure"], token,
-                            f"/api/v1/namespaces/{namespace}/pods/{pod}")
+        pod_data = await informers.get(c, token, namespace, "pods", pod)
+        if pod_data is None:
+            pod_data = await _ocp_get(c["ocp_api"], c["insecure"], token,
+                                      f"/api/v1/namespaces/{namespace}/pods/{pod}")
         container_statuses = pod_data.get("status", {}).get("containerStatuses", [])
         spec_containers = [co["name"] for co in pod_data.get("spec", {}).get("containers", [])]
 
@@ -188,18 +469,36 @@ def get_pod_logs(
                 break
     except Exception:
         pass
+    return resolved_container, is_crash_loop
+
 
-    log_url = f"{c['ocp_api']}/api/v1/namespaces/{namespace}/pods/{pod}/log"
-    log_headers = {"Authorization": f"Bearer {token}", "Accept": "text/plain"}
+@router.get("/pod-logs")
+async def get_pod_logs(
+    cluster:    str           = Query(...),
+    namespace:  str           = Query(...),
+    pod:        str           = Query(...),
+    container:  Optional[str] = Query(None),
+    tail_lines: int           = Query(200, ge=1, le=2000),
+    previous:   bool          = Query(False),
+) -> Dict[str, Any]:
+    """Pod log içeriği (son tail_lines satır, max 2000)."""
+    c = _resolve_cluster(cluster)
+    token = get_token(cluster)
+
+    resolved_container, is_crash_loop = await _log_target(c, token, namespace, pod, container)
+
+    log_path = f"/api/v1/namespaces/{namespace}/pods/{pod}/log"
+    log_headers = {"Accept": "text/plain"}
     base_params: Dict[str, Any] = {"tailLines": tail_lines}
     if resolved_container:
         base_params["container"] = resolved_container
 
-    def _fetch(params: Dict[str, Any]) -> requests.Response:
-        return requests.get(log_url, headers=log_headers, params=params,
-                            timeout=30, verify=not c["insecure"])
+    async def _fetch(params: Dict[str, Any]) -> httpx.Response:
+        async with ocp_limiter.slot(c["ocp_api"]):
+            return await http_get(c["ocp_api"], log_path, token=token, headers=log_headers,
+                                  params=params, timeout=30, verify=not c["insecure"])
 
-    def _success(resp: requests.Response, is_prev: bool, fallback_used: bool = False, fallback_from: int = None):
+    def _success(resp: httpx.Response, is_prev: bool, fallback_used: bool = False, fallback_from: int = None):
         resp.raise_for_status()
         return {
             "ok": True, "pod": pod, "container": resolved_container,
@@ -218,17 +517,17 @@ def get_pod_logs(
     try:
         if previous:
             # Kullanıcı doğrudan previous istedi
-            resp = _fetch({**base_params, "previous": "true"})
+            resp = await _fetch({**base_params, "previous": "true"})
             if resp.status_code == 200:
                 return _success(resp, is_prev=True)
-            resp2 = _fetch(base_params)
+            resp2 = await _fetch(base_params)
             if resp2.status_code == 200:
                 return _success(resp2, is_prev=False, fallback_used=True)
             return _unavailable("Log mevcut değil.")
 
         if is_crash_loop:
             # CrashLoopBackOff: önce previous log dene (son crash'in logları en güvenilir)
-            prev_resp = _fetch({**base_params, "previous": "true"})
+            prev_resp = await _fetch({**base_params, "previous": "true"})
             if prev_resp.status_code == 200:
                 return _success(prev_resp, is_prev=True)
 
@@ -236,8 +535,8 @@ def get_pod_logs(
             # Kısa aralıklarla current'ı dene (container kısa süre Running olacak).
             for delay in (0, 2, 3):
                 if delay:
-                    time.sleep(delay)
-                cur_resp = _fetch(base_params)
+                    await asyncio.sleep(delay)
+                cur_resp = await _fetch(base_params)
                 if cur_resp.status_code == 200:
                     return _success(cur_resp, is_prev=False, fallback_used=True,
                                     fallback_from=prev_resp.status_code)
@@ -248,12 +547,12 @@ def get_pod_logs(
             )
 
         # Normal akış (Running, Pending, vb.)
-        resp = _fetch(base_params)
+        resp = await _fetch(base_params)
         if resp.status_code == 200:
             return _success(resp, is_prev=False)
         if resp.status_code == 406:
             # Pending/ImagePullBackOff — previous dene
-            prev_resp = _fetch({**base_params, "previous": "true"})
+            prev_resp = await _fetch({**base_params, "previous": "true"})
             if prev_resp.status_code == 200:
                 return _success(prev_resp, is_prev=True, fallback_used=True, fallback_from=406)
             return _unavailable("Container henüz başlamadı veya log mevcut değil (406).",
@@ -267,44 +566,244 @@ def get_pod_logs(
         raise HTTPException(502, str(e))
 
 
-# ── Namespace Summary ─────────────────────────────────────────────────────────
-
-@router.get("/namespace-summary")
-def namespace_summary(
-    cluster:   str = Query(...),
-    namespace: str = Query(...),
-) -> Dict[str, Any]:
-    """Namespace özeti: pod fazları, toplam restart sayısı, Warning event sayısı."""
+async def _open_log_stream(
+    c: Dict[str, Any], token: str, path: str, params: Dict[str, Any], follow: bool,
+) -> Tuple[Optional[AsyncExitStack], Optional[httpx.Response], int]:
+    """Log stream'ini açar; 200 değilse bağlantıyı kapatıp (None, None, status) döner."""
+    stack = AsyncExitStack()
+    try:
+        resp = await stack.enter_async_context(http_stream(
+            c["ocp_api"], path,
+            token=token,
+            headers={"Accept": "text/plain"},
+            params=params,
+            # follow modunda okuma zaman aşımı yok — log gelene kadar bağlantı açık kalır
+            timeout=httpx.Timeout(15, read=None if follow else 30),
+            verify=not c["insecure"],
+            pool="watch" if follow else "default",
+        ))
+    except BaseException:
+        await stack.aclose()
+        raise
+    if resp.status_code != 200:
+        status = resp.status_code
+        await stack.aclose()
+        return None, None, status
+    return stack, resp, 200
+
+
+@router.get("/pod-logs/stream")
+async def stream_pod_logs(
+    cluster:       str           = Query(...),
+    namespace:     str           = Query(...),
+    pod:           str           = Query(...),
+    container:     Optional[str] = Query(None),
+    follow:        bool          = Query(False),
+    since_seconds: Optional[int] = Query(None, alias="sinceSeconds", ge=1),
+    limit_bytes:   Optional[int] = Query(None, alias="limitBytes", ge=1),
+    tail_lines:    Optional[int] = Query(None, ge=1),
+    previous:      bool          = Query(False),
+    fmt:           str           = Query("text", alias="format", pattern="^(text|sse)$"),
+) -> StreamingResponse:
+    """Pod logunu kubelet'ten parça parça aktarır (chunked text veya SSE).
+    Log bellekte biriktirilmez; follow=true ile yeni satırlar geldikçe iletilir.
+    """
     c = _resolve_cluster(cluster)
     token = get_token(cluster)
-    running = failed = pending = total_restarts = 0
-    warning_events = 0
+    resolved_container, is_crash_loop = await _log_target(c, token, namespace, pod, container)
 
+    params: Dict[str, Any] = {}
+    if resolved_container:
+        params["container"] = resolved_container
+    if follow:
+        params["follow"] = "true"
+    if since_seconds:
+        params["sinceSeconds"] = since_seconds
+    if limit_bytes:
+        params["limitBytes"] = limit_bytes
+    if tail_lines:
+        params["tailLines"] = tail_lines
+
+    # (previous?, bekleme) denemeleri — get_pod_logs ile aynı geri dönüş sırası
+    if previous:
+        attempts = [(True, 0), (False, 0)]
+    elif is_crash_loop:
+        attempts = [(True, 0), (False, 0), (False, 2), (False, 3)]
+    else:
+        attempts = [(False, 0), (True, 0)]
+
+    log_path = f"/api/v1/namespaces/{namespace}/pods/{pod}/log"
+    stack = resp = None
+    statuses: List[int] = []
+    is_prev = False
     try:
-        pod_data = _ocp_get(c["ocp_api"], c["insecure"], token,
-                            f"/api/v1/namespaces/{namespace}/pods")
-        for item in pod_data.get("items", []):
+        for is_prev, delay in attempts:
+            if delay:
+                await asyncio.sleep(delay)
+            attempt_params = {**params, "previous": "true"} if is_prev else params
+            stack, resp, status = await _open_log_stream(c, token, log_path, attempt_params, follow)
+            if resp is not None:
+                break
+            statuses.append(status)
+    except Exception as e:
+        raise HTTPException(502, str(e))
+
+    if resp is None:
+        raise HTTPException(
+            404 if statuses and all(st == 404 for st in statuses) else 503,
+            f"Log mevcut değil (HTTP {', '.join(str(st) for st in statuses)})",
+        )
+
+    async def _body():
+        try:
+            if fmt == "sse":
+                async for line in resp.aiter_lines():
+                    yield f"data: {line}\n\n"
+                yield "event: end\ndata: \n\n"
+            else:
+                async for chunk in resp.aiter_bytes():
+                    yield chunk
+        finally:
+            await stack.aclose()
+
+    return StreamingResponse(
+        _body(),
+        media_type="text/event-stream" if fmt == "sse" else "text/plain; charset=utf-8",
+        headers={
+            "Cache-Control":     "no-cache",
+            "X-Accel-Buffering": "no",
+            "X-Log-Container":   resolved_container or "",
+            "X-Log-Previous":    "true" if is_prev else "false",
+        },
+    )
+
+
+# ── Namespace Summary ─────────────────────────────────────────────────────────
+
+# kube-state-metrics: faz sayıları ve restart toplamı tek sorguda ("kind" label'ı ile ayrılır)
+_KSM_SUMMARY_QUERY = (
+    'label_replace(sum by (namespace, phase) (kube_pod_status_phase{{{sel}}}), "kind", "phase", "", "")'
+    ' or label_replace(sum by (namespace) (kube_pod_container_status_restarts_total{{{sel}}}), "kind", "restarts", "", "")'
+)
+# Namespace adları DNS-1123 label'ıdır; bu karakterler regex / PromQL string'inde kaçış gerektirmez
+_NAMESPACE_NAME = re.compile(r"^[a-z0-9]([-a-z0-9]*[a-z0-9])?$")
+
+
+# API yolunda özet için gereken alanlar (sayım için yalnızca namespace)
+_SUMMARY_POD_FIELDS: Projection = {"status": {"phase": None, "containerStatuses": {"restartCount": None}}}
+_COUNT_FIELDS:       Projection = {"metadata": {"namespace": None}}
+
+
+def _empty_summary() -> Dict[str, int]:
+    return {"running": 0, "failed": 0, "pending": 0, "total_restarts": 0, "warning_events": 0}
+
+
+async def _summary_from_prometheus(cluster: str, namespaces: List[str]) -> Optional[Dict[str, Dict[str, int]]]:
+    """Namespace → özet; Prometheus erişilemez veya kube-state-metrics verisi yoksa None."""
+    sel = f'namespace=~"{"|".join(namespaces)}"' if namespaces else 'namespace!=""'
+    res = await _prom_request("/api/v1/query", {"query": _KSM_SUMMARY_QUERY.format(sel=sel)}, cluster)
+    if not res.get("ok") or not res.get("result"):
+        return None
+    out: Dict[str, Dict[str, int]] = {ns: _empty_summary() for ns in namespaces}
+    for row in res["result"]:
+        metric = row.get("metric", {})
+        summary = out.setdefault(metric.get("namespace", ""), _empty_summary())
+        try:
+            value = int(float(row.get("value", [0, "0"])[1]))
+        except (TypeError, ValueError, IndexError):
+            continue
+        if metric.get("kind") == "restarts":
+            summary["total_restarts"] += value
+        elif metric.get("phase") in ("Running", "Failed", "Pending"):
+            summary[metric["phase"].lower()] += value
+    return out
+
+
+async def _warning_counts(c: Dict[str, Any], token: str, namespaces: List[str]) -> Dict[str, int]:
+    """Namespace başına Warning event sayısı (kube-state-metrics event'leri export etmez)."""
+    if namespaces:
+        lists = await asyncio.gather(
+            *(_event_items(c, token, ns, {"type": "Warning"}, _COUNT_FIELDS) for ns in namespaces),
+            return_exceptions=True,
+        )
+        return {ns: len(items) for ns, items in zip(namespaces, lists) if not isinstance(items, BaseException)}
+    # Tüm namespace'ler: cluster genelinde tek LIST
+    data = await _ocp_get(c["ocp_api"], c["insecure"], token, "/api/v1/events",
+                          {"fieldSelector": "type=Warning"}, _COUNT_FIELDS)
+    counts: Dict[str, int] = {}
+    for item in data.get("items", []):
+        ns = (item.get("metadata") or {}).get("namespace", "")
+        counts[ns] = counts.get(ns, 0) + 1
+    return counts
+
+
+async def _summary_from_api(c: Dict[str, Any], token: str, namespace: str) -> Dict[str, int]:
+    summary = _empty_summary()
+    pod_items, ev_items = await asyncio.gather(
+        _pod_items(c, token, namespace, _SUMMARY_POD_FIELDS),
+        _event_items(c, token, namespace, {"type": "Warning"}, _COUNT_FIELDS),
+        return_exceptions=True,
+    )
+
+    if not isinstance(pod_items, BaseException):
+        for item in pod_items:
             phase = item.get("status", {}).get("phase", "")
-            if phase == "Running":   running += 1
-            elif phase == "Failed":  failed += 1
-            elif phase == "Pending": pending += 1
+            if phase in ("Running", "Failed", "Pending"):
+                summary[phase.lower()] += 1
             for cs in item.get("status", {}).get("containerStatuses", []):
-                total_restarts += cs.get("restartCount", 0)
-    except Exception:
-        pass
+                summary["total_restarts"] += cs.get("restartCount", 0)
 
-    try:
-        ev_data = _ocp_get(c["ocp_api"], c["insecure"], token,
-                           f"/api/v1/namespaces/{namespace}/events",
-                           {"fieldSelector": "type=Warning"})
-        warning_events = len(ev_data.get("items", []))
-    except Exception:
-        pass
+    if not isinstance(ev_items, BaseException):
+        summary["warning_events"] = len(ev_items)
+    return summary
 
-    return {
-        "running":        running,
-        "failed":         failed,
-        "pending":        pending,
-        "total_restarts": total_restarts,
-        "warning_events": warning_events,
-    }
+
+@router.get("/namespace-summary")
+async def namespace_summary(
+    cluster:    str           = Query(...),
+    namespace:  Optional[str] = Query(None),
+    namespaces: List[str]     = Query([]),
+    source:     str           = Query("auto", pattern="^(auto|prometheus|api)$"),
+) -> Dict[str, Any]:
+    """Namespace özeti: pod fazları, toplam restart sayısı, Warning event sayısı.
+    Önce kube-state-metrics'ten (tek sorgu) hesaplanır; Prometheus erişilemezse pod/event LIST'lerine düşer.
+    namespace → tek özet (eski biçim); namespaces (tekrarlı veya virgüllü) / hiçbiri → {namespaces: {ns: özet}}.
+    Namespace verilmezse tüm namespace'ler döner (yalnızca Prometheus ile).
+    """
+    c = _resolve_cluster(cluster)
+    token = get_token(cluster)
+    single = namespace is not None and not namespaces
+    names = sorted({ns.strip() for raw in ([namespace] if namespace else []) + namespaces
+                    for ns in raw.split(",") if ns.strip()})
+    invalid = [ns for ns in names if not _NAMESPACE_NAME.match(ns) or len(ns) > 63]
+    if invalid:
+        raise HTTPException(400, f"Geçersiz namespace adı: {', '.join(invalid)}")
+
+    summaries: Optional[Dict[str, Dict[str, int]]] = None
+    used = "api"
+    if source != "api":
+        summaries = await _summary_from_prometheus(cluster, names)
+        if summaries is not None:
+            used = "prometheus"
+            try:
+                warnings = await _warning_counts(c, token, names)
+            except Overloaded:
+                raise
+            except Exception:
+                # Event LIST'i başarısız olsa da Prometheus özeti döner
+                warnings = {}
+            for ns, count in warnings.items():
+                if ns in summaries:
+                    summaries[ns]["warning_events"] = count
+        elif source == "prometheus":
+            raise HTTPException(503, "kube-state-metrics verisi alınamadı")
+
+    if summaries is None:
+        if not names:
+            raise HTTPException(503, "Prometheus erişilemiyor; API modunda namespace belirtilmeli")
+        results = await asyncio.gather(*(_summary_from_api(c, token, ns) for ns in names))
+        summaries = dict(zip(names, results))
+
+    if single:
+        return {**summaries.get(names[0], _empty_summary()), "source": used}
+    return {"ok": True, "source": used, "namespaces": dict(sorted(summaries.items()))}
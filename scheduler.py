@@ -0,0 +1,180 @@
+import time
+import random
+import asyncio
+import logging
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+
+from config import get_scheduler_config, get_prometheus_targets
+
+log = logging.getLogger("alarmfw.observe.scheduler")
+
+# Bir snapshot interval'in bu katından eskiyse endpoint'ler canlı sorguya döner
+STALE_FACTOR = 3
+TICK_SEC     = 1.0
+
+Compute = Callable[[str], Awaitable[Dict[str, Any]]]
+
+
+class _State:
+    """(cluster, section) başına zamanlama ve son snapshot."""
+
+    __slots__ = (
+        "next_due", "running", "value", "updated_at", "last_success",
+        "last_duration", "last_lag", "last_error", "failures",
+    )
+
+    def __init__(self, next_due: float):
+        self.next_due:      float                    = next_due
+        self.running:       bool                     = False
+        self.value:         Optional[Dict[str, Any]] = None
+        self.updated_at:    float                    = 0.0
+        self.last_success:  float                    = 0.0
+        self.last_duration: float                    = 0.0
+        self.last_lag:      float                    = 0.0
+        self.last_error:    str                      = ""
+        self.failures:      int                      = 0
+
+
+def _has_errors(value: Dict[str, Any]) -> bool:
+    return not value.get("ok", False) or bool(value.get("errors"))
+
+
+class SnapshotScheduler:
+    """
+    Health section'larını her cluster için sabit aralıkla (jitter'lı) arka planda
+    yeniler. Endpoint'ler latest() ile son snapshot'ı beklemeden sunar.
+    """
+
+    def __init__(self):
+        self._sections: Dict[str, Compute] = {}
+        self._states: Dict[Tuple[str, str], _State] = {}
+        self._task: Optional[asyncio.Task] = None
+        # Süren yenilemeler: referans tutulmazsa GC toplayabilir; stop() bunları da iptal eder
+        self._tasks: set = set()
+        self._config: Dict[str, Any] = {"enabled": False, "jitter_sec": 0.0, "intervals": {}}
+
+    def register(self, section: str, compute: Compute) -> None:
+        self._sections[section] = compute
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    def start(self) -> bool:
+        """observe.yaml'da etkinse scheduler task'ını başlatır."""
+        self._config = get_scheduler_config()
+        if not self._config["enabled"] or self.running:
+            return self.running
+        self._task = asyncio.get_running_loop().create_task(self._run())
+        log.info("Health scheduler started (intervals=%s)", self._config["intervals"])
+        return True
+
+    async def stop(self) -> None:
+        task, self._task = self._task, None
+        if task is not None:
+            task.cancel()
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+        tasks, self._tasks = list(self._tasks), set()
+        for t in tasks:
+            t.cancel()
+        # Kapanışta upstream.close_all() öncesi hiçbir yenileme client kullanıyor olmamalı
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    def latest(self, cluster: str, section: str) -> Optional[Tuple[Dict[str, Any], float]]:
+        """Yeterince taze snapshot varsa (değer, yaş_sn) döner."""
+        if not self.running:
+            return None
+        st = self._states.get((cluster, section))
+        if st is None or st.value is None:
+            return None
+        age = time.monotonic() - st.updated_at
+        interval = self._config["intervals"].get(section, 0)
+        if age > interval * STALE_FACTOR:
+            return None
+        return st.value, age
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                self._tick()
+            except Exception as e:
+                log.warning("Health scheduler tick failed: %s", e)
+            await asyncio.sleep(TICK_SEC)
+
+    def _tick(self) -> None:
+        self._config = cfg = get_scheduler_config()
+        if not cfg["enabled"]:
+            self._states.clear()
+            return
+        jitter = cfg["jitter_sec"]
+        now = time.monotonic()
+        wanted = set()
+        for cluster in get_prometheus_targets():
+            for section in self._sections:
+                interval = cfg["intervals"].get(section)
+                if not interval:
+                    continue
+                key = (cluster, section)
+                wanted.add(key)
+                st = self._states.get(key)
+                if st is None:
+                    # İlk turu yay — tüm cluster'lar aynı anda vurmasın
+                    st = self._states[key] = _State(now + random.uniform(0, jitter))
+                if not st.running and now >= st.next_due:
+                    st.running = True
+                    task = asyncio.get_running_loop().create_task(self._refresh(key, st, interval, jitter))
+                    self._tasks.add(task)
+                    task.add_done_callback(self._tasks.discard)
+        for key in list(self._states):
+            if key not in wanted:
+                del self._states[key]
+
+    async def _refresh(self, key: Tuple[str, str], st: _State, interval: float, jitter: float) -> None:
+        cluster, section = key
+        started = time.monotonic()
+        st.last_lag = max(0.0, started - st.next_due)
+        try:
+            value = await self._sections[section](cluster)
+            st.value, st.updated_at = value, time.monotonic()
+            if _has_errors(value):
+                st.failures += 1
+                st.last_error = str(value.get("error") or value.get("errors") or "partial failure")
+            else:
+                st.last_success, st.last_error = st.updated_at, ""
+        except Exception as e:
+            st.failures += 1
+            st.last_error = str(e)
+            log.warning("Health refresh failed cluster=%s section=%s: %s", cluster, section, e)
+        finally:
+            st.last_duration = time.monotonic() - started
+            st.next_due = started + interval + random.uniform(-jitter, jitter)
+            st.running = False
+
+    def status(self) -> Dict[str, Any]:
+        """Cluster/section başına lag, süre ve hata bilgisi."""
+        now = time.monotonic()
+        intervals = self._config["intervals"]
+        items = []
+        for (cluster, section), st in sorted(self._states.items()):
+            interval = intervals.get(section, 0)
+            # lag: son başarılı yenilemenin beklenen zamanın ne kadar gerisinde kaldığı
+            behind = now - st.last_success - interval if st.last_success else None
+            items.append({
+                "cluster":          cluster,
+                "section":          section,
+                "interval_sec":     interval,
+                "age_sec":          round(now - st.updated_at, 1) if st.updated_at else None,
+                "lag_sec":          round(max(0.0, behind), 1) if behind is not None else None,
+                "schedule_lag_sec": round(st.last_lag, 3),
+                "duration_sec":     round(st.last_duration, 3),
+                "running":          st.running,
+                "failures":         st.failures,
+                "last_error":       st.last_error,
+            })
+        return {"enabled": self._config["enabled"], "running": self.running, "items": items}
+
+
+scheduler = SnapshotScheduler()
@@ -0,0 +1,179 @@
+import time
+import contextvars
+from bisect import bisect_left
+from typing import Any, Callable, Dict, Iterable, List, Sequence, Tuple
+
+from config import get_cluster_prometheus_url
+
+# Servisin kendi metrikleri (Prometheus text exposition, prometheus_client bağımlılığı olmadan)
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+SIZE_BUCKETS    = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304, 16777216)
+
+# Upstream çağrısını tetikleyen sorgunun adı (health.py query dict anahtarı); ad-hoc sorgularda ""
+query_name: contextvars.ContextVar[str] = contextvars.ContextVar("query_name", default="")
+
+Labels = Tuple[str, ...]
+Sample = Tuple[Dict[str, str], float]
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _fmt_labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    parts = [f'{n}="{_escape(str(v))}"' for n, v in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+def _fmt_num(v: float) -> str:
+    if v == float("inf"):
+        return "+Inf"
+    return repr(float(v)) if not float(v).is_integer() else str(int(v))
+
+
+class Counter:
+    def __init__(self, name: str, help: str, labelnames: Sequence[str] = ()):
+        self.name, self.help, self.labelnames = name, help, tuple(labelnames)
+        self._values: Dict[Labels, float] = {}
+
+    def inc(self, *labels: str, amount: float = 1.0) -> None:
+        self._values[labels] = self._values.get(labels, 0.0) + amount
+
+    def render(self) -> Iterable[str]:
+        yield f"# HELP {self.name} {self.help}"
+        yield f"# TYPE {self.name} counter"
+        for labels, v in sorted(self._values.items()):
+            yield f"{self.name}{_fmt_labels(self.labelnames, labels)} {_fmt_num(v)}"
+
+
+class Histogram:
+    def __init__(self, name: str, help: str, labelnames: Sequence[str] = (), buckets: Sequence[float] = LATENCY_BUCKETS):
+        self.name, self.help, self.labelnames = name, help, tuple(labelnames)
+        self.buckets = tuple(buckets)
+        # labels → [bucket sayaçları..., sum, count]
+        self._values: Dict[Labels, List[float]] = {}
+
+    def observe(self, value: float, *labels: str) -> None:
+        row = self._values.get(labels)
+        if row is None:
+            row = self._values[labels] = [0.0] * (len(self.buckets) + 2)
+        i = bisect_left(self.buckets, value)
+        if i < len(self.buckets):
+            row[i] += 1
+        row[-2] += value
+        row[-1] += 1
+
+    def render(self) -> Iterable[str]:
+        yield f"# HELP {self.name} {self.help}"
+        yield f"# TYPE {self.name} histogram"
+        for labels, row in sorted(self._values.items()):
+            cumulative = 0.0
+            for le, n in zip(self.buckets + (float("inf"),), row[:-2] + [row[-1] - sum(row[:-2])]):
+                cumulative += n
+                le_label = 'le="' + _fmt_num(le) + '"'
+                yield f"{self.name}_bucket{_fmt_labels(self.labelnames, labels, le_label)} {_fmt_num(cumulative)}"
+            yield f"{self.name}_sum{_fmt_labels(self.labelnames, labels)} {_fmt_num(row[-2])}"
+            yield f"{self.name}_count{_fmt_labels(self.labelnames, labels)} {_fmt_num(row[-1])}"
+
+
+class Registry:
+    """Sabit metrikler + scrape anında değer üreten gauge collector'ları."""
+
+    def __init__(self):
+        self._metrics: List[Any] = []
+        self._collectors: List[Tuple[str, str, Callable[[], Iterable[Sample]]]] = []
+
+    def counter(self, name: str, help: str, labelnames: Sequence[str] = ()) -> Counter:
+        m = Counter(name, help, labelnames)
+        self._metrics.append(m)
+        return m
+
+    def histogram(self, name: str, help: str, labelnames: Sequence[str] = (), buckets: Sequence[float] = LATENCY_BUCKETS) -> Histogram:
+        m = Histogram(name, help, labelnames, buckets)
+        self._metrics.append(m)
+        return m
+
+    def gauge(self, name: str, help: str, collect: Callable[[], Iterable[Sample]]) -> None:
+        self._collectors.append((name, help, collect))
+
+    def render(self) -> str:
+        lines: List[str] = []
+        for m in self._metrics:
+            lines.extend(m.render())
+        for name, help, collect in self._collectors:
+            lines.append(f"# HELP {name} {help}")
+            lines.append(f"# TYPE {name} gauge")
+            try:
+                samples = list(collect())
+            except Exception:
+                samples = []
+            for labels, v in samples:
+                lines.append(f"{name}{_fmt_labels(list(labels), list(labels.values()))} {_fmt_num(v)}")
+        return "\n".join(lines) + "\n"
+
+
+registry = Registry()
+
+http_request_duration = registry.histogram(
+    "observe_http_request_duration_seconds", "Route başına istek süresi.",
+    ("method", "route", "status"),
+)
+http_response_size = registry.histogram(
+    "observe_http_response_size_bytes", "Route başına yanıt gövdesi boyutu.",
+    ("method", "route"), SIZE_BUCKETS,
+)
+upstream_duration = registry.histogram(
+    "observe_upstream_request_duration_seconds", "Prometheus çağrı süresi (cluster / endpoint / sorgu adı).",
+    ("cluster", "endpoint", "query"),
+)
+upstream_errors = registry.counter(
+    "observe_upstream_errors_total", "Başarısız Prometheus çağrıları (cluster / endpoint / sorgu adı).",
+    ("cluster", "endpoint", "query"),
+)
+
+
+class MetricsMiddleware:
+    """Saf ASGI middleware: route şablonu başına süre ve gerçek gönderilen gövde boyutu (stream'ler dahil)."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        started = time.monotonic()
+        state = {"status": "500", "size": 0}
+
+        async def _send(message):
+            if message["type"] == "http.response.start":
+                state["status"] = str(message["status"])
+            elif message["type"] == "http.response.body":
+                state["size"] += len(message.get("body", b""))
+            await send(message)
+
+        try:
+            await self.app(scope, receive, _send)
+        finally:
+            route = scope.get("route")
+            path = getattr(route, "path", None) or "<unmatched>"
+            method = scope.get("method", "")
+            http_request_duration.observe(time.monotonic() - started, method, path, state["status"])
+            http_response_size.observe(state["size"], method, path)
+
+
+def _cluster_label(cluster: str) -> str:
+    """cluster label'ı; tanımsız adlar tek "unknown" serisinde toplanır (ad istemciden gelir)."""
+    if not cluster:
+        return "global"
+    return cluster if get_cluster_prometheus_url(cluster) else "unknown"
+
+
+def observe_upstream(cluster: str, endpoint: str, started: float, ok: bool) -> None:
+    name, label = query_name.get(), _cluster_label(cluster)
+    upstream_duration.observe(time.monotonic() - started, label, endpoint, name)
+    if not ok:
+        upstream_errors.inc(label, endpoint, name)
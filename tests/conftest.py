@@ -1,6 +1,17 @@
 from pathlib import Path
 import sys
 
+import pytest
+
 ROOT = Path(__file__).resolve().parents[1]
 if str(ROOT) not in sys.path:
     sys.path.insert(0, str(ROOT))
+
+
+@pytest.fixture(autouse=True)
+def _reset_breakers():
+    # Breaker durumu modül seviyesinde tutulur; testler birbirinin açtığı devreyi görmesin
+    from breaker import breakers
+    breakers.clear()
+    yield
+    breakers.clear()
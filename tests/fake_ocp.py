@@ -0,0 +1,126 @@
+"""Minimal local stand-in for the Kubernetes API (LIST + WATCH) used in tests."""
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+
+def pod(name, phase="Running", restarts=0, rv="1"):
+    return {
+        "metadata": {"name": name, "namespace": "ns", "resourceVersion": rv,
+                     "managedFields": [{"manager": "kubelet"}]},
+        "spec": {"containers": [{"name": "app", "image": "img"}], "nodeName": "n1"},
+        "status": {"phase": phase, "containerStatuses": [{"name": "app", "restartCount": restarts, "ready": True}]},
+    }
+
+
+class FakeOCP:
+    """pods: name → object. watch_script: list of event lists, one per WATCH call.
+    metadata_lists=False makes the server reject PartialObjectMetadataList with 406."""
+
+    def __init__(self):
+        self.pods = {}
+        self.events = []
+        self.resource_version = 1
+        self.watch_script = []
+        self.calls = []
+        self.queries = []
+        self.logs = {}
+        self.namespaces = []
+        self.metadata_lists = True
+        self.list_status = 200
+        self.accepts = []
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), self._handler())
+        self.url = f"http://127.0.0.1:{self.server.server_port}"
+
+    def start(self):
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        return self
+
+    def stop(self):
+        self.server.shutdown()
+
+    def _handler(self):
+        fake = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def do_GET(self):
+                u = urlparse(self.path)
+                q = parse_qs(u.query)
+                watching = q.get("watch", [""])[0] == "1"
+                fake.calls.append((u.path, "watch" if watching else "list"))
+                fake.queries.append({k: v[0] for k, v in q.items()})
+                accept = self.headers.get("Accept", "")
+                fake.accepts.append(accept)
+                as_metadata = "as=PartialObjectMetadataList" in accept
+                if as_metadata and not fake.metadata_lists:
+                    return self._send(406, {"kind": "Status", "code": 406})
+                if watching:
+                    return self._watch()
+                if fake.list_status != 200:
+                    return self._send(fake.list_status, {"kind": "Status", "code": fake.list_status})
+                if u.path.endswith("/log"):
+                    return self._log(u.path.split("/")[-2], q)
+                if u.path.endswith("/pods"):
+                    items = list(fake.pods.values())
+                    if "limit" in q:
+                        return self._send(200, {
+                            "metadata": {"resourceVersion": str(fake.resource_version), "continue": "next-page"},
+                            "items": items[: int(q["limit"][0])],
+                        })
+                elif u.path.endswith("/events"):
+                    items = list(fake.events)
+                elif "/pods/" in u.path:
+                    name = u.path.rsplit("/", 1)[-1]
+                    if name not in fake.pods:
+                        return self._send(404, {"kind": "Status", "code": 404})
+                    return self._send(200, fake.pods[name])
+                elif u.path.endswith("/namespaces") or u.path.endswith("/projects"):
+                    items = [{"metadata": {"name": n}, "spec": {"finalizers": ["kubernetes"]}} for n in fake.namespaces]
+                else:
+                    items = []
+                if as_metadata:
+                    items = [{"kind": "PartialObjectMetadata", "metadata": i["metadata"]} for i in items]
+                self._send(200, {"metadata": {"resourceVersion": str(fake.resource_version)}, "items": items})
+
+            def _send(self, code, body):
+                raw = json.dumps(body).encode()
+                self.send_response(code)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(raw)))
+                self.end_headers()
+                self.wfile.write(raw)
+
+            def _log(self, name, q):
+                key = (name, q.get("previous", ["false"])[0] == "true")
+                if key not in fake.logs:
+                    return self._send(400, {"kind": "Status", "code": 400})
+                self.send_response(200)
+                self.send_header("Content-Type", "text/plain")
+                self.send_header("Transfer-Encoding", "chunked")
+                self.end_headers()
+                for line in fake.logs[key].splitlines(keepends=True):
+                    data = line.encode()
+                    self.wfile.write(f"{len(data):x}\r\n".encode() + data + b"\r\n")
+                self.wfile.write(b"0\r\n\r\n")
+
+            def _watch(self):
+                events = fake.watch_script.pop(0) if fake.watch_script else None
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Connection", "close")
+                self.end_headers()
+                if events is None:
+                    time.sleep(0.5)
+                    return
+                for ev in events:
+                    self.wfile.write(json.dumps(ev).encode() + b"\n")
+                    self.wfile.flush()
+
+            def log_message(self, *args):
+                pass
+
+        return Handler
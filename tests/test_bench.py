@@ -0,0 +1,34 @@
+import json
+
+import httpx
+
+from bench.fakes import FakeProfile, FakeUpstream
+from bench.run import _parse_args, _percentile, compare, profile_key
+
+
+def test_fake_upstream_serves_configured_payloads():
+    fake = FakeUpstream(FakeProfile(pods=7, series=3, log_lines=50, latency_ms=0)).start()
+    try:
+        base = f"{fake.url}/c/bench-0"
+        pods = httpx.get(f"{base}/api/v1/namespaces/bench/pods").json()
+        matrix = httpx.get(f"{base}/api/v1/query_range",
+                           params={"query": "up", "start": 0, "end": 150, "step": 15}).json()
+        log = httpx.get(f"{base}/api/v1/namespaces/bench/pods/app-0-00000/log", params={"tailLines": 10})
+    finally:
+        fake.stop()
+    assert len(pods["items"]) == 7
+    assert len(matrix["data"]["result"]) == 3 and len(matrix["data"]["result"][0]["values"]) == 11
+    assert len(log.text.splitlines()) == 10
+
+
+def test_compare_flags_p99_and_throughput_regressions():
+    base = {"list_pods@8": {"p99_ms": 100.0, "rps": 200.0}}
+    assert compare({"list_pods@8": {"p99_ms": 120.0, "rps": 180.0}}, base, 0.25) == []
+    found = compare({"list_pods@8": {"p99_ms": 130.0, "rps": 140.0}}, base, 0.25)
+    assert len(found) == 2
+    assert _percentile([1.0, 2.0, 3.0, 4.0], 50) == 2.0 and _percentile([1.0, 2.0, 3.0, 4.0], 99) == 4.0
+
+
+def test_default_profile_has_a_stored_baseline():
+    from bench.run import BASELINE_FILE
+    assert profile_key(_parse_args([])) in json.loads(BASELINE_FILE.read_text())
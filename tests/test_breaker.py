@@ -0,0 +1,108 @@
+import asyncio
+
+import httpx
+
+import breaker
+from breaker import CLOSED, HALF_OPEN, OPEN, CircuitBreaker
+from routers import metrics
+
+
+def test_breaker_opens_fast_fails_and_recovers_via_half_open(monkeypatch):
+    br = CircuitBreaker("prometheus:c1")
+    for _ in range(breaker.FAILURE_THRESHOLD):
+        assert br.allow()
+        br.failure("connect refused")
+    assert br.state == OPEN and not br.allow()
+
+    br.opened_at -= br.open_sec + 1
+    assert br.allow() and br.state == HALF_OPEN
+    assert not br.allow()                      # yalnızca tek probe
+    br.failure("still down")
+    assert br.state == OPEN and br.open_sec == breaker.OPEN_SEC * 2
+
+    br.opened_at -= br.open_sec + 1
+    assert br.allow()
+    br.success(0.05)
+    assert br.state == CLOSED and br.failures == 0
+
+
+def test_adaptive_timeout_follows_observed_latency():
+    br = CircuitBreaker("ocp:x")
+    assert br.timeout(20) == 20
+    for _ in range(50):
+        br.success(1.5)
+    assert br.timeout(20) == 4.5
+    for _ in range(breaker.WINDOW):
+        br.success(0.01)
+    assert br.timeout(20) == breaker.TIMEOUT_MIN_SEC
+
+
+def test_prom_request_fast_fails_when_circuit_open(monkeypatch):
+    calls = []
+
+    async def refused(*args, **kwargs):
+        calls.append(kwargs["timeout"])
+        raise httpx.ConnectError("connection refused")
+
+    monkeypatch.setattr(metrics, "http_get", refused)
+    monkeypatch.setattr(metrics, "get_cluster_prometheus_url", lambda c: "http://prom.invalid")
+    monkeypatch.setattr(metrics, "get_cluster_prometheus_token", lambda c: "t")
+    monkeypatch.setattr(metrics, "get_cluster_prometheus_insecure", lambda c: True)
+
+    async def run():
+        return [await metrics._prom_request("/api/v1/query", {"query": "up"}, "dead") for _ in range(8)]
+
+    results = asyncio.run(run())
+    assert len(calls) == breaker.FAILURE_THRESHOLD
+    assert all(r["ok"] is False for r in results)
+    assert results[-1]["circuit"] == "open"
+    assert breaker.breakers.state("prometheus", "dead") == OPEN
+    assert breaker.breakers.state("prometheus", "other") == CLOSED
+
+
+def test_unknown_cluster_creates_no_breaker(monkeypatch):
+    monkeypatch.setattr(metrics, "get_cluster_prometheus_url", lambda c: "http://prom" if c == "c1" else "")
+
+    async def run():
+        return [await metrics._prom_request("/api/v1/query", {"query": "up"}, f"rnd{i}") for i in range(20)]
+
+    results = asyncio.run(run())
+    assert all(r["ok"] is False and "rnd" in r["error"] for r in results)
+    assert all(breaker.breakers.peek("prometheus", f"rnd{i}") is None for i in range(20))
+
+
+def test_fast_health_queries_do_not_shrink_range_timeout(monkeypatch):
+    seen = {}
+
+    async def fake_get(base, path, **kwargs):
+        seen.setdefault(path, []).append(kwargs["timeout"])
+        return httpx.Response(200, json={"status": "success", "data": {"result": []}},
+                              request=httpx.Request("GET", base + path))
+
+    monkeypatch.setattr(metrics, "http_get", fake_get)
+    monkeypatch.setattr(metrics, "get_cluster_prometheus_url", lambda c: "http://prom")
+    monkeypatch.setattr(metrics, "get_cluster_prometheus_token", lambda c: "t")
+    monkeypatch.setattr(metrics, "get_cluster_prometheus_insecure", lambda c: True)
+    monkeypatch.setattr(metrics, "get_global_prometheus_timeout_sec", lambda: 20)
+
+    async def run():
+        token = metrics.query_name.set("crashloop")
+        try:
+            for _ in range(breaker.MIN_SAMPLES + 5):
+                await metrics._prom_request("/api/v1/query", {"query": "up"}, "c1")
+        finally:
+            metrics.query_name.reset(token)
+        await metrics._prom_request("/api/v1/query_range", {"query": "up"}, "c1")
+        await metrics._prom_request("/api/v1/query", {"query": "up"}, "c1")
+
+    asyncio.run(run())
+    br = breaker.breakers.get("prometheus", "c1")
+    assert br.timeout(20, "health") == breaker.TIMEOUT_MIN_SEC
+    assert seen["/api/v1/query_range"] == [20]
+    assert seen["/api/v1/query"][-1] == 20               # user instant queries have their own window
+    status = br.status(20)
+    assert set(status["timeouts"]) == {"health", "/api/v1/query_range", "/api/v1/query"}
+    # Percentiles are per class; there is no merged p99 or unrecorded default timeout
+    assert set(status["latency"]) == set(status["timeouts"])
+    assert set(status["latency"]["health"]) == {"p50_ms", "p99_ms"}
+    assert "timeout_sec" not in status and "p99_ms" not in status
@@ -0,0 +1,36 @@
+import os
+
+import config
+
+
+def _use_tmp_config(monkeypatch, tmp_path):
+    monkeypatch.setattr(config, "OBSERVE_CONF", tmp_path / "observe.yaml")
+    monkeypatch.setattr(config, "OCP_CONF_DIR", tmp_path / "generated")
+    monkeypatch.setattr(config, "ALARMFW_SECRETS", tmp_path)
+    monkeypatch.setattr(config, "_snapshot", None)
+    monkeypatch.setattr(config, "CONFIG_CHECK_INTERVAL_SEC", 0)
+
+
+def test_snapshot_reused_until_file_changes(monkeypatch, tmp_path):
+    _use_tmp_config(monkeypatch, tmp_path)
+    conf = tmp_path / "observe.yaml"
+    conf.write_text("clusters:\n  - name: c1\n    prometheus_url: https://a\n", encoding="utf-8")
+
+    first = config.get_snapshot()
+    assert config.get_snapshot() is first
+    assert config.get_cluster_prometheus_url("c1") == "https://a"
+
+    conf.write_text("clusters:\n  - name: c1\n    prometheus_url: https://bb\n", encoding="utf-8")
+    st = conf.stat()
+    os.utime(conf, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000))
+    assert config.get_snapshot() is not first
+    assert config.get_cluster_prometheus_url("c1") == "https://bb"
+
+
+def test_secret_cache_follows_file(monkeypatch, tmp_path):
+    _use_tmp_config(monkeypatch, tmp_path)
+    token = tmp_path / "c1-prometheus.token"
+    token.write_text("abc\n", encoding="utf-8")
+    assert config.get_cluster_prometheus_token("c1") == "abc"
+    token.unlink()
+    assert config.get_cluster_prometheus_token("c1") == ""
@@ -0,0 +1,63 @@
+import gzip
+
+from fastapi.testclient import TestClient
+
+import encoding
+from main import app
+from routers import health
+
+
+def test_etag_304_ignores_volatile_fields_and_gzip_above_threshold(monkeypatch):
+    state = {"age": 1.0, "pods": 50}
+
+    async def fake_serve(section, cluster, compute):
+        return {"ok": True, "cache_age_sec": state["age"],
+                "rows": [{"pod": f"p{i}", "value": i} for i in range(state["pods"])]}
+
+    monkeypatch.setattr(health, "_serve", fake_serve)
+    with TestClient(app) as client:
+        url = "/api/observe/health/workload?cluster=c1"
+        first = client.get(url, headers={"Accept-Encoding": "gzip"})
+        etag = first.headers["etag"]
+        assert first.headers["content-encoding"] == "gzip"
+        assert "Accept-Encoding" in first.headers["vary"]
+        raw = first.content            # httpx çözer
+        assert b'"cache_age_sec":1.0' in raw
+
+        state["age"] = 9.5             # yalnızca yaş değişti → 304
+        again = client.get(url, headers={"If-None-Match": etag})
+        assert again.status_code == 304 and again.content == b"" and again.headers["etag"] == etag
+
+        state["pods"] = 51             # veri değişti → 200 + yeni ETag
+        changed = client.get(url, headers={"If-None-Match": etag})
+        assert changed.status_code == 200 and changed.headers["etag"] != etag
+
+        small = client.get("/api/health", headers={"Accept-Encoding": "gzip"})
+        assert "content-encoding" not in small.headers
+
+
+def test_etag_ignores_nested_volatile_fields():
+    def fleet(latency, cache_mode, up):
+        return {"ok": True, "clusters": [
+            {"cluster": "c1", "ok": True, "latency_ms": latency, "firing_alerts": 2},
+            {"cluster": "c2", "ok": True, "latency_ms": latency * 2, "firing_alerts": 0},
+        ], "results": {"a": {"ok": True, "duration_ms": latency, "cache": {"mode": cache_mode},
+                             "result": [{"metric": {"age": "old"}, "values": [[0, up]]}]}}}
+
+    base = encoding.content_etag(fleet(12.0, "miss", "1"))
+    # Timings and cache mode differ on every poll; the data did not change
+    assert encoding.content_etag(fleet(48.5, "partial", "1")) == base
+    # Sample values and label sets are data, even when a label is called "age"
+    assert encoding.content_etag(fleet(12.0, "miss", "0")) != base
+    changed_label = fleet(12.0, "miss", "1")
+    changed_label["results"]["a"]["result"][0]["metric"]["age"] = "new"
+    assert encoding.content_etag(changed_label) != base
+    plain = {"ok": True, "rows": [{"pod": "p1"}]}
+    assert encoding._strip_volatile(plain) is plain
+
+
+def test_accept_encoding_parsing_and_fallback_dumps():
+    assert encoding._accepted("gzip;q=0, br;q=0.8, deflate") == ["br", "deflate"]
+    assert encoding._etag_matches('W/"abc", "def"', '"abc"')
+    assert encoding.dumps({"v": float("nan")}) in (b'{"v":null}',)
+    assert gzip.decompress(gzip.compress(b"x", mtime=0)) == b"x"
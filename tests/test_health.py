@@ -0,0 +1,250 @@
+import asyncio
+
+from routers import health
+
+
+def test_par_times_out_per_query(monkeypatch):
+    async def fake_prom(path, params, cluster=""):
+        if params["query"] == "slow":
+            await asyncio.sleep(5)
+        return {"ok": True, "result": [{"metric": {}, "value": [0, "7"]}]}
+
+    monkeypatch.setattr(health, "_prom_request", fake_prom)
+    raw = asyncio.run(health._par({"fast": "up", "slow": "slow"}, "c1", timeout=0.1))
+    assert health._scalar(raw["fast"]) == 7
+    assert raw["slow"]["ok"] is False
+    assert health._scalar(raw["slow"]) == -1
+
+
+def test_par_coalesces_and_caches(monkeypatch):
+    calls = []
+
+    async def fake_prom(path, params, cluster=""):
+        calls.append(params["query"])
+        await asyncio.sleep(0.05)
+        return {"ok": True, "result": [{"metric": {}, "value": [0, "1"]}]}
+
+    monkeypatch.setattr(health, "_prom_request", fake_prom)
+    health.query_cache.clear()
+
+    async def run():
+        queries = {"a": "coalesce_a", "b": "coalesce_b"}
+        first = await asyncio.gather(*(health._par(queries, "c1", ttl=30) for _ in range(5)))
+        second = await health._par(queries, "c1", ttl=30)
+        return first, second
+
+    first, second = asyncio.run(run())
+    assert sorted(calls) == ["coalesce_a", "coalesce_b"]
+    assert all(r["a"]["ok"] for r in first)
+    assert second["a"]["ok"] and second["a"]["age"] >= 0
+    health.query_cache.clear()
+
+
+def test_par_sheds_only_the_rejected_client(monkeypatch):
+    from limiter import Overloaded, client_id
+
+    calls = []
+
+    async def fake_prom(path, params, cluster=""):
+        calls.append(client_id.get())
+        await asyncio.sleep(0.05)
+        if client_id.get() == "greedy":
+            raise Overloaded(429, "Çok fazla bekleyen prometheus isteği (100)", 2)
+        return {"ok": True, "result": [{"metric": {}, "value": [0, "3"]}]}
+
+    monkeypatch.setattr(health, "_prom_request", fake_prom)
+    health.query_cache.clear()
+
+    async def as_client(name, delay):
+        client_id.set(name)
+        await asyncio.sleep(delay)
+        return await health._par({"a": "shed_a", "b": "shed_b"}, "c1", ttl=30)
+
+    async def run():
+        # greedy owns the shared fetch; other joins it while it is in flight
+        return await asyncio.gather(as_client("greedy", 0), as_client("other", 0.01))
+
+    greedy, other = asyncio.run(run())
+    # The 429 stays with greedy as per-query errors instead of failing the whole gather
+    assert not greedy["a"]["ok"] and "Çok fazla" in greedy["a"]["error"]
+    assert "_shed" not in greedy["a"]
+    # other retried under its own client id
+    assert other["a"]["ok"] and health._scalar(other["b"]) == 3
+    assert calls.count("other") == 2
+    health.query_cache.clear()
+
+
+def test_fleet_reports_partial_results(monkeypatch):
+    async def fake_prom(path, params, cluster=""):
+        if cluster == "slow":
+            await asyncio.sleep(5)
+        if cluster == "down":
+            return {"ok": False, "error": "connection refused", "result": []}
+        return {"ok": True, "result": [{"metric": {}, "value": [0, "2"]}]}
+
+    monkeypatch.setattr(health, "_prom_request", fake_prom)
+    monkeypatch.setattr(health, "get_prometheus_targets", lambda: ["up", "down", "slow"])
+    health.query_cache.clear()
+
+    data = asyncio.run(health.health_fleet(deadline=0.2))
+    by_name = {c["cluster"]: c for c in data["clusters"]}
+    assert by_name["up"]["ok"] and by_name["up"]["firing_alerts"] == 2
+    assert by_name["down"]["ok"] is False and "refused" in by_name["down"]["error"]
+    assert by_name["slow"]["ok"] is False and by_name["slow"]["latency_ms"] < 1000
+    assert data["failed"] == 2
+    health.query_cache.clear()
+
+
+def _alert(name, ns="app", severity="warning"):
+    return {"metric": {"__name__": "ALERTS", "alertname": name, "alertstate": "firing",
+                       "namespace": ns, "severity": severity}, "value": [0, "1"]}
+
+
+def _for_state(name, active_at, ns="app", severity="warning"):
+    return {"metric": {"__name__": "ALERTS_FOR_STATE", "alertname": name,
+                       "namespace": ns, "severity": severity}, "value": [0, str(active_at)]}
+
+
+def test_alert_feed_returns_diffs_since_client_version(monkeypatch):
+    state = {"alerts": [_alert("A"), _alert("B", severity="critical")],
+             "for_state": [_for_state("A", 100), _for_state("B", 200, severity="critical")]}
+
+    async def fake_prom(path, params, cluster=""):
+        key = "for_state" if params["query"] == "ALERTS_FOR_STATE" else "alerts"
+        return {"ok": True, "result": state[key]}
+
+    monkeypatch.setattr(health, "_prom_request", fake_prom)
+    monkeypatch.setattr(health, "alert_store", health.alert_store.__class__())
+    monkeypatch.setattr(health, "get_prometheus_targets", lambda: ["c1"])
+    health.query_cache.clear()
+
+    async def run():
+        full = await health.health_alerts_feed("c1", since=0, wait=0, fmt="json", last_event_id=None)
+        # C fires, A resolves, B's active_at is unchanged → only C and A in the diff
+        health.query_cache.clear()
+        state["alerts"] = [_alert("B", severity="critical"), _alert("C")]
+        state["for_state"] = [_for_state("B", 200, severity="critical"), _for_state("C", 300)]
+        diff = await health.health_alerts_feed("c1", since=full["version"], wait=0, fmt="json", last_event_id=None)
+        # Nothing changes: a long-poll times out with an empty diff
+        idle = await health.health_alerts_feed("c1", since=diff["version"], wait=0.1, fmt="json", last_event_id=None)
+        listing = await health.health_alerts("c1")
+        return full, diff, idle, listing
+
+    full, diff, idle, listing = asyncio.run(run())
+    health.query_cache.clear()
+    assert full["full"] and [a["metric"]["alertname"] for a in full["alerts"]] == ["B", "A"]
+    assert full["alerts"][1]["active_at"] == 100
+    assert not diff["full"] and diff["version"] == full["version"] + 1
+    assert [a["metric"]["alertname"] for a in diff["added"]] == ["C"]
+    assert diff["changed"] == [] and len(diff["resolved"]) == 1 and "alertname=A" in diff["resolved"][0]
+    assert idle["version"] == diff["version"] and not (idle["added"] or idle["changed"] or idle["resolved"])
+    assert [r["metric"]["alertname"] for r in listing["result"]] == ["B", "C"]
+    assert listing["result"][0]["active_secs"] > 0
+
+
+def test_alert_feed_rejects_unknown_cluster(monkeypatch):
+    import pytest
+    from fastapi import HTTPException
+
+    store = health.alert_store.__class__()
+    monkeypatch.setattr(health, "alert_store", store)
+    monkeypatch.setattr(health, "get_prometheus_targets", lambda: ["c1"])
+    with pytest.raises(HTTPException) as unknown:
+        asyncio.run(health.health_alerts_feed("random-1", since=0, wait=0, fmt="json", last_event_id=None))
+    assert unknown.value.status_code == 404
+    assert list(store.samples()) == []
+
+
+def test_alert_feed_long_poll_wakes_on_change():
+    store = health.alert_store.__class__()
+    feed = store.update("c1", [_alert("A")], [_for_state("A", 100)])
+    v1 = feed.version
+
+    async def run():
+        waiter = asyncio.ensure_future(feed.wait(v1, 5))
+        await asyncio.sleep(0.01)
+        store.update("c1", [_alert("A"), _alert("B")], [_for_state("A", 100)])
+        return await waiter
+
+    assert asyncio.run(run()) is True
+    assert [a["metric"]["alertname"] for a in feed.since(v1)["added"]] == ["B"]
+    # Versions outside the retained log fall back to a full snapshot
+    assert feed.since(v1 + 10)["full"] and feed.since(1)["full"]
+
+
+def test_capacity_joins_quota_server_side_with_top_and_threshold(monkeypatch):
+    def q(ns, resource, value, quota="q"):
+        return {"metric": {"namespace": ns, "resourcequota": quota, "resource": resource}, "value": [0, str(value)]}
+
+    used = [q("a", "cpu", 3), q("a", "memory", 1), q("b", "cpu", 9), q("c", "cpu", 5)]
+    hard = [q("a", "cpu", 4), q("a", "memory", 10), q("b", "cpu", 10)]
+    calls = []
+
+    async def fake_prom(path, params, cluster=""):
+        calls.append(params["query"])
+        query = params["query"]
+        rows = used if 'type="used"' in query else hard if 'type="hard"' in query else []
+        return {"ok": True, "result": rows}
+
+    monkeypatch.setattr(health, "_prom_request", fake_prom)
+    health.query_cache.clear()
+
+    async def run():
+        first = await health.health_capacity("c1", top=2, min_pct=0, raw=False)
+        table = health._quota_tables["c1"][2]
+        second = await health.health_capacity("c1", top=50, min_pct=50, raw=True)
+        return first, second, table is health._quota_tables["c1"][2]
+
+    first, second, reused = asyncio.run(run())
+    health.query_cache.clear()
+    assert "quota_used" not in first and "quota_hard" not in first
+    assert first["quota"]["namespace"] == ["b", "a"] and first["quota"]["pct"] == [90.0, 75.0]
+    assert first["quota"]["total"] == 3 and first["quota"]["truncated"]
+    assert second["quota"]["resource"] == ["cpu", "cpu"] and not second["quota"]["truncated"]
+    assert len(second["quota_used"]) == 4
+    assert reused and len(calls) == len(health.CAPACITY_QUERIES)
+
+
+def test_top_quota_keeps_rows_exactly_at_threshold():
+    table = health._quota_table(
+        [{"metric": {"namespace": ns, "resourcequota": "q", "resource": "cpu"}, "value": [0, str(used)]}
+         for ns, used in (("full", 10), ("edge", 8), ("low", 5))],
+        [{"metric": {"namespace": ns, "resourcequota": "q", "resource": "cpu"}, "value": [0, "10"]}
+         for ns in ("full", "edge", "low")],
+    )
+    assert health._top_quota(table, 50, 80)["namespace"] == ["full", "edge"]
+    assert health._top_quota(table, 50, 100)["namespace"] == ["full"]
+    assert health._top_quota(table, 50, 100.1)["total"] == 0
+
+
+def test_health_stream_shares_refresh_and_drops_stale_frames():
+    from broadcast import Broadcaster
+
+    calls = []
+
+    async def produce(section, cluster):
+        calls.append(section)
+        n = len(calls)
+        # Content changes every other refresh; cache_age_sec alone is not a change
+        return {"ok": True, "n": (n + 1) // 2, "cache_age_sec": n}
+
+    hub = Broadcaster({"overview": produce}, lambda section: 0.01)
+
+    async def run():
+        fast, slow = hub.subscribe("c1"), hub.subscribe("c1")
+        seen = []
+        for _ in range(4):
+            frames = await fast.next(1)
+            seen += [frame["n"] for _, frame in frames]
+        backlog = await slow.next(1)
+        hub.unsubscribe("c1", fast)
+        hub.unsubscribe("c1", slow)
+        refreshes = len(calls)
+        await asyncio.sleep(0.05)
+        return seen, backlog, slow.dropped, refreshes
+
+    seen, backlog, dropped, refreshes = asyncio.run(run())
+    assert seen == [1, 2, 3, 4]
+    assert len(backlog) == 1 and backlog[0][1]["n"] >= 4 and dropped >= 3
+    assert refreshes >= 7 and len(calls) == refreshes        # one loop for both viewers, stopped after the last left
+    assert hub.stats["unchanged"] >= 3 and hub.status()["channels"] == {}
@@ -0,0 +1,110 @@
+import asyncio
+
+import informer as informer_mod
+import upstream
+from fake_ocp import FakeOCP, pod
+
+
+def test_informer_list_watch_and_relist_on_410(monkeypatch):
+    monkeypatch.setattr(
+        informer_mod, "get_watch_cache_config",
+        lambda: {"enabled": True, "idle_sec": 300, "sync_timeout_sec": 5},
+    )
+    fake = FakeOCP().start()
+    fake.pods = {"p1": pod("p1")}
+    fake.watch_script = [
+        [
+            {"type": "ADDED", "object": pod("p2", phase="Pending", rv="2")},
+            {"type": "DELETED", "object": pod("p1", rv="3")},
+            {"type": "ERROR", "object": {"kind": "Status", "code": 410, "message": "too old"}},
+        ],
+    ]
+    cluster = {"ocp_api": fake.url, "insecure": True}
+    registry = informer_mod.InformerRegistry()
+
+    async def run():
+        first = await registry.items(cluster, "t", "ns", "pods")
+        # After the scripted watch: p2 added, p1 deleted, then 410 → relist
+        fake.pods = {"p2": pod("p2", phase="Pending"), "p3": pod("p3")}
+        for _ in range(50):
+            await asyncio.sleep(0.05)
+            if registry.status()[0]["relists_410"]:
+                break
+        await asyncio.sleep(0.1)
+        second = await registry.items(cluster, "t", "ns", "pods")
+        status = registry.status()[0]
+        await registry.close()
+        await upstream.close_all()
+        return first, second, status
+
+    try:
+        first, second, status = asyncio.run(run())
+    finally:
+        fake.stop()
+
+    assert [p["metadata"]["name"] for p in first] == ["p1"]
+    assert "managedFields" not in first[0]["metadata"]
+    assert sorted(p["metadata"]["name"] for p in second) == ["p2", "p3"]
+    assert status["relists_410"] == 1
+    assert status["lists"] == 2
+
+
+def test_informer_disabled_returns_none(monkeypatch):
+    monkeypatch.setattr(
+        informer_mod, "get_watch_cache_config",
+        lambda: {"enabled": False, "idle_sec": 300, "sync_timeout_sec": 5},
+    )
+    registry = informer_mod.InformerRegistry()
+    cluster = {"ocp_api": "http://127.0.0.1:1", "insecure": True}
+    assert asyncio.run(registry.items(cluster, "t", "ns", "pods")) is None
+
+
+def test_informer_failing_list_falls_back_without_waiting(monkeypatch):
+    monkeypatch.setattr(
+        informer_mod, "get_watch_cache_config",
+        lambda: {"enabled": True, "idle_sec": 300, "sync_timeout_sec": 5},
+    )
+    fake = FakeOCP().start()
+    fake.pods = {"p1": pod("p1")}
+    fake.list_status = 403
+    cluster = {"ocp_api": fake.url, "insecure": True}
+    registry = informer_mod.InformerRegistry()
+
+    async def run():
+        loop = asyncio.get_running_loop()
+        started = loop.time()
+        denied = await registry.items(cluster, "t", "ns", "pods")
+        denied_again = await registry.items(cluster, "t", "ns", "pods")
+        elapsed = loop.time() - started
+        denied_status = registry.status()[0]
+        await registry.close()
+
+        # Synced informer: watch error, then the relist fails → stale items must not be served
+        fake.list_status = 200
+        fake.watch_script = [[{"type": "ERROR", "object": {"kind": "Status", "code": 500, "message": "boom"}}]]
+        synced = await registry.items(cluster, "t", "ns", "pods")
+        fake.list_status = 500
+        inf = next(iter(registry._informers.values()))
+        for _ in range(60):
+            await asyncio.sleep(0.05)
+            if not inf.synced.is_set():
+                break
+        stale = await registry.items(cluster, "t", "ns", "pods")
+        relist_status = registry.status()[0]
+        await registry.close()
+        await upstream.close_all()
+        return denied, denied_again, elapsed, denied_status, synced, stale, relist_status
+
+    try:
+        denied, denied_again, elapsed, denied_status, synced, stale, relist_status = asyncio.run(run())
+    finally:
+        fake.stop()
+
+    assert denied is None and denied_again is None
+    assert elapsed < 1
+    assert denied_status["synced"] is False
+    assert "403" in denied_status["last_error"]
+    assert [p["metadata"]["name"] for p in synced] == ["p1"]
+    assert stale is None
+    assert relist_status["synced"] is False
+    assert "500" in relist_status["last_error"]
@@ -0,0 +1,68 @@
+import asyncio
+import json
+
+import pytest
+
+import jsonstream
+from jsonstream import ListParser, project
+
+
+def _deep(n):
+    value = "leaf"
+    for _ in range(n):
+        value = {"x": [value]}
+    return value
+
+
+def _body():
+    items = [
+        {"metadata": {"name": "a", "annotations": {"k": 'x\\"]}{[ "'}, "managedFields": [{"f:a": {}}]},
+         "status": {"phase": "Running"}},
+        {"metadata": {"name": "bç", "labels": {"app": "{web}"}}, "spec": {"deep": _deep(40)}},
+        {"metadata": {"name": "c"}, "status": {"phase": "Pending", "containerStatuses": [{"restartCount": 2}]}},
+    ]
+    return json.dumps({"kind": "PodList", "metadata": {"continue": "t", "remainingItemCount": 4},
+                       "items": items, "apiVersion": "v1"}).encode(), items
+
+
+@pytest.mark.parametrize("chunk", [1, 3, 17, 1 << 16])
+def test_list_parser_matches_full_parse_for_any_chunking(chunk):
+    body, items = _body()
+    parser = ListParser(lambda i: i)
+    for k in range(0, len(body), chunk):
+        parser.feed(body[k:k + chunk])
+    data = parser.close()
+    assert data["items"] == items
+    assert data["metadata"] == {"continue": "t", "remainingItemCount": 4}
+    assert data["kind"] == "PodList" and data["apiVersion"] == "v1"
+
+
+def test_projection_keeps_only_requested_fields_and_rejects_truncated_body():
+    body, _ = _body()
+    spec = {"metadata": {"name": None}, "status": {"containerStatuses": {"restartCount": None}}}
+    parser = ListParser(lambda i: project(i, spec))
+    parser.feed(body)
+    assert parser.close()["items"] == [
+        {"metadata": {"name": "a"}, "status": {}},
+        {"metadata": {"name": "bç"}},
+        {"metadata": {"name": "c"}, "status": {"containerStatuses": [{"restartCount": 2}]}},
+    ]
+
+    partial = ListParser(lambda i: i)
+    partial.feed(body[:len(body) // 2])
+    with pytest.raises(ValueError):
+        partial.close()
+
+
+@pytest.mark.parametrize("threshold", [0, 1 << 20])
+def test_parse_list_streams_only_large_bodies(monkeypatch, threshold):
+    body, items = _body()
+    monkeypatch.setattr(jsonstream, "STREAM_PARSE_MIN_BYTES", threshold)
+
+    async def chunks():
+        for k in range(0, len(body), 10):
+            yield body[k:k + 10]
+
+    data = asyncio.run(jsonstream.parse_list(chunks(), {"metadata": {"name": None}}))
+    assert [i["metadata"]["name"] for i in data["items"]] == [i["metadata"]["name"] for i in items]
+    assert data["metadata"]["continue"] == "t"
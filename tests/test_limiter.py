@@ -0,0 +1,63 @@
+import asyncio
+
+import pytest
+
+from limiter import FairLimiter, Overloaded, client_id
+
+
+def test_limiter_serves_clients_round_robin():
+    lim = FairLimiter("prometheus", global_limit=10, target_limit=1)
+    order = []
+
+    async def call(client, n):
+        client_id.set(client)
+        async with lim.slot("c1"):
+            order.append(f"{client}{n}")
+            await asyncio.sleep(0.001)
+
+    async def run():
+        holder = asyncio.create_task(call("x", 0))
+        await asyncio.sleep(0)
+        # "a" 3 istek kuyruğa koyar, ardından "b" 2 istek — b, a'nın arkasında beklememeli
+        tasks = [asyncio.create_task(call("a", i)) for i in range(3)]
+        await asyncio.sleep(0)
+        tasks += [asyncio.create_task(call("b", i)) for i in range(2)]
+        await asyncio.gather(holder, *tasks)
+
+    asyncio.run(run())
+    assert order == ["x0", "a0", "b0", "a1", "b1", "a2"]
+    assert lim.active_total == 0 and lim.queued_total == 0
+
+
+def test_limiter_sheds_with_429_and_503():
+    lim = FairLimiter("ocp", global_limit=1, target_limit=1, max_queue=3, client_max_queue=2, queue_timeout=0.05)
+
+    async def hold(client, seconds):
+        client_id.set(client)
+        async with lim.slot("api"):
+            await asyncio.sleep(seconds)
+
+    async def run():
+        holder = asyncio.create_task(hold("a", 0.2))
+        await asyncio.sleep(0)
+        queued = [asyncio.create_task(hold("a", 0)) for _ in range(2)]
+        await asyncio.sleep(0)
+        client_id.set("a")
+        with pytest.raises(Overloaded) as per_client:
+            await lim.acquire("api")
+        queued.append(asyncio.create_task(hold("b", 0)))
+        await asyncio.sleep(0)
+        client_id.set("c")
+        with pytest.raises(Overloaded) as full:
+            await lim.acquire("api")
+        results = await asyncio.gather(*queued, return_exceptions=True)
+        await holder
+        return per_client.value, full.value, results
+
+    per_client, full, results = asyncio.run(run())
+    assert per_client.status_code == 429 and per_client.headers["Retry-After"]
+    assert full.status_code == 503
+    # Holder 0.2s tuttu; kuyruktakiler 0.05s sonra 503 ile düştü
+    assert all(isinstance(r, Overloaded) and r.status_code == 503 for r in results)
+    assert lim.active_total == 0 and lim.queued_total == 0
+    assert lim.stats["queue_timeouts"] == 3
@@ -0,0 +1,123 @@
+import asyncio
+
+import informer as informer_mod
+import upstream
+from fake_ocp import FakeOCP, pod
+from routers import logs, resources
+
+
+def test_search_pod_logs_across_selector(monkeypatch):
+    fake = FakeOCP().start()
+    fake.pods = {"a": pod("a"), "b": pod("b")}
+    fake.logs = {
+        ("a", False): "start\nINFO ready\nERROR db timeout\nretrying\n",
+        ("b", False): "WARN slow query\nINFO ok\n",
+    }
+    monkeypatch.setattr(logs, "_resolve_cluster", lambda name: {"ocp_api": fake.url, "insecure": True})
+    monkeypatch.setattr(logs, "get_token", lambda name: "t")
+    monkeypatch.setattr(
+        informer_mod, "get_watch_cache_config",
+        lambda: {"enabled": False, "idle_sec": 300, "sync_timeout_sec": 5},
+    )
+
+    async def run():
+        try:
+            return await logs.search_pod_logs(
+                "c1", "ns", pattern=[], pod=None, label_selector="app=web", container=None,
+                regex=False, ignore_case=True, level="warn", context=1, tail_lines=100,
+                since_seconds=None, previous=False, max_matches=10,
+            )
+        finally:
+            await resources.informers.close()
+            await upstream.close_all()
+
+    try:
+        data = asyncio.run(run())
+    finally:
+        fake.stop()
+
+    by_pod = {r["pod"]: r for r in data["results"]}
+    assert data["total_matches"] == 2
+    a = by_pod["a"]["matches"][0]
+    assert (a["line_no"], a["line"], a["before"], a["after"]) == (2, "ERROR db timeout", ["INFO ready"], ["retrying"])
+    assert a["offset"] == len("start\nINFO ready\n")
+    assert by_pod["b"]["matches"][0]["line"] == "WARN slow query"
+
+
+def test_search_pod_logs_goes_through_ocp_limiter(monkeypatch):
+    from limiter import FairLimiter
+
+    fake = FakeOCP().start()
+    fake.pods = {"a": pod("a"), "b": pod("b")}
+    fake.logs = {("a", False): "ERROR x\n", ("b", False): "ERROR y\n"}
+    lim = FairLimiter("ocp", global_limit=1, target_limit=1)
+    monkeypatch.setattr(logs, "ocp_limiter", lim)
+    monkeypatch.setattr(logs, "_resolve_cluster", lambda name: {"ocp_api": fake.url, "insecure": True})
+    monkeypatch.setattr(logs, "get_token", lambda name: "t")
+    monkeypatch.setattr(
+        informer_mod, "get_watch_cache_config",
+        lambda: {"enabled": False, "idle_sec": 300, "sync_timeout_sec": 5},
+    )
+
+    async def run():
+        try:
+            return await logs.search_pod_logs(
+                "c1", "ns", pattern=["error"], pod=None, label_selector="app=web", container=None,
+                regex=False, ignore_case=True, level=None, context=0, tail_lines=100,
+                since_seconds=None, previous=False, max_matches=10,
+            )
+        finally:
+            await resources.informers.close()
+            await upstream.close_all()
+
+    try:
+        data = asyncio.run(run())
+    finally:
+        fake.stop()
+
+    assert data["total_matches"] == 2
+    # Both log streams took a limiter slot; with one slot the second had to queue
+    assert lim.stats["admitted"] == 2
+    assert lim.stats["queued"] == 1
+    assert lim.active_total == 0
+
+
+def test_search_max_matches_is_total_and_pattern_is_bounded(monkeypatch):
+    import pytest
+    from fastapi import HTTPException
+
+    fake = FakeOCP().start()
+    fake.pods = {"a": pod("a"), "b": pod("b")}
+    fake.logs = {("a", False): "ERROR 1\nERROR 2\nERROR 3\n", ("b", False): "ERROR 4\nERROR 5\nERROR 6\n"}
+    monkeypatch.setattr(logs, "_resolve_cluster", lambda name: {"ocp_api": fake.url, "insecure": True})
+    monkeypatch.setattr(logs, "get_token", lambda name: "t")
+    monkeypatch.setattr(
+        informer_mod, "get_watch_cache_config",
+        lambda: {"enabled": False, "idle_sec": 300, "sync_timeout_sec": 5},
+    )
+
+    async def run():
+        try:
+            return await logs.search_pod_logs(
+                "c1", "ns", pattern=["error"], pod=None, label_selector="app=web", container=None,
+                regex=False, ignore_case=True, level=None, context=0, tail_lines=100,
+                since_seconds=None, previous=False, max_matches=4,
+            )
+        finally:
+            await resources.informers.close()
+            await upstream.close_all()
+
+    try:
+        data = asyncio.run(run())
+    finally:
+        fake.stop()
+
+    assert data["total_matches"] == 4
+    assert data["truncated"] is True
+
+    with pytest.raises(HTTPException) as too_long:
+        logs._compile(["a" * (logs.MAX_PATTERN_CHARS + 1)], regex=True, ignore_case=False)
+    assert too_long.value.status_code == 400
+    # Only the head of a very long line is matched
+    line = "x" * logs.MAX_LINE_CHARS + "ERROR"
+    assert logs._match_batch([line, "ERROR"], logs._compile(["error"], False, True), None) == [False, True]
@@ -0,0 +1,202 @@
+import asyncio
+
+from routers import metrics
+
+
+def _fake_fetch(calls, series=("a", "b")):
+    async def fetch(start, end):
+        calls.append((start, end))
+        ts = [start + i * 15 for i in range(int((end - start) // 15) + 1)]
+        return {"ok": True, "result": [
+            {"metric": {"pod": name}, "values": [[t, str(t)] for t in ts]} for name in series
+        ]}
+    return fetch
+
+
+def test_parse_step_and_time():
+    assert metrics._parse_step("1m30s") == 90
+    assert metrics._parse_step("15") == 15
+    assert metrics._parse_step("abc") is None
+    assert metrics._parse_time("1970-01-01T00:01:00Z") == 60
+
+
+def test_range_cache_fetches_only_missing_tail():
+    cache = metrics.RangeCache(max_points=10_000, refresh_sec=30)
+    calls = []
+    key = ("c1", "up", 15.0)
+
+    async def run():
+        first = await cache.query(key, 1000, 4600, _fake_fetch(calls))
+        second = await cache.query(key, 1060, 4660, _fake_fetch(calls))
+        return first, second
+
+    first, second = asyncio.run(run())
+    assert first["cache"]["mode"] == "miss"
+    assert second["cache"]["mode"] == "partial"
+    # Window start/end aligned to step; tail refetch starts refresh_sec before previous end
+    assert calls[0] == (990, 4590)
+    assert calls[1] == (4560, 4650)
+    values = second["result"][0]["values"]
+    assert values[0][0] == 1050 and values[-1][0] == 4650
+    assert [t for t, _ in values] == list(range(1050, 4651, 15))
+    assert cache.points == 2 * len(values)
+
+
+def test_range_cache_alternating_windows_fetch_only_tail():
+    cache = metrics.RangeCache(max_points=100_000, refresh_sec=30)
+    calls = []
+    key = ("c1", "up", 15.0)
+
+    async def run():
+        modes = []
+        for i in range(6):
+            end = 30_000 + i * 60
+            window = 3600 if i % 2 else 6 * 3600
+            res = await cache.query(key, end - window, end, _fake_fetch(calls, ("a",)))
+            modes.append(res["cache"]["mode"])
+            assert res["result"][0]["values"][0][0] == end - window
+        return modes
+
+    modes = asyncio.run(run())
+    # 6h panel then 1h panel on the same query: the 1h request must not trim the 6h window
+    assert modes == ["miss"] + ["partial"] * 5
+    for start, end in calls[1:]:
+        assert end - start <= 120
+
+
+def test_range_cache_evicts_lru_over_point_limit():
+    cache = metrics.RangeCache(max_points=300, refresh_sec=0)
+    calls = []
+
+    async def run():
+        await cache.query(("c1", "q1", 15.0), 0, 1500, _fake_fetch(calls, ("a",)))
+        await cache.query(("c1", "q2", 15.0), 0, 1500, _fake_fetch(calls, ("a",)))
+        await cache.query(("c1", "q3", 15.0), 0, 1500, _fake_fetch(calls, ("a",)))
+
+    asyncio.run(run())
+    assert cache.snapshot_stats()["entries"] == 2
+    assert cache.points <= 300
+
+
+def test_range_cache_bounds_entries_and_locks():
+    cache = metrics.RangeCache(max_points=100_000, refresh_sec=0, max_entries=3)
+    calls = []
+
+    async def empty(start, end):
+        return {"ok": True, "result": []}
+
+    async def failing(start, end):
+        return {"ok": False, "error": "boom"}
+
+    async def run():
+        for i in range(50):
+            await cache.query(("c1", f"empty{i}", 15.0), 0, 1500, empty)
+            await cache.query(("c1", f"fail{i}", 15.0), 0, 1500, failing)
+        for i in range(5):
+            await cache.query(("c1", f"q{i}", 15.0), 0, 1500, _fake_fetch(calls, ("a",)))
+
+    asyncio.run(run())
+    stats = cache.snapshot_stats()
+    # Empty / failed keys keep neither an entry nor a lock; stored entries are capped (LRU)
+    assert stats["entries"] == 3
+    assert stats["locks"] == 3
+    assert stats["evictions"] == 2
+
+
+def test_downsample_keeps_endpoints_and_peaks():
+    from array import array
+    ts = array("d", range(1000))
+    vals = array("d", (0.0 for _ in range(1000)))
+    vals[500] = 99.0
+    for method in ("lttb", "minmax"):
+        out_t, out_v = metrics._downsample(ts, vals, 50, method)
+        assert len(out_t) <= 50
+        assert 99.0 in out_v
+        assert list(out_t) == sorted(out_t)
+    out_t, _ = metrics._downsample(ts, vals, 50, "lttb")
+    assert out_t[0] == 0 and out_t[-1] == 999
+
+
+def test_range_cache_max_points_and_columns_format():
+    cache = metrics.RangeCache(max_points=100_000, refresh_sec=0)
+    calls = []
+
+    async def run():
+        return await cache.query(("c1", "up", 15.0), 0, 15 * 999, _fake_fetch(calls, ("a",)),
+                                 max_points=100, fmt="columns")
+
+    res = asyncio.run(run())
+    row = res["result"][0]
+    assert len(row["timestamps"]) == len(row["values"]) == 100
+    assert row["timestamps"][0] == 0 and isinstance(row["values"][1], float)
+    assert metrics._fmt_value(3.0) == "3" and metrics._fmt_value(float("nan")) == "NaN"
+
+
+def test_batch_dedupes_and_reports_per_query(monkeypatch):
+    calls = []
+
+    async def fake_prom(path, params, cluster=""):
+        calls.append((path, params.get("query"), cluster))
+        if params.get("query") == "slow":
+            await asyncio.sleep(1)
+        if params.get("query") == "bad":
+            return {"ok": False, "error": "parse error", "result": []}
+        return {"ok": True, "result": [{"metric": {}, "value": [0, "1"]}]}
+
+    monkeypatch.setattr(metrics, "_prom_request", fake_prom)
+    body = {"cluster": "c1", "timeout": 0.2, "queries": [
+        {"id": "a", "query": "up"},
+        {"id": "b", "query": "up"},
+        {"id": "c", "query": "up", "cluster": "c2"},
+        {"id": "d", "query": "bad"},
+        {"id": "e", "query": "slow"},
+        {"id": "f", "query": "up", "type": "range", "start": 0, "end": 60, "step": "15s", "cache": False},
+    ]}
+    res = asyncio.run(metrics.run_promql_batch(body))
+    assert res["total"] == 6 and res["executed"] == 5 and res["failed"] == 2
+    r = res["results"]
+    assert r["a"]["ok"] and r["b"]["deduplicated"] and not r["a"]["deduplicated"]
+    assert r["d"]["error"] == "parse error"
+    assert "zaman aşımı" in r["e"]["error"]
+    assert "duration_ms" in r["f"]
+    assert sorted(c for c in calls if c[1] == "up") == [
+        ("/api/v1/query", "up", "c1"), ("/api/v1/query", "up", "c2"), ("/api/v1/query_range", "up", "c1"),
+    ]
+
+
+def test_label_index_searches_from_memory_and_refreshes_in_background(monkeypatch):
+    calls = []
+    values = [["kube-apiserver-0", "etcd-0", "alertmanager-main-0", "prometheus-k8s-0", "kube-proxy-x"]]
+
+    async def fake_prom(path, params, cluster=""):
+        calls.append((path, params))
+        return {"ok": True, "result": values[0]}
+
+    monkeypatch.setattr(metrics, "_prom_request", fake_prom)
+    monkeypatch.setattr(metrics, "label_index", metrics.LabelIndex(refresh_sec=60, max_lists=8))
+
+    async def run():
+        prefix = await metrics.list_label_values(label="pod", cluster="c1", q="kube", limit=10,
+                                                 match=[], fuzzy=False)
+        fuzzy = await metrics.list_label_values(label="pod", cluster="c1", q="pk8", limit=10,
+                                                match=[], fuzzy=True)
+        limited = await metrics.list_label_values(label="pod", cluster="c1", q="", limit=2,
+                                                  match=[], fuzzy=True)
+        assert len(calls) == 1
+        # Bayat liste: eski değerle hemen yanıt, arka planda yenileme
+        metrics.label_index._lists[("c1", "pod", ())].loaded_at -= 120
+        values[0] = ["new-pod"]
+        stale = await metrics.list_label_values(label="pod", cluster="c1", q="", limit=None,
+                                                match=[], fuzzy=True)
+        await asyncio.sleep(0)
+        fresh = await metrics.list_label_values(label="pod", cluster="c1", q="", limit=None,
+                                                match=[], fuzzy=True)
+        scoped = await metrics.list_labels(cluster="c1", q="", limit=None, match=['up{job="x"}'], fuzzy=True)
+        return prefix, fuzzy, limited, stale, fresh, scoped
+
+    prefix, fuzzy, limited, stale, fresh, scoped = asyncio.run(run())
+    assert prefix["result"] == ["kube-apiserver-0", "kube-proxy-x"]
+    assert fuzzy["result"] == ["prometheus-k8s-0"]
+    assert limited["truncated"] and len(limited["result"]) == 2
+    assert "new-pod" not in stale["result"] and fresh["result"] == ["new-pod"]
+    assert scoped["ok"] and calls[-1] == ("/api/v1/labels", {"match[]": ['up{job="x"}']})
@@ -0,0 +1,206 @@
+import asyncio
+
+import pytest
+from fastapi import HTTPException
+
+import informer as informer_mod
+import upstream
+from fake_ocp import FakeOCP, pod
+from routers import resources
+
+
+def _setup(monkeypatch, fake, watch_cache):
+    monkeypatch.setattr(resources, "_resolve_cluster", lambda name: {"ocp_api": fake.url, "insecure": True})
+    monkeypatch.setattr(resources, "get_token", lambda name: "t")
+    monkeypatch.setattr(
+        informer_mod, "get_watch_cache_config",
+        lambda: {"enabled": watch_cache, "idle_sec": 300, "sync_timeout_sec": 5},
+    )
+
+
+def _list_pods(**kw):
+    args = {"phase": None, "node": None, "label_selector": None, "ready": None,
+            "restarts_gt": None, "limit": None, "cont": None, **kw}
+
+    async def run():
+        try:
+            return await resources.list_pods("c1", "ns", **args)
+        finally:
+            await resources.informers.close()
+            await upstream.close_all()
+
+    return asyncio.run(run())
+
+
+def test_list_pods_passes_selectors_and_paging_to_api(monkeypatch):
+    fake = FakeOCP().start()
+    fake.pods = {"a": pod("a"), "b": pod("b")}
+    _setup(monkeypatch, fake, watch_cache=False)
+    try:
+        page = _list_pods(phase="Running", label_selector="app=web", limit=1, cont="abc")
+    finally:
+        fake.stop()
+    assert fake.queries[-1] == {
+        "fieldSelector": "status.phase=Running",
+        "labelSelector": "app=web",
+        "limit": "1",
+        "continue": "abc",
+    }
+    assert [p["name"] for p in page["items"]] == ["a"]
+    assert page["continue"] == "next-page"
+
+
+def test_list_pods_filters_and_pages_from_watch_cache(monkeypatch):
+    fake = FakeOCP().start()
+    fake.pods = {
+        "a": pod("a", restarts=5),
+        "b": pod("b", restarts=0),
+        "c": pod("c", restarts=9),
+        "d": pod("d", phase="Pending", restarts=7),
+    }
+    _setup(monkeypatch, fake, watch_cache=True)
+    try:
+        first = _list_pods(phase="Running", restarts_gt=1, limit=1)
+        second = _list_pods(phase="Running", restarts_gt=1, limit=1, cont=first["continue"])
+    finally:
+        fake.stop()
+    assert [p["name"] for p in first["items"]] == ["a"]
+    assert first["continue"] == "wc:1"
+    assert [p["name"] for p in second["items"]] == ["c"]
+    assert second["continue"] is None
+
+
+def _stream(**kw):
+    args = {"container": None, "follow": False, "since_seconds": None, "limit_bytes": None,
+            "tail_lines": None, "previous": False, "fmt": "text", **kw}
+
+    async def run():
+        try:
+            resp = await resources.stream_pod_logs("c1", "ns", "a", **args)
+            chunks = [c if isinstance(c, bytes) else c.encode() async for c in resp.body_iterator]
+            return resp, b"".join(chunks).decode()
+        finally:
+            await resources.informers.close()
+            await upstream.close_all()
+
+    return asyncio.run(run())
+
+
+def test_stream_pod_logs_passes_through_and_falls_back(monkeypatch):
+    fake = FakeOCP().start()
+    fake.pods = {"a": pod("a")}
+    fake.logs = {("a", True): "boom\ncrashed\n"}
+    _setup(monkeypatch, fake, watch_cache=False)
+    try:
+        resp, body = _stream(fmt="sse", limit_bytes=1024)
+    finally:
+        fake.stop()
+    # current log unavailable → previous used
+    assert resp.headers["x-log-previous"] == "true"
+    assert body == "data: boom\n\ndata: crashed\n\nevent: end\ndata: \n\n"
+    log_queries = [q for (path, _), q in zip(fake.calls, fake.queries) if path.endswith("/log")]
+    assert log_queries[0] == {"container": "app", "limitBytes": "1024"}
+
+
+def _summary(monkeypatch, prom_result, **kw):
+    calls = []
+
+    async def fake_prom(path, params, cluster=""):
+        calls.append(params["query"])
+        return prom_result
+
+    monkeypatch.setattr(resources, "_prom_request", fake_prom)
+    args = {"namespace": None, "namespaces": [], "source": "auto", **kw}
+
+    async def run():
+        try:
+            return await resources.namespace_summary("c1", **args)
+        finally:
+            await resources.informers.close()
+            await upstream.close_all()
+
+    return asyncio.run(run()), calls
+
+
+def test_namespace_summary_uses_kube_state_metrics_for_many_namespaces(monkeypatch):
+    fake = FakeOCP().start()
+    fake.events = [{"metadata": {"name": "e1", "namespace": "a"}, "type": "Warning"}]
+    _setup(monkeypatch, fake, watch_cache=False)
+    rows = [
+        {"metric": {"namespace": "a", "phase": "Running", "kind": "phase"}, "value": [0, "3"]},
+        {"metric": {"namespace": "a", "phase": "Pending", "kind": "phase"}, "value": [0, "1"]},
+        {"metric": {"namespace": "openshift-monitoring", "phase": "Failed", "kind": "phase"}, "value": [0, "2"]},
+        {"metric": {"namespace": "a", "kind": "restarts"}, "value": [0, "7"]},
+    ]
+    try:
+        out, calls = _summary(monkeypatch, {"ok": True, "result": rows}, namespaces=["a,openshift-monitoring"])
+    finally:
+        fake.stop()
+    # Namespace names go into the PromQL string unescaped: "\-" is not a valid PromQL escape
+    assert len(calls) == 1 and 'namespace=~"a|openshift-monitoring"' in calls[0] and "\\" not in calls[0]
+    assert not any(path.endswith("/pods") for path, _ in fake.calls)
+    assert out["source"] == "prometheus"
+    assert out["namespaces"]["a"] == {"running": 3, "failed": 0, "pending": 1, "total_restarts": 7, "warning_events": 1}
+    assert out["namespaces"]["openshift-monitoring"]["failed"] == 2
+
+
+def test_namespace_summary_falls_back_to_api_without_prometheus(monkeypatch):
+    fake = FakeOCP().start()
+    fake.pods = {"a": pod("a", restarts=2), "b": pod("b", phase="Pending")}
+    _setup(monkeypatch, fake, watch_cache=False)
+    try:
+        out, _ = _summary(monkeypatch, {"ok": False, "result": [], "error": "down"}, namespace="ns")
+    finally:
+        fake.stop()
+    assert out == {"running": 1, "failed": 0, "pending": 1, "total_restarts": 2, "warning_events": 0, "source": "api"}
+
+
+def test_list_namespaces_requests_metadata_only_and_falls_back_on_406(monkeypatch):
+    fake = FakeOCP().start()
+    fake.namespaces = ["b", "a"]
+    fake.metadata_lists = False
+    _setup(monkeypatch, fake, watch_cache=False)
+    monkeypatch.setattr(resources, "_metadata_rejected", set())
+
+    async def run():
+        try:
+            return [await resources.list_namespaces("c1") for _ in range(2)]
+        finally:
+            await upstream.close_all()
+
+    try:
+        first, second = asyncio.run(run())
+    finally:
+        fake.stop()
+    assert first == second == ["a", "b"]
+    # 406 → düz JSON ile tekrar; ikinci çağrı doğrudan düz JSON
+    assert ["as=PartialObjectMetadataList" in a for a in fake.accepts] == [True, False, False]
+
+
+def test_warning_counts_use_partial_object_metadata(monkeypatch):
+    fake = FakeOCP().start()
+    fake.events = [{"metadata": {"name": f"e{i}", "namespace": "a"}, "type": "Warning", "message": "x" * 100}
+                   for i in range(3)]
+    _setup(monkeypatch, fake, watch_cache=False)
+    monkeypatch.setattr(resources, "_metadata_rejected", set())
+
+    async def run():
+        try:
+            return await resources._warning_counts({"ocp_api": fake.url, "insecure": True}, "t", ["a"])
+        finally:
+            await upstream.close_all()
+
+    try:
+        counts = asyncio.run(run())
+    finally:
+        fake.stop()
+    assert counts == {"a": 3}
+    assert "as=PartialObjectMetadataList" in fake.accepts[-1]
+
+
+def test_namespace_summary_rejects_invalid_namespace_names(monkeypatch):
+    monkeypatch.setattr(resources, "_resolve_cluster", lambda name: {"ocp_api": "http://unused", "insecure": True})
+    monkeypatch.setattr(resources, "get_token", lambda name: "t")
+    with pytest.raises(HTTPException) as err:
+        _summary(monkeypatch, {"ok": True, "result": []}, namespaces=['a.*"}'])
+    assert err.value.status_code == 400
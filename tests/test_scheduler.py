@@ -0,0 +1,65 @@
+import asyncio
+
+import scheduler as scheduler_mod
+
+
+def test_scheduler_serves_latest_snapshot(monkeypatch):
+    cfg = {"enabled": True, "jitter_sec": 0.0, "intervals": {"overview": 60}}
+    monkeypatch.setattr(scheduler_mod, "get_scheduler_config", lambda: cfg)
+    monkeypatch.setattr(scheduler_mod, "get_prometheus_targets", lambda: ["c1"])
+    monkeypatch.setattr(scheduler_mod, "TICK_SEC", 0.01)
+
+    calls = []
+
+    async def compute(cluster):
+        calls.append(cluster)
+        return {"ok": True, "cluster": cluster, "firing_alerts": 4}
+
+    sched = scheduler_mod.SnapshotScheduler()
+    sched.register("overview", compute)
+
+    async def run():
+        assert sched.start()
+        await asyncio.sleep(0.1)
+        snap = sched.latest("c1", "overview")
+        status = sched.status()
+        await sched.stop()
+        return snap, status
+
+    snap, status = asyncio.run(run())
+    assert calls == ["c1"]
+    assert snap[0]["firing_alerts"] == 4
+    assert status["items"][0]["failures"] == 0
+
+
+def test_scheduler_stop_cancels_inflight_refreshes(monkeypatch):
+    cfg = {"enabled": True, "jitter_sec": 0.0, "intervals": {"overview": 60}}
+    monkeypatch.setattr(scheduler_mod, "get_scheduler_config", lambda: cfg)
+    monkeypatch.setattr(scheduler_mod, "get_prometheus_targets", lambda: ["c1", "c2"])
+    monkeypatch.setattr(scheduler_mod, "TICK_SEC", 0.01)
+
+    cancelled = []
+
+    async def compute(cluster):
+        try:
+            await asyncio.sleep(10)
+        except asyncio.CancelledError:
+            cancelled.append(cluster)
+            raise
+        return {"ok": True}
+
+    sched = scheduler_mod.SnapshotScheduler()
+    sched.register("overview", compute)
+
+    async def run():
+        sched.start()
+        await asyncio.sleep(0.05)
+        inflight = len(sched._tasks)
+        await sched.stop()
+        # stop() returns only after the refreshes have actually finished
+        return inflight, sorted(cancelled), len(sched._tasks)
+
+    inflight, cancelled_clusters, left = asyncio.run(run())
+    assert inflight == 2
+    assert cancelled_clusters == ["c1", "c2"]
+    assert left == 0
@@ -1,10 +1,12 @@
+import asyncio
+
 from main import health
 from routers.clusters import auth_status
 from routers.metrics import run_promql
 
 
 def test_health_endpoint():
-    assert health() == {"status": "ok"}
+    assert asyncio.run(health()) == {"status": "ok"}
 
 
 def test_auth_status_shape():
@@ -15,6 +17,6 @@ def test_auth_status_shape():
 
 
 def test_promql_rejects_empty_query():
-    data = run_promql({"query": ""})
+    data = asyncio.run(run_promql({"query": ""}))
     assert data["ok"] is False
     assert data["result"] == []
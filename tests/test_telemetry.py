@@ -0,0 +1,44 @@
+import asyncio
+import re
+
+from fastapi.testclient import TestClient
+
+import telemetry
+from main import app
+from routers import health, metrics
+
+
+def test_metrics_endpoint_exposes_route_histograms():
+    with TestClient(app) as client:
+        assert client.get("/api/health").status_code == 200
+        body = client.get("/metrics").text
+    assert 'observe_http_request_duration_seconds_count{method="GET",route="/api/health",status="200"}' in body
+    # {"status":"ok"} = 15 byte; diğer testler de /api/health çağırmış olabilir
+    size = re.search(r'observe_http_response_size_bytes_sum\{method="GET",route="/api/health"\} (\d+)', body)
+    assert size and int(size.group(1)) % 15 == 0
+    assert "# TYPE observe_query_cache gauge" in body
+    assert 'observe_threadpool_threads{state="total"}' in body
+
+
+def test_upstream_calls_are_labelled_by_query_name(monkeypatch):
+    async def fake_call(path, params, cluster, br=None):
+        return {"ok": params["query"] != "bad", "result": [], "error": "x"}
+
+    monkeypatch.setattr(metrics, "_prom_call", fake_call)
+    monkeypatch.setattr(metrics, "get_cluster_prometheus_url", lambda c: "http://prom")
+    monkeypatch.setattr(telemetry, "get_cluster_prometheus_url", lambda c: "http://prom")
+    asyncio.run(health._par({"nodes_total": "good", "broken": "bad"}, "c9"))
+    body = telemetry.registry.render()
+    assert 'observe_upstream_request_duration_seconds_count{cluster="c9",endpoint="/api/v1/query",query="nodes_total"} 1' in body
+    assert 'observe_upstream_errors_total{cluster="c9",endpoint="/api/v1/query",query="broken"} 1' in body
+    assert 'query="nodes_total"' not in body.split("observe_upstream_errors_total")[-1]
+
+
+def test_unknown_cluster_names_share_one_label(monkeypatch):
+    monkeypatch.setattr(telemetry, "get_cluster_prometheus_url", lambda c: "http://prom" if c == "known" else "")
+    for name in ("known", "rnd-1", "rnd-2", "rnd-3"):
+        telemetry.observe_upstream(name, "/api/v1/labels", 0.0, False)
+    body = telemetry.registry.render()
+    assert 'observe_upstream_errors_total{cluster="known",endpoint="/api/v1/labels",query=""} 1' in body
+    assert 'observe_upstream_errors_total{cluster="unknown",endpoint="/api/v1/labels",query=""} 3' in body
+    assert "rnd-" not in body
@@ -0,0 +1,73 @@
+import asyncio
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import upstream
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        body = json.dumps({"status": "success", "data": {"result": []}}).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+def test_client_reused_with_keepalive():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base = f"http://127.0.0.1:{server.server_port}"
+
+    async def run():
+        try:
+            for _ in range(3):
+                resp = await upstream.http_get(base, "/api/v1/query", token="t", verify=True, timeout=5)
+                assert resp.json()["status"] == "success"
+            stats = upstream.pool_stats()
+            return next(s for s in stats["sessions"] if s["base_url"] == base)
+        finally:
+            await upstream.close_all()
+
+    try:
+        session = asyncio.run(run())
+        assert session["requests"] == 3
+        assert session["new_connections"] == 1
+    finally:
+        server.shutdown()
+
+
+def test_evicted_client_closes_after_inflight_stream(monkeypatch):
+    monkeypatch.setattr(upstream, "MAX_SESSIONS", 1)
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base = f"http://127.0.0.1:{server.server_port}"
+
+    async def run():
+        try:
+            async with upstream.http_stream(base, "/api/v1/query", token="a", verify=True, timeout=5) as resp:
+                evicted = upstream._get_entry(base, True, "a")
+                # A second session pushes "a" out of the LRU while its stream is still open
+                await upstream.http_get(base, "/api/v1/query", token="b", verify=True, timeout=5)
+                await asyncio.sleep(0)
+                open_during = not evicted.client.is_closed
+                body = json.loads(await resp.aread())
+            await asyncio.gather(*list(upstream._closing))
+            return open_during, body, evicted.client.is_closed
+        finally:
+            await upstream.close_all()
+
+    try:
+        open_during, body, closed_after = asyncio.run(run())
+    finally:
+        server.shutdown()
+    assert open_during
+    assert body["status"] == "success"
+    assert closed_after
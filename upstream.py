@@ -0,0 +1,241 @@
+import os
+import ssl
+import asyncio
+import logging
+import weakref
+from collections import OrderedDict
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Dict, Optional, Tuple, Union
+
+import certifi
+import httpx
+
+from telemetry import registry
+
+log = logging.getLogger("alarmfw.observe.upstream")
+
+# Aynı anda açık tutulacak client (base URL, verify, token) sayısı
+MAX_SESSIONS        = int(os.getenv("UPSTREAM_MAX_SESSIONS", "64"))
+# Host başına keep-alive'da tutulan bağlantı sayısı
+POOL_MAXSIZE        = int(os.getenv("UPSTREAM_POOL_MAXSIZE", "10"))
+# Host başına eşzamanlı açık bağlantı üst sınırı (aşılırsa istek havuzda bekler)
+MAX_CONNECTIONS     = int(os.getenv("UPSTREAM_MAX_CONNECTIONS", "20"))
+# Uzun ömürlü watch stream'leri için ayrı havuz; normal istekleri aç bırakmaz
+WATCH_MAX_CONNECTIONS = int(os.getenv("UPSTREAM_WATCH_MAX_CONNECTIONS", "100"))
+
+
+def _build_ssl_context(verify: bool) -> ssl.SSLContext:
+    """Client başına bir kez oluşturulan TLS context (CA bundle her bağlantıda yeniden okunmaz)."""
+    if verify:
+        # requests ile aynı öncelik: REQUESTS_CA_BUNDLE / CURL_CA_BUNDLE > certifi
+        cafile = (
+            os.getenv("REQUESTS_CA_BUNDLE")
+            or os.getenv("CURL_CA_BUNDLE")
+            or certifi.where()
+        )
+        return ssl.create_default_context(cafile=cafile)
+    ctx = ssl.create_default_context()
+    ctx.check_hostname = False
+    ctx.verify_mode = ssl.CERT_NONE
+    return ctx
+
+
+_SessionKey = Tuple[str, bool, str, str]
+
+
+class _Entry:
+    """Registry kaydı: client + bağlantı sayaçları."""
+
+    __slots__ = ("client", "max_connections", "requests", "new_connections", "inflight", "evicted")
+
+    def __init__(self, client: httpx.AsyncClient, max_connections: int):
+        self.client          = client
+        self.max_connections = max_connections
+        self.requests        = 0
+        self.new_connections = 0
+        self.inflight        = 0
+        # LRU'dan çıkarıldı; uçuştaki son istek bitince kapatılır
+        self.evicted         = False
+
+    async def trace(self, event: str, info: dict) -> None:
+        if event == "connection.connect_tcp.complete":
+            self.new_connections += 1
+
+
+# httpx client'ları event loop'a bağlıdır; registry loop başına tutulur.
+_registries: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, OrderedDict[_SessionKey, _Entry]]" = (
+    weakref.WeakKeyDictionary()
+)
+_stats = {"hits": 0, "misses": 0, "evictions": 0}
+# Arka planda kapanan client'lar (referans tutulmazsa task GC'ye gidebilir)
+_closing: set = set()
+
+
+def _registry() -> "OrderedDict[_SessionKey, _Entry]":
+    loop = asyncio.get_running_loop()
+    reg = _registries.get(loop)
+    if reg is None:
+        reg = OrderedDict()
+        _registries[loop] = reg
+    return reg
+
+
+def _max_connections(pool: str) -> int:
+    return WATCH_MAX_CONNECTIONS if pool == "watch" else MAX_CONNECTIONS
+
+
+def _new_client(verify: bool, token: str, pool: str) -> httpx.AsyncClient:
+    headers = {"Authorization": f"Bearer {token}"} if token else {}
+    max_connections = _max_connections(pool)
+    return httpx.AsyncClient(
+        headers=headers,
+        transport=httpx.AsyncHTTPTransport(
+            verify=_build_ssl_context(verify),
+            limits=httpx.Limits(
+                max_connections=max_connections,
+                max_keepalive_connections=POOL_MAXSIZE,
+            ),
+            retries=1,
+        ),
+        trust_env=False,
+    )
+
+
+def _get_entry(base_url: str, verify: bool, token: str, pool: str = "default") -> _Entry:
+    key = (base_url.rstrip("/"), bool(verify), token, pool)
+    reg = _registry()
+    entry = reg.get(key)
+    if entry is not None:
+        reg.move_to_end(key)
+        _stats["hits"] += 1
+        return entry
+    _stats["misses"] += 1
+    entry = _Entry(_new_client(key[1], key[2], pool), _max_connections(pool))
+    reg[key] = entry
+    if len(reg) > MAX_SESSIONS:
+        _, evicted = reg.popitem(last=False)
+        _stats["evictions"] += 1
+        evicted.evicted = True
+        if evicted.inflight == 0:
+            _close(evicted)
+    return entry
+
+
+def _close(entry: _Entry) -> None:
+    task = asyncio.get_running_loop().create_task(entry.client.aclose())
+    _closing.add(task)
+    task.add_done_callback(_closing.discard)
+
+
+def _release(entry: _Entry) -> None:
+    """İstek / stream bitti; LRU'dan çıkarılmış client son kullanıcısıyla kapanır."""
+    entry.inflight -= 1
+    if entry.evicted and entry.inflight == 0:
+        _close(entry)
+
+
+async def http_get(
+    base_url: str,
+    path: str,
+    *,
+    token: str,
+    verify: bool,
+    timeout: float,
+    params: Optional[dict] = None,
+    headers: Optional[dict] = None,
+) -> httpx.Response:
+    """Havuzlanmış client üzerinden GET; gövde tamamen okunmuş olarak döner."""
+    entry = _get_entry(base_url, verify, token)
+    entry.requests += 1
+    entry.inflight += 1
+    try:
+        return await entry.client.get(
+            f"{base_url.rstrip('/')}{path}",
+            params=params or {},
+            headers=headers,
+            timeout=timeout,
+            extensions={"trace": entry.trace},
+        )
+    finally:
+        _release(entry)
+
+
+@asynccontextmanager
+async def http_stream(
+    base_url: str,
+    path: str,
+    *,
+    token: str,
+    verify: bool,
+    timeout: Union[float, httpx.Timeout],
+    params: Optional[dict] = None,
+    headers: Optional[dict] = None,
+    pool: str = "default",
+) -> AsyncIterator[httpx.Response]:
+    """Havuzlanmış client üzerinden streaming GET; gövde parça parça okunur.
+    pool="watch" uzun ömürlü stream'leri normal istek havuzundan ayırır.
+    """
+    entry = _get_entry(base_url, verify, token, pool)
+    entry.requests += 1
+    entry.inflight += 1
+    try:
+        async with entry.client.stream(
+            "GET",
+            f"{base_url.rstrip('/')}{path}",
+            params=params or {},
+            headers=headers,
+            timeout=timeout,
+            extensions={"trace": entry.trace},
+        ) as resp:
+            yield resp
+    finally:
+        _release(entry)
+
+
+def pool_stats() -> Dict[str, Any]:
+    """Client hit/miss sayaçları ve host başına bağlantı yeniden kullanım bilgisi."""
+    stats: Dict[str, Any] = dict(_stats)
+    sessions = []
+    for reg in list(_registries.values()):
+        for (base_url, verify, _token, pool), entry in list(reg.items()):
+            sessions.append({
+                "base_url":         base_url,
+                "verify":           verify,
+                "pool":             pool,
+                "requests":         entry.requests,
+                "new_connections":  entry.new_connections,
+                "reused":           max(0, entry.requests - entry.new_connections),
+                "inflight":         entry.inflight,
+                "max_connections":  entry.max_connections,
+            })
+    stats["sessions"] = sessions
+    return stats
+
+
+def _pool_saturation():
+    """base_url + pool başına uçuştaki istek / bağlantı üst sınırı."""
+    totals: Dict[Tuple[str, str], list] = {}
+    for reg in list(_registries.values()):
+        for (base_url, _verify, _token, pool), entry in list(reg.items()):
+            row = totals.setdefault((base_url, pool), [0, entry.max_connections])
+            row[0] += entry.inflight
+    for (base_url, pool), (inflight, limit) in sorted(totals.items()):
+        yield {"base_url": base_url, "pool": pool}, inflight / limit if limit else 0.0
+
+
+registry.gauge(
+    "observe_upstream_pool_saturation",
+    "Upstream havuzunda uçuştaki istek / max_connections (1'e yaklaşırsa istekler havuzda bekler).",
+    _pool_saturation,
+)
+
+
+async def close_all() -> None:
+    """Çalışan loop'taki tüm client'ları kapatır (shutdown / test)."""
+    reg = _registry()
+    entries = list(reg.values())
+    reg.clear()
+    for entry in entries:
+        await entry.client.aclose()
+    if _closing:
+        await asyncio.gather(*list(_closing), return_exceptions=True)